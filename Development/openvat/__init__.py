@@ -9,7 +9,8 @@ Version: 1.0.3a
 
 import bpy
 
-from . import props, operators, panels
+from . import props, operators, panels, preview, utils
+from .api import encode, EncodeResult
 
 classes = []
 classes.extend(props.classes)
@@ -20,8 +21,14 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.vat_settings = bpy.props.PointerProperty(type=props.VATSettings)
+    preview.register()
+    # Custom attribute slots of older files move into the custom attribute list
+    bpy.app.handlers.load_post.append(utils.migrate_legacy_settings)
 
 def unregister():
+    if utils.migrate_legacy_settings in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(utils.migrate_legacy_settings)
+    preview.unregister()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.vat_settings
@@ -0,0 +1,144 @@
+# OpenVAT scripting API - encode from Python without the UI or operator context
+#
+#   import openvat
+#   result = openvat.encode(bpy.data.objects["Cloth"], {"vat_output_directory": "//vat"})
+#   print(result.status, result.layout, result.timings)
+#
+# (use the add-on's module name in place of openvat). settings maps VATSettings property names
+# to values for this call only; the scene's settings, frame range, active object and selection
+# are restored afterwards. encode_backend defaults to 'NUMPY' here: proxies, UV maps, modifiers
+# and textures are then built through the data API and NumPy, which runs the same in background
+# mode. Passing encode_backend 'RENDER' or 'AUTO' renders image encodes with render.render, and
+# model export goes through the exporter operators.
+
+import bpy
+import os
+import time
+from . import operators, events, utils
+
+
+class EncodeResult:
+    """
+    Outcome of encode():
+      status     'FINISHED', 'CANCELLED' or 'FAILED'
+      name       output name, files are written to directory
+      directory  <vat_output_directory>/<name>_vat
+      outputs    {path: bytes} of every file written
+      layout     Width, Height, Wraps, Frames and Vertices of the VAT
+      bounds     (min xyz, max xyz) the VAT is remapped with
+      timings    seconds per pipeline stage, "total" for the whole call
+      messages   (level, message) pairs reported by the encode
+    """
+
+    def __init__(self, name, directory):
+        self.status = 'FAILED'
+        self.name = name
+        self.directory = directory
+        self.outputs = {}
+        self.layout = {}
+        self.bounds = None
+        self.timings = {}
+        self.messages = []
+
+    @property
+    def ok(self):
+        return self.status == 'FINISHED'
+
+    def __repr__(self):
+        return f"<EncodeResult {self.name} {self.status} {self.layout.get('Width')}x{self.layout.get('Height')}, {len(self.outputs)} files>"
+
+
+# Reporter for the pipeline and event callback filling an EncodeResult
+class _Collector:
+    LAYOUT_FIELDS = {"width": "Width", "height": "Height", "wraps": "Wraps", "frames": "Frames", "vertices": "Vertices"}
+
+    def __init__(self, result):
+        self.result = result
+
+    def __call__(self, event):
+        kind = event["event"]
+        if kind == "stage_start" and event["stage"] == "encode":
+            self.result.layout = {name: event[field] for field, name in self.LAYOUT_FIELDS.items() if field in event}
+        elif kind == "stage_end":
+            self.result.timings[event["stage"]] = self.result.timings.get(event["stage"], 0.0) + event["duration"]
+        elif kind == "output":
+            self.result.outputs[event["path"]] = event.get("bytes")
+
+    def report(self, level, message):
+        level = next(iter(level))
+        self.result.messages.append((level, message))
+        print(f"OpenVAT {level.lower()}: {message}")
+
+    def fail(self, message):
+        self.report({'ERROR'}, message)
+        events.error(message)
+        return {'CANCELLED'}
+
+
+def encode(source, settings=None, frame_range=None, proxy=None, scene=None):
+    """
+    Encode source, a mesh object or a collection (encoded combined), with the scene's OpenVAT
+    settings overridden by settings ({property name: value}). frame_range (start, end) replaces
+    the scene range and proxy uses a mesh object as the proxy (Selected Object method).
+    encode_backend is 'NUMPY' unless settings names another backend.
+    Returns an EncodeResult. Unknown settings raise ValueError, pipeline errors propagate.
+    """
+    scene = scene or bpy.context.scene
+    view_layer = bpy.context.view_layer if scene == bpy.context.scene else scene.view_layers[0]
+    vat_settings = scene.vat_settings
+
+    overrides = dict(settings or {})
+    overrides.setdefault("encode_backend", 'NUMPY')
+    if isinstance(source, bpy.types.Collection):
+        overrides.update(encode_target='COLLECTION_COMBINE', vat_collection=source)
+    else:
+        overrides["encode_target"] = 'ACTIVE_OBJECT'
+    if proxy is not None:
+        overrides["proxy_method"] = 'SELECTED_OBJECT'
+    unknown = [key for key in overrides if key not in vat_settings.bl_rna.properties]
+    if unknown:
+        raise ValueError(f"Unknown OpenVAT settings: {', '.join(unknown)}")
+
+    saved = {key: getattr(vat_settings, key) for key in overrides}
+    saved_frames = (scene.frame_start, scene.frame_end, scene.frame_current)
+    # Names, the encode may replace objects (e.g. an earlier preview of the same source)
+    saved_active = view_layer.objects.active.name if view_layer.objects.active else None
+    saved_selection = [obj.name for obj in view_layer.objects.selected]
+
+    started = time.perf_counter()
+    result = None
+    try:
+        for key, value in overrides.items():
+            setattr(vat_settings, key, value)
+        if frame_range is not None:
+            scene.frame_start, scene.frame_end = frame_range
+        result = EncodeResult(source.name, os.path.join(bpy.path.abspath(vat_settings.vat_output_directory), f"{source.name}_vat"))
+        collector = _Collector(result)
+
+        # The pipeline takes the target from the active object and the proxy from the selection
+        utils.deselect_all(view_layer)
+        if isinstance(source, bpy.types.Object):
+            view_layer.objects.active = source
+            source.select_set(True, view_layer=view_layer)
+        if proxy is not None:
+            proxy.select_set(True, view_layer=view_layer)
+
+        with bpy.context.temp_override(scene=scene, view_layer=view_layer):
+            status = operators.run_encode(bpy.context, collector, callbacks=(collector,))
+        result.status = next(iter(status))
+        if "min_x" in scene:
+            result.bounds = ([scene["min_x"], scene["min_y"], scene["min_z"]], [scene["max_x"], scene["max_y"], scene["max_z"]])
+    finally:
+        for key, value in saved.items():
+            setattr(vat_settings, key, value)
+        scene.frame_start, scene.frame_end, scene.frame_current = saved_frames
+        utils.deselect_all(view_layer)
+        for name in saved_selection:
+            obj = view_layer.objects.get(name)
+            if obj is not None:
+                obj.select_set(True, view_layer=view_layer)
+        if saved_active is not None and view_layer.objects.get(saved_active) is not None:
+            view_layer.objects.active = view_layer.objects[saved_active]
+        if result is not None:
+            result.timings["total"] = round(time.perf_counter() - started, 4)
+    return result
@@ -0,0 +1,210 @@
+# OpenVAT asset index - local SQLite index of encoded VATs for reuse across projects
+#
+# Every indexed encode is keyed by a content hash of its sampled data, layout and output format.
+# An encode whose hash is already indexed links (or copies) the existing textures instead of
+# writing them again, and the index reports duplicate encodes with the storage they take.
+# Nothing here imports bpy; the index can be inspected from a plain Python shell:
+#
+#   python assets.py duplicates [--index <path>]
+#   python assets.py list
+#   python assets.py prune
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".openvat", "asset_index.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vats (
+    directory TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    files TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    min TEXT,
+    max TEXT,
+    layout TEXT,
+    blend TEXT,
+    created REAL
+);
+CREATE INDEX IF NOT EXISTS vats_hash ON vats (hash);
+"""
+
+
+# Hash of the arrays (dtype, shape and bytes, None allowed) and the layout description
+def content_hash(arrays, layout):
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps(layout, sort_keys=True, default=str).encode("utf-8"))
+    for array in arrays:
+        if array is None:
+            digest.update(b"-")
+            continue
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode("ascii"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def open_index(path=None):
+    path = path or DEFAULT_INDEX_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+# Reusable outputs of an encode: the texture files named <name>_*, not the model or sidecars
+def texture_files(directory, name):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(f for f in os.listdir(directory) if f.startswith(name + "_") and os.path.isfile(os.path.join(directory, f)))
+
+
+def _entry(row):
+    return {
+        "Directory": row["directory"],
+        "Name": row["name"],
+        "Hash": row["hash"],
+        "Files": json.loads(row["files"]),
+        "Bytes": row["bytes"],
+        "Min": json.loads(row["min"]) if row["min"] else None,
+        "Max": json.loads(row["max"]) if row["max"] else None,
+        "Layout": json.loads(row["layout"]) if row["layout"] else None,
+        "Blend": row["blend"],
+        "Created": row["created"],
+    }
+
+
+def _exists(entry):
+    return bool(entry["Files"]) and all(os.path.exists(os.path.join(entry["Directory"], f)) for f in entry["Files"])
+
+
+def register(connection, content_hash, name, directory, files, min_values=None, max_values=None, layout=None, blend=None):
+    directory = os.path.abspath(directory)
+    size = sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO vats (directory, name, hash, files, bytes, min, max, layout, blend, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (directory, name, content_hash, json.dumps(files), size,
+             json.dumps(min_values) if min_values is not None else None,
+             json.dumps(max_values) if max_values is not None else None,
+             json.dumps(layout, default=str) if layout is not None else None,
+             blend, time.time()),
+        )
+    return size
+
+
+# Newest indexed encode with this hash whose files all still exist, other than exclude
+def find(connection, content_hash, exclude=None):
+    exclude = os.path.abspath(exclude) if exclude else None
+    for row in connection.execute("SELECT * FROM vats WHERE hash = ? ORDER BY created DESC", (content_hash,)):
+        entry = _entry(row)
+        if entry["Directory"] != exclude and _exists(entry):
+            return entry
+    return None
+
+
+def reuse(entry, directory, name, mode='LINK'):
+    """
+    Hard link (falling back to a copy across devices) or copy the textures of an indexed encode
+    into directory, renamed from the entry's name to name. Returns the new file names.
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for filename in entry["Files"]:
+        source = os.path.join(entry["Directory"], filename)
+        target_name = name + filename[len(entry["Name"]):]
+        target = os.path.join(directory, target_name)
+        if os.path.exists(target):
+            os.remove(target)
+        if mode == 'LINK':
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+        else:
+            shutil.copy2(source, target)
+        files.append(target_name)
+    return files
+
+
+def _file_ids(entry):
+    # (device, inode) per file so hard links are counted once
+    ids = {}
+    for filename in entry["Files"]:
+        path = os.path.join(entry["Directory"], filename)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            ids[(stat.st_dev, stat.st_ino)] = stat.st_size
+    return ids
+
+
+def duplicates(connection):
+    """
+    Groups of indexed encodes sharing a content hash, with the storage reclaimable by keeping one.
+    Returns (groups, total reclaimable bytes).
+    """
+    groups = []
+    rows = connection.execute("SELECT hash FROM vats GROUP BY hash HAVING COUNT(*) > 1")
+    for (content_hash,) in rows.fetchall():
+        entries = [_entry(row) for row in connection.execute("SELECT * FROM vats WHERE hash = ? ORDER BY created", (content_hash,))]
+        entries = [entry for entry in entries if _exists(entry)]
+        if len(entries) < 2:
+            continue
+        kept = _file_ids(entries[0])
+        others = {}
+        for entry in entries[1:]:
+            others.update(_file_ids(entry))
+        reclaimable = sum(size for key, size in others.items() if key not in kept)
+        groups.append({"Hash": content_hash, "Entries": entries, "Bytes": entries[0]["Bytes"], "Reclaimable": reclaimable})
+    return groups, sum(group["Reclaimable"] for group in groups)
+
+
+# Remove entries whose files no longer exist, returns the number removed
+def prune(connection):
+    stale = [row["directory"] for row in connection.execute("SELECT * FROM vats") if not _exists(_entry(row))]
+    with connection:
+        connection.executemany("DELETE FROM vats WHERE directory = ?", [(directory,) for directory in stale])
+    return len(stale)
+
+
+def format_duplicates(groups, total):
+    lines = []
+    for group in groups:
+        lines.append(f"{group['Hash'][:12]}  {len(group['Entries'])} copies of {group['Bytes'] / (1024 * 1024):.1f} MB, {group['Reclaimable'] / (1024 * 1024):.1f} MB reclaimable")
+        for entry in group["Entries"]:
+            lines.append(f"    {entry['Name']}  {entry['Directory']}")
+    lines.append(f"{len(groups)} duplicate group(s), {total / (1024 * 1024):.1f} MB reclaimable")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="OpenVAT asset index")
+    parser.add_argument("command", choices=("duplicates", "list", "prune"))
+    parser.add_argument("--index", default=None, help=f"Index file (defaults to {DEFAULT_INDEX_PATH})")
+    args = parser.parse_args(argv)
+
+    connection = open_index(args.index)
+    if args.command == "duplicates":
+        print(format_duplicates(*duplicates(connection)))
+    elif args.command == "list":
+        for row in connection.execute("SELECT * FROM vats ORDER BY created"):
+            entry = _entry(row)
+            print(f"{entry['Hash'][:12]}  {entry['Bytes'] / (1024 * 1024):8.1f} MB  {entry['Name']}  {entry['Directory']}")
+    else:
+        print(f"Removed {prune(connection)} stale entries")
+    connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
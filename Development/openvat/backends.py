@@ -0,0 +1,66 @@
+# OpenVAT encode backends - how the VAT texels of a standard encode are produced
+#
+# RENDER evaluates positions on the GPU: a VAT scene renders the proxy through the
+# ov_calculate-position-vs node group frame by frame and the compositor accumulates the rows.
+# NUMPY writes positions (and normals) sampled up front straight into the row/wrap layout, for
+# every output format. Both produce the same layout; harness.py checks they agree.
+# Rigid and custom encodes are always written from sampled data.
+
+import bpy
+from . import utils, core
+
+
+class EncodeBackend:
+    name = ""
+    # Whether the operator samples frame data before encode() is called
+    sampled = False
+
+    # Reason the backend can't encode with these settings, None if it can
+    def unsupported(self, settings):
+        return None
+
+    def encode(self, proxy_obj, obj_name, original_scene, frame_data, num_frames, width, height, num_wraps, pack_normals, order=None):
+        """Write the VAT textures, returns the image for the preview modifier or None"""
+        raise NotImplementedError
+
+
+class RenderBackend(EncodeBackend):
+    name = 'RENDER'
+    sampled = False
+
+    def unsupported(self, settings):
+        if settings.encode_type != 'DEFAULT':
+            return "Rigid and custom encodes are written from sampled data, use the NumPy backend"
+        if settings.output_format != 'IMAGE':
+            return "The render backend writes images only, use the NumPy backend for raw outputs"
+        if settings.dedup_frames:
+            return "Frame deduplication needs sampled frame data, use the NumPy backend"
+        if utils.get_split_bits(settings):
+            return "Hi/lo split textures are written from sampled data, use the NumPy backend"
+        if utils.uses_pca(settings):
+            return "PCA compression writes a basis computed from sampled data, use the NumPy backend"
+        if settings.use_clips:
+            return "Clip libraries are stacked from sampled data, use the NumPy backend"
+        return None
+
+    def encode(self, proxy_obj, obj_name, original_scene, frame_data, num_frames, width, height, num_wraps, pack_normals, order=None):
+        core.setup_vat_scene(proxy_obj, obj_name, original_scene.name, num_frames, width, height, num_wraps, pack_normals, frame_data=frame_data, order=order)
+        base_format = ''.join(filter(str.isalpha, original_scene.vat_settings.image_format))
+        return bpy.data.images[obj_name.replace("_ovbake", "") + "_vat." + base_format.lower()]
+
+
+class NumpyBackend(EncodeBackend):
+    name = 'NUMPY'
+    sampled = True
+
+    def encode(self, proxy_obj, obj_name, original_scene, frame_data, num_frames, width, height, num_wraps, pack_normals, order=None):
+        core.export_sampled_vat(obj_name, original_scene, frame_data, width, height, num_wraps, pack_normals, order=order)
+        return None
+
+
+BACKENDS = {backend.name: backend for backend in (RenderBackend(), NumpyBackend())}
+
+
+# Backend chosen by the settings, AUTO renders images and samples everything else
+def get_backend(settings):
+    return BACKENDS['NUMPY' if utils.uses_sampled_encode(settings) else 'RENDER']
@@ -3,33 +3,56 @@
 import bpy
 import bmesh
 import os
-from . import utils
-
-# Create VAT UV map with bmesh
-def create_uv_map(obj, screen_width, screen_height, frames):
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(obj.data)
-    uv_layer = bm.loops.layers.uv.new("VAT_UV")
-    index_layer = bm.verts.layers.int.new("index_orig")
-
-    for i, vert in enumerate(bm.verts):
-        vert[index_layer] = i
-
-    sorted_verts = sorted(bm.verts, key=lambda v: v[index_layer], reverse=True)
-    num_verts = len(sorted_verts)
+import json
+import math
+import numpy as np
+from . import utils, encoding, events, backends, preview
+
+# Create the VAT UV map from mesh data, without entering edit mode
+# order (optional) lists the vertex index for each VAT column slot, default is reversed index order
+def create_uv_map(obj, screen_width, screen_height, frames, order=None, vertex_slots=None):
+    mesh = obj.data
+    num_vertices = len(mesh.vertices)
+    index_attr = mesh.attributes.get("index_orig") or mesh.attributes.new("index_orig", 'INT', 'POINT')
+    index_attr.data.foreach_set("value", np.arange(num_vertices, dtype=np.int32))
+
+    # Column slot per vertex index, several vertices may share a slot (rigid pieces)
+    if vertex_slots is None:
+        if order is None:
+            order = encoding.default_vertex_order(num_vertices)
+        vertex_slots = np.empty(num_vertices, dtype=np.int64)
+        vertex_slots[np.asarray(order, dtype=np.int64)] = np.arange(num_vertices)
+    slots = np.asarray(vertex_slots, dtype=np.int64)
     pixel_size_x = 1.0 / screen_width
     pixel_size_y = 1.0 / screen_height
 
-    for i, vert in enumerate(sorted_verts):
-        uv_x = (i % screen_width) / screen_width + pixel_size_x / 2
-        uv_y = 1.0 - ((i // screen_width) * frames) / screen_height - pixel_size_y / 2
-
-        for loop in vert.link_loops:
-            loop[uv_layer].uv = (uv_x, uv_y)
-
-    bmesh.update_edit_mesh(obj.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
-    obj.data.uv_layers.active_index = len(obj.data.uv_layers) - 1
+    uv = np.empty((num_vertices, 2), dtype=np.float64)
+    uv[:, 0] = (slots % screen_width) / screen_width + pixel_size_x / 2
+    uv[:, 1] = 1.0 - ((slots // screen_width) * frames) / screen_height - pixel_size_y / 2
+
+    corner_vertices = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", corner_vertices)
+    uv_layer = mesh.uv_layers.new(name="VAT_UV")
+    uv_layer.data.foreach_set("uv", uv[corner_vertices].astype(np.float32).ravel())
+    mesh.uv_layers.active_index = len(mesh.uv_layers) - 1
+
+# Bone indices and weights per vertex as corner UV maps (two channels each), which every model
+# exporter writes: VAT_BONES01/VAT_BONES23 hold bone columns, VAT_WEIGHTS01/VAT_WEIGHTS23 their weights
+def create_skinning_uv_maps(obj, indices, weights):
+    mesh = obj.data
+    influences = np.zeros((len(indices), 4), dtype=np.float32)
+    blend = np.zeros((len(indices), 4), dtype=np.float32)
+    influences[:, :indices.shape[1]] = indices
+    blend[:, :weights.shape[1]] = weights
+
+    corner_vertices = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", corner_vertices)
+    active = mesh.uv_layers.active_index
+    for name, values in (("VAT_BONES01", influences[:, :2]), ("VAT_BONES23", influences[:, 2:]),
+                         ("VAT_WEIGHTS01", blend[:, :2]), ("VAT_WEIGHTS23", blend[:, 2:])):
+        layer = mesh.uv_layers.get(name) or mesh.uv_layers.new(name=name)
+        layer.data.foreach_set("uv", values[corner_vertices].ravel())
+    mesh.uv_layers.active_index = active
 
 def get_max_y(res_x, res_y, ortho_scale=10.0):
     aspect = res_x / res_y
@@ -39,15 +62,19 @@ def get_max_y(res_x, res_y, ortho_scale=10.0):
         return ortho_scale / 2
 
 # The bulk of the encoding computation happens within an appended geometry node group - The following code defines properties to set up the geometry nodes to capture data
-def setup_vat_tracker(vat_scene, obj_name, num_frames, width, height, num_wraps, proxy_name, original_scene, nodegroup_method, pack_normals, use_custom, custom_attribute, custom_remap):
+def setup_vat_tracker(vat_scene, obj_name, num_frames, width, height, num_wraps, proxy_name, original_scene, nodegroup_method, pack_normals):
     ypos = get_max_y(width, height)
-    bpy.ops.mesh.primitive_plane_add(location=(0, ypos, 0))
-    tracker_plane = bpy.context.object
-    tracker_plane.name = f"{obj_name}_vat-tracking"
+    # 2x2 plane, built in the VAT scene through the data API whatever the context scene is
+    plane = bpy.data.meshes.new(f"{obj_name}_vat-tracking")
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=1, y_segments=1, size=1.0, calc_uvs=True)
+    bm.to_mesh(plane)
+    bm.free()
+    tracker_plane = bpy.data.objects.new(f"{obj_name}_vat-tracking", plane)
+    tracker_plane.location = (0, ypos, 0)
+    vat_scene.collection.objects.link(tracker_plane)
     
-    bpy.ops.object.modifier_add(type='NODES')
-    mod = tracker_plane.modifiers[-1]  # Always the last added modifier
-    mod.name = "ov_tracking"  # Rename to a fixed, known string
+    mod = tracker_plane.modifiers.new("ov_tracking", 'NODES')  # Fixed, known name
 
     # Now safely reference it by name
     mod.node_group = bpy.data.node_groups[nodegroup_method]
@@ -67,31 +94,22 @@ def setup_vat_tracker(vat_scene, obj_name, num_frames, width, height, num_wraps,
     mod["Socket_19"] = vat_scene.frame_start
 
 
-    if use_custom:
-        mod["Socket_23"] = True
-        mod["Socket_20"] = original_scene.vat_settings.custom_attr_1
-        mod["Socket_26"] = original_scene.vat_settings.custom_attr_2
-        mod["Socket_27"] = original_scene.vat_settings.custom_attr_3
-        if custom_remap:
-            mod["Socket_22"] = True
-    else:
-        if bpy.data.scenes[original_scene.name].vat_settings.vat_normal_encoding == 'PACKED':
-            normal_tracker = tracker_plane.copy()
-            normal_tracker.data = tracker_plane.data.copy()
-            vat_scene.collection.objects.link(normal_tracker)
-            normal_tracker.location[1] = 0
-            normal_mod = normal_tracker.modifiers.get("ov_tracking")
-            if normal_mod:
-                normal_mod["Socket_17"] = True
+    if bpy.data.scenes[original_scene.name].vat_settings.vat_normal_encoding == 'PACKED':
+        normal_tracker = tracker_plane.copy()
+        normal_tracker.data = tracker_plane.data.copy()
+        vat_scene.collection.objects.link(normal_tracker)
+        normal_tracker.location[1] = 0
+        normal_mod = normal_tracker.modifiers.get("ov_tracking")
+        if normal_mod:
+            normal_mod["Socket_17"] = True
         
         
-def setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_normals, framestart):
+def setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_normals, framestart, frame_data=None):
     original_scene = bpy.context.scene
     settings = original_scene.vat_settings
     
-    bpy.ops.scene.new(type='NEW')
-    proxy_scene = bpy.context.scene
-    proxy_scene.name = f"{obj.name}_proxy_scene"
+    proxy_scene = bpy.data.scenes.new(f"{obj.name}_proxy_scene")
+    proxy_view_layer = proxy_scene.view_layers[0]
 
     proxy_scene.frame_end = framestart + num_frames - 1
     
@@ -99,62 +117,115 @@ def setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_
         proxy_scene.frame_current = framestart
     proxy_scene.frame_start = framestart
 
+    # Low memory mode shares the generated proxy mesh until its modifiers are applied (never a user-selected proxy)
+    lean = settings.lean_memory
+    shared = lean and settings.proxy_method != 'SELECTED_OBJECT'
     proxy_obj = temp_obj.copy()
-    proxy_obj.data = temp_obj.data.copy()
+    if not shared:
+        proxy_obj.data = temp_obj.data.copy()
     proxy_scene.collection.objects.link(proxy_obj)
     
-    bpy.context.view_layer.objects.active = proxy_obj
-    proxy_obj.select_set(True)
-
-    for modifier in proxy_obj.modifiers[:]:
-        utils.apply_modifier(proxy_obj, modifier)
-    
-    bpy.ops.object.editmode_toggle()
-    bpy.ops.object.editmode_toggle()
-
-    bpy.ops.object.modifier_add(type='NODES')
-    proxy_obj.modifiers[-1].node_group = bpy.data.node_groups["ov_generated-pos"]
-    create_uv_map(proxy_obj, width, height, num_frames)
+    proxy_view_layer.objects.active = proxy_obj
+    proxy_obj.select_set(True, view_layer=proxy_view_layer)
+
+    # Modifiers are evaluated in the proxy scene, without making it the window's scene
+    with bpy.context.temp_override(scene=proxy_scene, view_layer=proxy_view_layer):
+        for modifier in proxy_obj.modifiers[:]:
+            utils.apply_modifier(proxy_obj, modifier, free_previous=lean)
+    if shared:
+        # UV maps and attributes are written below, never into temp_obj's mesh
+        utils.unshare_mesh(proxy_obj, temp_obj.data)
+    proxy_obj.data.update()
+
+    proxy_obj.modifiers.new("GeometryNodes", 'NODES').node_group = bpy.data.node_groups["ov_generated-pos"]
+
+    # Column layout, optionally reordered for texture-fetch locality
+    order = frame_data.get("order") if frame_data else None
+    if settings.encode_type == 'RIGID':
+        # Every vertex of a piece samples its piece's transform column
+        labels = frame_data["labels"]
+        create_uv_map(proxy_obj, width, height, num_frames, vertex_slots=labels)
+        piece_attr = proxy_obj.data.attributes.new("piece_index", 'INT', 'POINT')
+        piece_attr.data.foreach_set("value", labels.astype("int32"))
+    elif settings.encode_type == 'SKINNING':
+        # VAT_UV points at the dominant bone, blending reads the bone UV maps
+        indices, weights = frame_data["bone_indices"], frame_data["bone_weights"]
+        dominant = np.take_along_axis(indices, weights.argmax(axis=1)[:, None], axis=1)[:, 0]
+        create_uv_map(proxy_obj, width, height, num_frames, vertex_slots=dominant)
+        create_skinning_uv_maps(proxy_obj, indices, weights)
+    else:
+        if order is None and settings.vertex_order != 'INDEX':
+            order = utils.get_vertex_order(proxy_obj.data, settings.vertex_order, width, num_frames)
+        create_uv_map(proxy_obj, width, height, num_frames, order=order)
         
-    # Main VAT render
-    setup_vat_scene(proxy_obj, obj.name, original_scene.name, num_frames, width, height, num_wraps, pack_normals)
-    
-    # Get VAT Result
-    base_format = ''.join(filter(str.isalpha, original_scene.vat_settings.image_format))
-    image_extension = '.' + base_format.lower()
-    image_result = bpy.data.images[obj.name.replace("_ovbake", "") + "_vat" + image_extension]
-    
-    
-    bpy.context.window.scene = proxy_scene
+    if frame_data and frame_data.get("reused"):
+        # Textures linked or copied from an identical indexed encode
+        image_result = None
+    elif settings.encode_type in {'RIGID', 'SKINNING'}:
+        # Bones use the rigid piece layout, translations on top and rotations in the packed half
+        export_rigid_vat(obj.name, original_scene, frame_data, width, height, num_wraps)
+        image_result = None
+    elif settings.encode_type == 'CUSTOM':
+        export_custom_vat(obj.name, original_scene, frame_data, width, height, num_wraps, order=order)
+        image_result = None
+    elif frame_data and (frame_data.get("streamed") or frame_data.get("deferred")):
+        # Already written chunk by chunk while sampling, or assembled later from farm jobs
+        image_result = None
+    else:
+        # Render or NumPy backend, chosen by the encode backend setting
+        image_result = backends.get_backend(settings).encode(proxy_obj, obj.name, original_scene, frame_data, num_frames, width, height, num_wraps, pack_normals, order=order)
+
+    # Velocity comes from the sampled positions whichever backend wrote the VAT
+    if frame_data and frame_data.get("velocity") is not None and not frame_data.get("reused"):
+        velocity_min, velocity_max = frame_data["velocity_bounds"]
+        export_velocity_texture(obj.name, original_scene, frame_data["velocity"], velocity_min, velocity_max, width, height, num_wraps, order=order)
+
+
+    position_cache = frame_data.get("position_cache") if frame_data else None
+    if lean:
+        # Sampled data and the render scene are no longer needed once the VAT is written
+        if frame_data is not None:
+            frame_data.clear()
+        vat_scene = bpy.data.scenes.get(f"{obj.name}_vat")
+        if vat_scene is not None and settings.vat_cleanup_enabled:
+            utils.free_scene(vat_scene)
+
+    # Low memory mode hands the proxy mesh over to the preview object when the proxy scene is cleaned up anyway,
+    # so mesh cleanup and cache playback never write into a mesh the proxy scene still shows
     vat_obj = proxy_obj.copy()
-    vat_obj.data = proxy_obj.data.copy()
+    if lean and settings.vat_cleanup_enabled:
+        utils.record_saved_mesh(proxy_obj.data)
+        utils.free_scene(proxy_scene)
+    else:
+        vat_obj.data = proxy_obj.data.copy()
     
     original_scene.collection.objects.link(vat_obj)
-    bpy.context.window.scene = original_scene
-    bpy.ops.object.select_all(action='DESELECT')
+    utils.deselect_all()
     bpy.context.view_layer.objects.active = vat_obj
     vat_obj.select_set(True)
     
     for modifier in vat_obj.modifiers[:]:
         vat_obj.modifiers.remove(modifier)
-    bpy.ops.object.modifier_add(type='NODES')
-    mod = vat_obj.modifiers[-1]
-    mod.node_group = bpy.data.node_groups["ov_vat-decoder-vs"]
-    
-    mod["Socket_2_attribute_name"] = "VAT_UV"
-    mod["Socket_6"] = num_frames
-    mod["Socket_7"] = height
-    mod["Socket_9"] = image_result
-    mod["Socket_3"] = original_scene['min_x']
-    mod["Socket_4"] = original_scene['max_x']
-    mod["Socket_10"] = original_scene['min_y']
-    mod["Socket_11"] = original_scene['max_y']
-    mod["Socket_12"] = original_scene['min_z']
-    mod["Socket_13"] = original_scene['max_z']
-    mod["Socket_14"] = original_scene.frame_start
-
-    bpy.ops.object.editmode_toggle()
-    bpy.ops.object.editmode_toggle()
+    if position_cache is not None:
+        # Cache preview writes positions on frame change instead of decoding the image
+        preview.attach_cache(vat_obj, *position_cache)
+    elif image_result is not None:
+        mod = vat_obj.modifiers.new("GeometryNodes", 'NODES')
+        mod.node_group = bpy.data.node_groups["ov_vat-decoder-vs"]
+        
+        mod["Socket_2_attribute_name"] = "VAT_UV"
+        mod["Socket_6"] = num_frames
+        mod["Socket_7"] = height
+        mod["Socket_9"] = image_result
+        mod["Socket_3"] = original_scene['min_x']
+        mod["Socket_4"] = original_scene['max_x']
+        mod["Socket_10"] = original_scene['min_y']
+        mod["Socket_11"] = original_scene['max_y']
+        mod["Socket_12"] = original_scene['min_z']
+        mod["Socket_13"] = original_scene['max_z']
+        mod["Socket_14"] = original_scene.frame_start
+
+    vat_obj.data.update()
     vat_obj.name = obj.name.replace("_ovbake", "_vat")
     
     # Move to OpenVATPreview collection
@@ -166,7 +237,7 @@ def setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_
     original_scene.collection.objects.unlink(vat_obj)
     vat_coll.objects.link(vat_obj)
     tempmain = vat_obj.name.replace("_vat", "_ovbake")
-    bpy.ops.object.select_all(action='DESELECT')
+    utils.deselect_all()
     vat_obj.select_set(True)
     
     bpy.context.view_layer.objects.active = vat_obj
@@ -180,10 +251,9 @@ def setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_
         export_vat_model(settings.mesh_format, include_materials=False, include_tangents=True)
 
 
-def setup_vat_scene(proxy_obj, obj_name, original_scene_name, num_frames, width, height, num_wraps, pack_normals):
-    bpy.ops.scene.new(type='NEW')
-    vat_scene = bpy.context.scene
-    vat_scene.name = f"{obj_name}_vat"
+def setup_vat_scene(proxy_obj, obj_name, original_scene_name, num_frames, width, height, num_wraps, pack_normals, frame_data=None, order=None):
+    # Created and rendered through explicit overrides, the context scene stays the caller's
+    vat_scene = bpy.data.scenes.new(f"{obj_name}_vat")
     original_scene = bpy.data.scenes[original_scene_name]
     output_dir = bpy.path.abspath(original_scene.vat_settings.vat_output_directory)
     
@@ -238,17 +308,7 @@ def setup_vat_scene(proxy_obj, obj_name, original_scene_name, num_frames, width,
 
     nodegroup_method = "ov_calculate-position-vs"
     
-    encode_settings = original_scene.vat_settings
-    use_custom = False
-    custom_attribute = ""
-    custom_remap = False
-    if encode_settings.encode_type == 'CUSTOM':
-        use_custom = True
-        custom_attribute = encode_settings.user_attribute # Custom Vector
-        custom_remap = encode_settings.custom_remap
-        pack_normals = False
-         
-    setup_vat_tracker(vat_scene, obj_name, num_frames, width, height, num_wraps, proxy_obj.name, original_scene, nodegroup_method, pack_normals, use_custom, custom_attribute, custom_remap)
+    setup_vat_tracker(vat_scene, obj_name, num_frames, width, height, num_wraps, proxy_obj.name, original_scene, nodegroup_method, pack_normals)
     print ("VAT Tracker Created")
     print ("Starting render process...")
     
@@ -264,30 +324,253 @@ def setup_vat_scene(proxy_obj, obj_name, original_scene_name, num_frames, width,
     if original_scene.vat_settings.image_format == "EXR32":
         if original_scene.vat_settings.no_remap:
             setup_unnormalize(vat_scene,original_scene,"os-remap")
-            bpy.ops.render.render(write_still=True)
+            render_still(vat_scene)
             bpy.data.images[output_name+".exr"].reload()
     
-    # Render VNRM
-    if not pack_normals: 
-        if bpy.data.scenes[original_scene_name].vat_settings.encode_type == 'DEFAULT':
-            if bpy.data.scenes[original_scene_name].vat_settings.vat_normal_encoding != 'NONE':
-                print ("Starting normals render process...")
-                bpy.context.object.modifiers[-1]["Socket_17"] = True
-                rendername = vat_scene.name.replace("_ovbake_vat", "_vnrm")
-                vat_scene.render.use_compositing = False
-            
-                # Prep
-                render_vat_nrml(vat_scene, 0, output_dir, image_format, fmt)
-                vat_scene.render.use_compositing = True
-                tree = vat_scene.node_tree
-                image_node = tree.nodes["Image"]
-                image = bpy.data.images.get(rendername + image_format)
-                image_node.image = image
-                image.colorspace_settings.name = 'Non-Color'
-                
-                #Render
-                render_vat_nrml(vat_scene, num_frames, output_dir, image_format, fmt)   
+    # Separate normals come from the sampling pass, written without a second render sweep
+    if not pack_normals and frame_data and frame_data.get("normals") is not None:
+        export_sampled_normals(obj_name, original_scene, frame_data["normals"], width, height, num_wraps, order=order)
     
+# Write sampled frame data in the VAT row/wrap layout from NumPy, without the render scene
+def export_sampled_vat(obj_name, original_scene, frame_data, width, height, num_wraps, pack_normals, order=None):
+    settings = original_scene.vat_settings
+    output_dir = bpy.path.abspath(settings.vat_output_directory)
+    output_name = obj_name.replace("_ovbake", "") + "_vat"
+    object_dir = os.path.join(output_dir, output_name)
+    os.makedirs(object_dir, exist_ok=True)
+
+    values = frame_data["values"]
+    if utils.uses_remap(settings):
+        min_values = [original_scene['min_x'], original_scene['min_y'], original_scene['min_z']]
+        max_values = [original_scene['max_x'], original_scene['max_y'], original_scene['max_z']]
+        values = encoding.normalize(values, min_values, max_values)
+
+    normals = frame_data.get("normals")
+    if normals is not None:
+        normals = encoding.encode_normals(normals)
+
+    buffer = encoding.build_vat_buffer(values, width, height, num_wraps, normals=normals if pack_normals else None, order=order)
+    write_vat_buffer(settings, buffer, os.path.join(object_dir, output_name))
+
+    if normals is not None and not pack_normals:
+        export_sampled_normals(obj_name, original_scene, frame_data["normals"], width, height, num_wraps, order=order)
+
+    print(f"VAT Encoding finished, exported to {output_dir}")
+
+# Separate normal texture (<name>_vnrm) from sampled per-frame vertex normals
+def export_sampled_normals(obj_name, original_scene, normals, width, height, num_wraps, order=None):
+    settings = original_scene.vat_settings
+    output_dir = bpy.path.abspath(settings.vat_output_directory)
+    output_name = obj_name.replace("_ovbake", "") + "_vat"
+    buffer = encoding.build_vat_buffer(encoding.encode_normals(normals), width, height, num_wraps, order=order)
+    output_path = write_vat_buffer(settings, buffer, os.path.join(output_dir, output_name, output_name.replace("_vat", "_vnrm")))
+    print(f"VNRM Encoding finished, exported to {output_path}")
+
+# Velocity texture (<name>_vvel) in the position layout, normalized to its own bounds when remapping
+def export_velocity_texture(obj_name, original_scene, velocity, min_values, max_values, width, height, num_wraps, order=None):
+    settings = original_scene.vat_settings
+    output_dir = bpy.path.abspath(settings.vat_output_directory)
+    output_name = obj_name.replace("_ovbake", "") + "_vat"
+    if utils.uses_remap(settings):
+        velocity = encoding.normalize(velocity, min_values, max_values)
+    buffer = encoding.build_vat_buffer(velocity, width, height, num_wraps, order=order)
+    output_path = write_vat_buffer(settings, buffer, os.path.join(output_dir, output_name, output_name.replace("_vat", "_vvel")))
+    print(f"Velocity texture exported to {output_path}")
+
+# Streaming encode: sample fixed-size frame chunks and write their rows straight into the raw
+# output, so memory stays bounded by the chunk size. Progress is kept in a state file next to
+# the output, an interrupted encode with the same layout resumes after the last finished chunk.
+def stream_sampled_vat(obj_name, original_scene, frame_start, frame_end, width, height, num_wraps, pack_normals, order=None, rest=None, wrap_bounds=False):
+    settings = original_scene.vat_settings
+    obj = bpy.data.objects[obj_name]
+    output_dir = bpy.path.abspath(settings.vat_output_directory)
+    output_name = obj_name.replace("_ovbake", "") + "_vat"
+    object_dir = os.path.join(output_dir, output_name)
+    os.makedirs(object_dir, exist_ok=True)
+
+    container = settings.output_format
+    extension = encoding.RAW_EXTENSIONS[container]
+    dtype = encoding.RAW_DTYPES[settings.raw_precision]
+    num_frames = frame_end - frame_start + 1
+    chunk_frames = max(1, settings.stream_chunk_frames)
+    num_chunks = math.ceil(num_frames / chunk_frames)
+    use_normals = settings.vat_normal_encoding != 'NONE'
+    separate_normals = use_normals and not pack_normals
+    remap = utils.uses_remap(settings)
+    # Remapped half floats must quantize the normalized positions, so the offsets are kept in a
+    # float32 scratch file until the overall bounds are known
+    use_scratch = remap and dtype != np.float32
+
+    output_path = os.path.join(object_dir, output_name + extension)
+    normal_path = os.path.join(object_dir, output_name.replace("_vat", "_vnrm") + extension)
+    state_path = os.path.join(object_dir, output_name + ".stream.json")
+    scratch_path = os.path.join(object_dir, output_name + ".stream.npy")
+    layout = {
+        "FrameStart": frame_start,
+        "FrameEnd": frame_end,
+        "Width": width,
+        "Height": height,
+        "Wraps": num_wraps,
+        "Format": container,
+        "Precision": settings.raw_precision,
+        "Normals": settings.vat_normal_encoding,
+        "ChunkFrames": chunk_frames,
+        "Order": settings.vertex_order,
+        "Bounds": rest is not None,
+        "WrapBounds": wrap_bounds,
+        "Remap": remap,
+    }
+
+    state = None
+    if os.path.exists(state_path):
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+        outputs_exist = os.path.exists(output_path) and (not separate_normals or os.path.exists(normal_path)) and (not use_scratch or os.path.exists(scratch_path))
+        if state.get("Layout") != layout or not outputs_exist:
+            state = None
+    resume = state is not None
+    if resume:
+        print(f"Resuming streamed encode after chunk {state['CompletedChunks']} of {num_chunks}")
+    else:
+        state = {"Layout": layout, "CompletedChunks": 0, "Min": None, "Max": None, "NormalizedRows": 0, "FrameBounds": [], "WrapBounds": []}
+
+    def save_state():
+        with open(state_path, 'w') as f:
+            json.dump(state, f)
+
+    out = encoding.open_raw_output(output_path, container, width, height, dtype, resume=resume)
+    nrm_out = encoding.open_raw_output(normal_path, container, width, height, dtype, resume=resume) if separate_normals else None
+    positions_out = encoding.open_raw_output(scratch_path, 'RAW_NPY', width, num_wraps * num_frames, np.float32, resume=resume) if use_scratch else out
+
+    for chunk in range(state["CompletedChunks"], num_chunks):
+        first = chunk * chunk_frames
+        last = min(first + chunk_frames, num_frames) - 1
+        frame_data = utils.sample_frames(obj, ["colPos"], frame_start + first, frame_start + last, normals=use_normals, corner_normals=settings.rip_edges)
+        values = frame_data["colPos"]
+        encoding.write_frame_rows(positions_out, values, first, num_frames, width, num_wraps, order)
+
+        if use_normals:
+            normals = encoding.encode_normals(frame_data["normals"])
+            if pack_normals:
+                encoding.write_frame_rows(out, normals, first, num_frames, width, num_wraps, order, row_offset=height // 2)
+            else:
+                encoding.write_frame_rows(nrm_out, normals, first, num_frames, width, num_wraps, order)
+                nrm_out.flush()
+
+        # Per-frame bounds of the final positions (rest + offset) for engine-side culling
+        if rest is not None:
+            per_frame, per_wrap = encoding.frame_bounds(rest, values, width, num_wraps, order)
+            state["FrameBounds"].extend(per_frame.tolist())
+            if wrap_bounds:
+                state["WrapBounds"].extend(per_wrap.tolist())
+
+        flat = values.reshape(-1, 3)
+        if len(flat):
+            chunk_min, chunk_max = flat.min(axis=0), flat.max(axis=0)
+            if state["Min"] is not None:
+                chunk_min = np.minimum(chunk_min, state["Min"])
+                chunk_max = np.maximum(chunk_max, state["Max"])
+            state["Min"], state["Max"] = chunk_min.tolist(), chunk_max.tolist()
+
+        positions_out.flush()
+        out.flush()
+        state["CompletedChunks"] = chunk + 1
+        save_state()
+        print(f"Streamed frames {frame_start + first}-{frame_start + last} ({chunk + 1}/{num_chunks})")
+        events.progress("stream", last + 1, num_frames)
+
+    min_values = [encoding.round_bound(v, math.floor) for v in state["Min"] or [0.0, 0.0, 0.0]]
+    max_values = [encoding.round_bound(v, math.ceil) for v in state["Max"] or [0.0, 0.0, 0.0]]
+
+    # Remap positions (from the scratch file, else in place), a chunk of rows at a time
+    if remap:
+        rows = num_wraps * num_frames
+        chunk_rows = chunk_frames * num_wraps
+        for start in range(state["NormalizedRows"], rows, chunk_rows):
+            stop = min(start + chunk_rows, rows)
+            encoding.normalize_rows(out, start, stop, min_values, max_values, source=positions_out)
+            out.flush()
+            state["NormalizedRows"] = stop
+            save_state()
+
+    bounds = None
+    if rest is not None:
+        bounds = (np.array(state["FrameBounds"], dtype=np.float32), np.array(state["WrapBounds"], dtype=np.float32) if wrap_bounds else None)
+
+    del out, nrm_out, positions_out
+    if use_scratch:
+        os.remove(scratch_path)
+    os.remove(state_path)
+    events.output(output_path)
+    if separate_normals:
+        events.output(normal_path)
+    print(f"VAT Encoding finished, streamed to {output_path}")
+    return min_values, max_values, bounds
+
+# Bounds texture (<name>_bnds): per-frame min/max, normalized to the overall bounds when remapping
+def export_bounds_texture(obj_name, original_scene, per_frame, min_values, max_values):
+    settings = original_scene.vat_settings
+    output_dir = bpy.path.abspath(settings.vat_output_directory)
+    output_name = obj_name.replace("_ovbake", "") + "_vat"
+    if utils.uses_remap(settings):
+        buffer = encoding.build_bounds_buffer(per_frame, min_values, max_values)
+    else:
+        buffer = encoding.build_bounds_buffer(per_frame)
+    output_path = write_vat_buffer(settings, buffer, os.path.join(output_dir, output_name, output_name.replace("_vat", "_bnds")))
+    print(f"Bounds texture exported to {output_path}")
+
+# Write a VAT texel buffer in the selected output format (image or raw), path without extension.
+# With the hi/lo split the coarse part goes to the path and the fine part to <path>_lo.
+def write_vat_buffer(settings, buffer, output_path, color_mode='RGB'):
+    if settings.output_format == 'IMAGE':
+        fmt = settings.image_format
+        extension = '.' + ''.join(filter(str.isalpha, fmt)).lower()
+        name = os.path.basename(output_path) + extension
+        split_bits = utils.get_split_bits(settings)
+        if split_bits:
+            buffer, low = encoding.split_precision(buffer, split_bits)
+            utils.save_float_image(os.path.basename(output_path) + "_lo" + extension, low, output_path + "_lo" + extension, fmt, color_mode)
+        utils.save_float_image(name, buffer, output_path + extension, fmt, color_mode)
+    else:
+        extension = encoding.RAW_EXTENSIONS[settings.output_format]
+        encoding.write_raw_vat(output_path + extension, settings.output_format, buffer, encoding.RAW_DTYPES[settings.raw_precision])
+        events.output(output_path + extension)
+    return output_path + extension
+
+# Rigid pieces: translations in the top half, xyzw rotations (0-1 packed) in the bottom half
+def export_rigid_vat(obj_name, original_scene, frame_data, width, height, num_wraps):
+    settings = original_scene.vat_settings
+    output_dir = bpy.path.abspath(settings.vat_output_directory)
+    output_name = obj_name.replace("_ovbake", "") + "_vat"
+
+    translations = frame_data["values"]
+    if utils.uses_remap(settings):
+        min_values = [original_scene['min_x'], original_scene['min_y'], original_scene['min_z']]
+        max_values = [original_scene['max_x'], original_scene['max_y'], original_scene['max_z']]
+        translations = encoding.normalize(translations, min_values, max_values)
+    rotations = frame_data["rotations"] * 0.5 + 0.5
+
+    buffer = encoding.build_vat_buffer(translations, width, height, num_wraps, normals=rotations)
+    output_path = write_vat_buffer(settings, buffer, os.path.join(output_dir, output_name, output_name), color_mode='RGBA')
+    print(f"Rigid VAT Encoding finished, exported to {output_path}")
+
+# Custom attributes: channels packed RGBA in list order, texture 0 is <name>_vat, then <name>_vat1, ...
+def export_custom_vat(obj_name, original_scene, frame_data, width, height, num_wraps, order=None):
+    settings = original_scene.vat_settings
+    output_dir = bpy.path.abspath(settings.vat_output_directory)
+    output_name = obj_name.replace("_ovbake", "") + "_vat"
+
+    values = frame_data["values"]
+    if utils.uses_remap(settings):
+        values = encoding.normalize(values, frame_data["mins"], frame_data["maxs"])
+
+    for index, group in enumerate(encoding.split_channel_groups(values)):
+        texture_name = output_name + (str(index) if index else "")
+        buffer = encoding.build_vat_buffer(group, width, height, num_wraps, order=order)
+        color_mode = 'RGBA' if group.shape[-1] == 4 else 'RGB'
+        output_path = write_vat_buffer(settings, buffer, os.path.join(output_dir, output_name, texture_name), color_mode=color_mode)
+        print(f"Custom VAT texture {index} exported to {output_path}")
+
 # Set up compositing for the per frame capture overlay in the vat scene
 def setup_compositing(vat_scene, output_dir, scene_name, proxy_obj, image_format, raw_format):
     vat_scene.use_nodes = True
@@ -387,6 +670,11 @@ def setup_unnormalize(vat_scene, original_scene, attribute_name):
     print("✅ Unnormalize-only compositing setup complete using Map Range nodes.")
 
 # Called to render temporary frames to first prime the compositor, then through sequence for vat and optionally vnrm    
+# Render a still of vat_scene to its output path, not whichever scene the context holds
+def render_still(vat_scene):
+    with bpy.context.temp_override(scene=vat_scene, view_layer=vat_scene.view_layers[0]):
+        bpy.ops.render.render(write_still=True)
+
 def render_vat_scene(vat_scene, num_frames, output_dir, image_format, raw_format):
     start_frame = vat_scene.frame_start
     end_frame = vat_scene.frame_start + num_frames
@@ -420,7 +708,9 @@ def render_vat_scene(vat_scene, num_frames, output_dir, image_format, raw_format
     for frame in range(start_frame -1, end_frame):
         vat_scene.frame_set(frame)
         vat_scene.render.filepath = output_path
-        bpy.ops.render.render(write_still=True)
+        render_still(vat_scene)
+        if num_frames:
+            events.progress("encode", frame - start_frame + 2, num_frames + 1)
         img = bpy.data.images.get(output_name + image_format)
         if img is not None:
             img.reload()
@@ -436,63 +726,74 @@ def render_vat_scene(vat_scene, num_frames, output_dir, image_format, raw_format
         if 'EXR' in raw_format:
             img.use_half_precision = False
         vat_scene.render.filepath = output_path
-        bpy.ops.render.render(write_still=True)
+        render_still(vat_scene)
 
+    if num_frames:
+        events.output(output_path)
     print(f"VAT Encoding finished, exported to {output_dir}")
     
-# Similar to render_vat_scene above, but to a new texture name
-def render_vat_nrml(vat_scene, num_frames, output_dir, image_format, raw_format):
-    start_frame = vat_scene.frame_start
-    end_frame = vat_scene.frame_start + num_frames
-    output_name = vat_scene.name.replace("_ovbake", "")
-    rendername = output_name.replace("_vat", "_vnrm")
-    output_path = os.path.join(output_dir, f"{output_name}", f"{rendername}{image_format}")
-    img_settings = vat_scene.render.image_settings
-
-    if raw_format == 'PNG8':
-        img_settings.color_mode = 'RGB'
-        img_settings.color_depth = '8'
-        img_settings.compression = 0
-
-    elif raw_format == 'PNG16':
-        img_settings.color_mode = 'RGB'
-        img_settings.color_depth = '16'
-        img_settings.compression = 0
-
-    elif raw_format == 'EXR16':
-        img_settings.color_mode = 'RGB'
-        img_settings.color_depth = '16'
-        img_settings.exr_codec = 'ZIP'
-
-    elif raw_format == 'EXR32':
-        img_settings.color_mode = 'RGB'
-        img_settings.color_depth = '32'
-        img_settings.exr_codec = 'NONE'
-
-
-    if os.path.exists(output_path):
-        bpy.data.images.remove(bpy.data.images.load(output_path)) 
-    for frame in range(start_frame -1, end_frame):
-        vat_scene.frame_set(frame)
-        vat_scene.render.filepath = output_path
-        bpy.ops.render.render(write_still=True)
-        img = bpy.data.images.get(rendername + image_format)
-        if img is not None:
-            img.reload()
+# Set up the bake object (with the colPos offset modifier) and its proxy for sampling.
+# proxy_obj is a user-selected proxy, otherwise one is made from the bake object's current deformation.
+# split_edges replaces the edge split analysis with known edges (farm nodes load the plan's).
+# Returns (obj, temp_obj, split edge indices or None when no edges were split)
+def prepare_encode_objects(context, proxy_obj=None, clips=None, split_edges=None):
+    settings = context.scene.vat_settings
+    collection_mode = False
+    collection_target = ""
+    if settings.encode_type != 'CUSTOM':
+        if settings.encode_target == 'COLLECTION_COMBINE': # Collection target only valid when collection_mode is true
+            collection_mode = True
+            collection_target = settings.vat_collection.name
+
+    create_geo_nodes_bake(use_collection=collection_mode, collection_name=collection_target)
+    obj = context.view_layer.objects.active
+
+    # Perform Normal-Safe Edge Split on new object
+    split = None
+    if settings.vat_normal_encoding != 'NONE' and settings.encode_type not in {'RIGID', 'SKINNING'} and settings.rip_edges:
+        if split_edges is not None:
+            utils.split_mesh_edges(obj, split_edges)
+            split = list(split_edges)
+        elif settings.edge_split_method == 'NORMALS':
+            split = utils.rip_normal_edges(obj, context.scene.frame_start, context.scene.frame_end, settings.split_angle, clips=clips)
         else:
-            img = bpy.data.images.load(output_path)
-            print(f"Rendered template frame for normals compositing {frame}")
-   
+            split = utils.rip_hard_edges(obj)
+    
+    obj.select_set(True)
 
-    img = bpy.data.images.load(output_path)
-    if img is not None:
-        img.reload()
-        vat_scene.render.filepath = output_path
-        bpy.ops.render.render(write_still=True)
-        
-        #Reset Color Mode
-        bpy.context.scene.render.image_settings.color_mode = 'RGBA'
-    print(f"VNRM Encoding finished, exported to {output_dir}")
+    # Proxy creation
+    temp_obj = proxy_obj
+    if temp_obj is None:
+        temp_obj = obj.copy()
+        # Low memory mode: modifiers are applied into a new mesh below, no need to copy the source first
+        if not settings.lean_memory:
+            temp_obj.data = obj.data.copy()
+        context.scene.collection.objects.link(temp_obj)
+        # A clip library shares one proxy, the first frame of the first clip
+        first_clip = clips[0] if clips and settings.proxy_method == 'START_FRAME' else None
+        with utils.clip_animation(first_clip):
+            if first_clip is not None:
+                context.scene.frame_set(first_clip["FrameStart"])
+            elif settings.proxy_method == 'START_FRAME':
+                context.scene.frame_current = context.scene.frame_start
+            for modifier in temp_obj.modifiers[:]:
+                utils.apply_modifier(temp_obj, modifier, free_previous=settings.lean_memory)
+        if settings.lean_memory:
+            utils.unshare_mesh(temp_obj, obj.data)
+
+    # Ensure the required node groups are available
+    utils.ensure_node_group("ov_generated-pos")
+    utils.ensure_node_group("ov_vat-decoder-vs")
+    utils.ensure_node_group("ov_calculate-position-vs")
+    
+    utils.deselect_all(context.view_layer)
+    context.view_layer.objects.active = obj # ensure new generated mesh is active
+    obj.select_set(True)
+    
+    mod = obj.modifiers.new("positionCalculation", 'NODES')
+    mod.node_group = bpy.data.node_groups["ov_generated-pos"]
+    mod["Socket_3"] = temp_obj
+    return obj, temp_obj, split
 
 # Export the selected object with default export settings for openVAT
 def export_vat_model(file_format='FBX', include_materials=False, include_tangents=True):
@@ -501,7 +802,9 @@ def export_vat_model(file_format='FBX', include_materials=False, include_tangent
     if obj is None or obj.type != 'MESH':
         raise Exception("Active object must be a mesh")
 
-    bpy.ops.mesh.customdata_custom_splitnormals_add()
+    # Freeze the shaded normals as custom normals so the exporters keep them
+    if not obj.data.has_custom_normals:
+        obj.data.normals_split_custom_set(utils.get_corner_normals_array(obj.data))
 
     export_directory = bpy.path.abspath(bpy.context.scene.vat_settings.vat_output_directory)
     object_directory = os.path.join(export_directory, obj.name)
@@ -554,6 +857,7 @@ def export_vat_model(file_format='FBX', include_materials=False, include_tangent
         raise ValueError(f"Unsupported export format: {file_format}. Use 'FBX', 'GLB', or 'GLTF'.")
 
     print(f"Exported {obj.name} to {export_path} as {file_format.upper()}")
+    events.output(export_path)
 
 
 def create_geo_nodes_bake(use_collection=False, collection_name=""):
@@ -628,31 +932,25 @@ def create_geo_nodes_bake(use_collection=False, collection_name=""):
     links.new(realize_node.outputs["Geometry"], output_node.inputs["Geometry"])  # ← this now works
 
     # Deselect all, activate new object
-    bpy.ops.object.select_all(action='DESELECT')
+    utils.deselect_all(context.view_layer)
     obj.select_set(True)
     context.view_layer.objects.active = obj
 
-    # Duplicate and apply modifiers
-    bpy.ops.object.duplicate()
-    dup = context.active_object
-    bpy.ops.object.convert(target='MESH')
-
-    # Join back into original
-    obj.select_set(True)
-    dup.select_set(True)
-    context.view_layer.objects.active = obj
-    bpy.ops.object.join()
+    # Realize the node output into the object's own mesh, the modifier keeps following the source
+    depsgraph = context.evaluated_depsgraph_get()
+    baked = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+    bpy.data.meshes.remove(obj.data)
+    obj.data = baked
+    baked.name = f"{bake_name}_mesh"
     
     if vat_settings.proxy_method == 'COLLAPSE':
-        
-        # ops to collapse mesh to center (tbd replace with more stable data calls)
-        bpy.context.scene.cursor.location[0] = 0
-        bpy.context.scene.cursor.location[1] = 0
-        bpy.context.scene.cursor.location[2] = 0
-        bpy.ops.object.editmode_toggle()
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.merge(type='CURSOR')
-        bpy.ops.object.editmode_toggle()
+        # Collapse the mesh to the origin
+        bm = bmesh.new()
+        bm.from_mesh(baked)
+        bmesh.ops.pointmerge(bm, verts=bm.verts[:], merge_co=(0.0, 0.0, 0.0))
+        bm.to_mesh(baked)
+        bm.free()
+        baked.update()
 
     scene = bpy.context.scene  # Make sure 'scene' is defined
 
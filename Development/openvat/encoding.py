@@ -0,0 +1,829 @@
+# OpenVAT encoding - NumPy side of the VAT layout
+#
+# Mirrors the layout produced by the render/compositor path: each vertex owns a column,
+# vertices wrap into blocks of rows when they exceed the texture width, and each frame
+# is one row inside its wrap block. Rows are stored top-down (row 0 is the top of the
+# image) and packed normals start at half the texture height. Nothing here imports bpy,
+# so the same code runs inside Blender and in standalone tools.
+
+import math
+import struct
+import numpy as np
+
+RAW_EXTENSIONS = {
+    'RAW_BIN': ".bin",
+    'RAW_NPY': ".npy",
+    'KTX2': ".ktx2",
+}
+
+RAW_DTYPES = {
+    'HALF': np.float16,
+    'FLOAT': np.float32,
+}
+
+
+def round_bound(val, func):
+    return func(val * 10) / 10
+
+
+# Per-channel min/max over (frames, vertices, channels), rounded outward like the remap json
+def channel_bounds(data):
+    flat = np.asarray(data).reshape(-1, np.asarray(data).shape[-1])
+    if flat.shape[0] == 0:
+        return [None] * flat.shape[1], [None] * flat.shape[1]
+    mins = [round_bound(float(v), math.floor) for v in flat.min(axis=0)]
+    maxs = [round_bound(float(v), math.ceil) for v in flat.max(axis=0)]
+    return mins, maxs
+
+
+def normalize(data, min_values, max_values):
+    mins = np.asarray(min_values, dtype=np.float64)
+    span = np.asarray(max_values, dtype=np.float64) - mins
+    span[span == 0] = 1.0
+    return ((np.asarray(data, dtype=np.float64) - mins) / span).astype(np.float32)
+
+
+# Column order used by create_uv_map: slot i holds vertex order[i] (reversed index order by default)
+def default_vertex_order(num_vertices):
+    return np.arange(num_vertices - 1, -1, -1, dtype=np.int64)
+
+
+# Spatial (Morton / Z-order) vertex order so nearby vertices share nearby columns
+def morton_order(positions, bits=10):
+    positions = np.asarray(positions, dtype=np.float64)
+    lo = positions.min(axis=0)
+    span = positions.max(axis=0) - lo
+    span[span == 0] = 1.0
+    cells = ((positions - lo) / span * ((1 << bits) - 1)).astype(np.uint64)
+
+    code = np.zeros(len(positions), dtype=np.uint64)
+    for bit in range(bits):
+        for axis in range(3):
+            code |= ((cells[:, axis] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(3 * bit + axis)
+    return np.argsort(code, kind='stable')
+
+
+# Connectivity order: breadth-first walk over mesh edges, one island after another
+def topology_order(num_vertices, edges):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    pairs = np.concatenate([edges, edges[:, ::-1]])
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    starts = np.searchsorted(pairs[:, 0], np.arange(num_vertices + 1))
+    neighbors = pairs[:, 1]
+
+    order = np.empty(num_vertices, dtype=np.int64)
+    visited = np.zeros(num_vertices, dtype=bool)
+    count = 0
+    for seed in range(num_vertices):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        order[count] = seed
+        head = count
+        count += 1
+        while head < count:
+            v = order[head]
+            head += 1
+            linked = neighbors[starts[v]:starts[v + 1]]
+            linked = linked[~visited[linked]]
+            visited[linked] = True
+            order[count:count + len(linked)] = linked
+            count += len(linked)
+    return order
+
+
+def fetch_locality(order, edges, width, num_frames):
+    """
+    Estimate vertex-shader fetch locality of a column order: mean texel distance between the
+    columns of vertices sharing an edge (wrap blocks are num_frames rows apart), and the share
+    of edges whose texels land within the same 8-texel span of a row.
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if len(edges) == 0:
+        return {"MeanTexelDistance": 0.0, "NearFetchRatio": 1.0}
+
+    slots = np.empty(len(order), dtype=np.int64)
+    slots[order] = np.arange(len(order))
+    a, b = slots[edges[:, 0]], slots[edges[:, 1]]
+    dx = np.abs(a % width - b % width)
+    dy = np.abs(a // width - b // width) * num_frames
+    near = (dy == 0) & (a % width // 8 == b % width // 8)
+    return {
+        "MeanTexelDistance": float(np.mean(dx + dy)),
+        "NearFetchRatio": float(np.mean(near)),
+    }
+
+
+def layout_rows(frame_data, width, num_wraps, order=None):
+    """
+    Lay out (frames, vertices, channels) data as (num_wraps * frames, width, channels) rows,
+    row = wrap * frames + frame, column = slot % width.
+    """
+    frame_data = np.asarray(frame_data)
+    num_frames, num_vertices, channels = frame_data.shape
+    if order is None:
+        order = default_vertex_order(num_vertices)
+
+    slots = np.zeros((num_frames, num_wraps * width, channels), dtype=frame_data.dtype)
+    slots[:, :num_vertices] = frame_data[:, order]
+    slots = slots.reshape(num_frames, num_wraps, width, channels).transpose(1, 0, 2, 3)
+    return slots.reshape(num_wraps * num_frames, width, channels)
+
+
+# Alpha mask of texels that hold a vertex, in the same row layout
+def layout_mask(num_vertices, num_frames, width, num_wraps):
+    mask = np.zeros((num_wraps, num_frames, width), dtype=np.float32)
+    full_wraps, remainder = divmod(num_vertices, width)
+    mask[:full_wraps] = 1.0
+    if remainder:
+        mask[full_wraps, :, :remainder] = 1.0
+    return mask.reshape(num_wraps * num_frames, width)
+
+
+def frame_bounds(rest, offsets, width, num_wraps, order=None):
+    """
+    Axis-aligned bounds of rest + offsets per frame and per wrap (the vertices of one column block).
+    Returns (frames, 2, 3) and (frames, num_wraps, 2, 3) arrays of [min, max]; empty wraps stay zero.
+    """
+    positions = np.asarray(rest, dtype=np.float32)[None] + np.asarray(offsets, dtype=np.float32)
+    num_frames, num_vertices, _ = positions.shape
+    if order is None:
+        order = default_vertex_order(num_vertices)
+
+    per_frame = np.zeros((num_frames, 2, 3), dtype=np.float32)
+    if num_vertices:
+        per_frame[:, 0] = positions.min(axis=1)
+        per_frame[:, 1] = positions.max(axis=1)
+
+    per_wrap = np.zeros((num_frames, num_wraps, 2, 3), dtype=np.float32)
+    for wrap in range(num_wraps):
+        vertices = order[wrap * width:(wrap + 1) * width]
+        if len(vertices):
+            per_wrap[:, wrap, 0] = positions[:, vertices].min(axis=1)
+            per_wrap[:, wrap, 1] = positions[:, vertices].max(axis=1)
+    return per_frame, per_wrap
+
+
+# Tiny bounds texture, one row per frame: column 0 holds the frame's min, column 1 its max
+def build_bounds_buffer(per_frame, min_values=None, max_values=None):
+    values = np.asarray(per_frame, dtype=np.float32)
+    if min_values is not None:
+        values = normalize(values, min_values, max_values)
+    out = np.ones((values.shape[0], 2, 4), dtype=np.float32)
+    out[:, :, :3] = values
+    return out
+
+
+def build_vat_buffer(positions, width, height, num_wraps, normals=None, order=None, out=None, dtype=np.float32):
+    """
+    Fill an RGBA (height, width, 4) buffer with positions and optionally packed normals.
+    positions and normals are (frames, vertices, 3 or 4) and already in their stored range;
+    3-channel data gets an alpha mask of occupied texels.
+    """
+    num_frames, num_vertices, _ = positions.shape
+    if out is None:
+        out = np.zeros((height, width, 4), dtype=dtype)
+
+    block = num_wraps * num_frames
+    mask = layout_mask(num_vertices, num_frames, width, num_wraps)
+    _write_block(out[:block], positions, width, num_wraps, order, mask)
+
+    if normals is not None:
+        offset = height // 2
+        _write_block(out[offset:offset + block], normals, width, num_wraps, order, mask)
+
+    return out
+
+
+def _write_block(out, data, width, num_wraps, order, mask):
+    channels = data.shape[-1]
+    out[:, :, :channels] = layout_rows(data, width, num_wraps, order)
+    if channels < 4:
+        out[:, :, 3] = mask
+
+
+def encode_normals(normals):
+    return np.asarray(normals, dtype=np.float32) * 0.5 + 0.5
+
+
+# Split (frames, vertices, channels) into groups of up to 4 channels, one group per texture.
+# Groups of fewer than 3 channels are zero-padded to RGB so they keep the occupancy alpha.
+def split_channel_groups(values, channels_per_texture=4):
+    groups = []
+    for first in range(0, values.shape[-1], channels_per_texture):
+        group = values[..., first:first + channels_per_texture]
+        if group.shape[-1] < 3:
+            padding = np.zeros((*group.shape[:-1], 3 - group.shape[-1]), dtype=group.dtype)
+            group = np.concatenate([group, padding], axis=-1)
+        groups.append(group)
+    return groups
+
+
+# Split 0-1 values into a coarse and a fine part for two integer textures of the given bit depth.
+# hi is floored to a multiple of 1 / (2^bits - 1), recombined as value = hi + lo / (2^bits - 1).
+def split_precision(values, bits=16):
+    scale = float(2 ** bits - 1)
+    scaled = np.clip(np.asarray(values, dtype=np.float64), 0.0, 1.0) * scale
+    coarse = np.floor(scaled)
+    return (coarse / scale).astype(np.float32), (scaled - coarse).astype(np.float32)
+
+
+def combine_precision(hi, lo, bits=16):
+    return np.asarray(hi, dtype=np.float64) + np.asarray(lo, dtype=np.float64) / float(2 ** bits - 1)
+
+
+#
+# Velocity - per-vertex motion from finite differences of the sampled positions
+#
+# Central differences over (frames, vertices, 3) positions, scaled by fps to units per second.
+# Looping clips wrap around so the first and last frames difference against each other,
+# otherwise the end frames fall back to one-sided differences. When the last frame repeats the
+# first pose (the usual cyclic setup) the wrap skips that duplicate, else the seam frames
+# would difference against their own pose and play at about half speed.
+def finite_difference_velocity(positions, fps=1.0, loop=False):
+    positions = np.asarray(positions, dtype=np.float32)
+    velocity = np.zeros_like(positions)
+    num_frames = len(positions)
+    if num_frames < 2:
+        return velocity
+    if loop:
+        closed = repeats_first_frame(positions)
+        velocity[1:-1] = positions[2:] - positions[:-2]
+        velocity[0] = positions[1] - positions[-2 if closed else -1]
+        velocity[-1] = positions[1 if closed else 0] - positions[-2]
+        velocity *= 0.5
+    else:
+        velocity[1:-1] = (positions[2:] - positions[:-2]) * 0.5
+        velocity[0] = positions[1] - positions[0]
+        velocity[-1] = positions[-1] - positions[-2]
+    velocity *= fps
+    return velocity
+
+
+def repeats_first_frame(positions, tolerance=1e-6):
+    # Whether the last of (frames, vertices, 3) positions closes the loop on the first pose
+    return len(positions) > 2 and np.allclose(positions[0], positions[-1], rtol=0.0, atol=tolerance)
+
+
+# PCA compression - a mean shape, K basis shapes and per-frame weights instead of one row per frame
+#
+# The (frames, vertices * 3) offset matrix is centered on its mean shape and decomposed through
+# its frames x frames Gram matrix, built a block of columns at a time, so memory stays at the
+# sampled data plus the K shapes even for long clips. Basis shapes are scaled by their singular
+# values and the coefficients are unit-length left singular vectors, both quantize well.
+# Stored frame f decodes as mean + sum_k coefficients[f, k] * basis[k].
+
+def pca_basis(offsets, tolerance, max_components=0, chunk=8192):
+    """
+    Fewest basis shapes whose RMS reconstruction error (per vertex, scene units) is within
+    tolerance, capped at max_components when it is non-zero.
+    Returns (mean (V, 3), basis (K, V, 3), coefficients (F, K), retained energy per K).
+    """
+    offsets = np.asarray(offsets, dtype=np.float32)
+    num_frames, num_vertices = offsets.shape[:2]
+    matrix = offsets.reshape(num_frames, -1)
+    mean = matrix.mean(axis=0, dtype=np.float64)
+
+    gram = np.zeros((num_frames, num_frames), dtype=np.float64)
+    for start in range(0, matrix.shape[1], chunk):
+        block = matrix[:, start:start + chunk] - mean[start:start + chunk]
+        gram += block @ block.T
+
+    eigenvalues, eigenvectors = np.linalg.eigh(gram)
+    eigenvalues = np.clip(eigenvalues[::-1], 0.0, None)
+    eigenvectors = eigenvectors[:, ::-1]
+
+    total = eigenvalues.sum()
+    residual = np.maximum(total - np.cumsum(eigenvalues), 0.0)
+    rms = np.sqrt(residual / max(num_frames * num_vertices, 1))
+    limit = min(max_components, num_frames) if max_components > 0 else num_frames
+    fits = np.flatnonzero(rms[:limit] <= tolerance)
+    components = int(fits[0]) + 1 if len(fits) else limit
+
+    coefficients = eigenvectors[:, :components]
+    basis = np.empty((components, matrix.shape[1]), dtype=np.float32)
+    for start in range(0, matrix.shape[1], chunk):
+        block = matrix[:, start:start + chunk] - mean[start:start + chunk]
+        basis[:, start:start + chunk] = coefficients.T @ block
+
+    energy = np.cumsum(eigenvalues) / total if total > 0 else np.ones(num_frames)
+    return (mean.reshape(num_vertices, 3).astype(np.float32), basis.reshape(components, num_vertices, 3),
+            coefficients.astype(np.float32), energy)
+
+
+# Reference decoder: offsets (frames, vertices, 3) of the given stored frames (all by default)
+def pca_reconstruct(mean, basis, coefficients, frames=None):
+    weights = coefficients if frames is None else coefficients[frames]
+    return mean + np.einsum('fk,kvc->fvc', weights, basis, optimize=True)
+
+
+def pca_error_report(offsets, mean, basis, coefficients, energy=None, chunk_frames=64):
+    """
+    Reconstruction error of a PCA basis against the sampled offsets, decoded a chunk of frames
+    at a time: RMS and max vertex distance overall and the max distance per frame.
+    """
+    offsets = np.asarray(offsets, dtype=np.float32)
+    num_frames, num_vertices = offsets.shape[:2]
+    components = len(basis)
+    frame_max = np.zeros(num_frames, dtype=np.float64)
+    squared = 0.0
+    for start in range(0, num_frames, chunk_frames):
+        frames = np.arange(start, min(start + chunk_frames, num_frames))
+        distance = np.linalg.norm(pca_reconstruct(mean, basis, coefficients, frames) - offsets[frames], axis=-1)
+        frame_max[frames] = distance.max(axis=1) if num_vertices else 0.0
+        squared += float(np.square(distance, dtype=np.float64).sum())
+
+    return {
+        "Components": components,
+        "Frames": num_frames,
+        "Vertices": num_vertices,
+        "RMSError": math.sqrt(squared / max(num_frames * num_vertices, 1)),
+        "MaxError": float(frame_max.max()) if num_frames else 0.0,
+        "MaxErrorFrame": int(frame_max.argmax()) if num_frames else 0,
+        "EnergyRetained": float(energy[components - 1]) if energy is not None and components else None,
+        # Texel rows before and after, per wrap block
+        "CompressionRatio": num_frames / (components + 1),
+        "FrameMaxError": frame_max.tolist(),
+    }
+
+
+# Normal-aware edge splitting - split only edges whose corner normals diverge at some frame
+#
+
+def edge_corner_pairs(loop_vertices, loop_edges, loop_starts, loop_totals, num_edges):
+    """
+    Corners facing each other across every manifold edge. For edge e between faces A and B,
+    corners (E, 2) pairs A's and B's corner at each of the edge's two vertices.
+    Returns (edges, corners_a, corners_b, non_manifold_edges); boundary edges are left out.
+    """
+    loop_vertices = np.asarray(loop_vertices, dtype=np.int64)
+    loop_edges = np.asarray(loop_edges, dtype=np.int64)
+    loop_starts = np.asarray(loop_starts, dtype=np.int64)
+    loop_totals = np.asarray(loop_totals, dtype=np.int64)
+
+    loop_faces = np.repeat(np.arange(len(loop_starts)), loop_totals)
+    offsets = np.arange(len(loop_edges)) - loop_starts[loop_faces]
+    loop_next = loop_starts[loop_faces] + (offsets + 1) % loop_totals[loop_faces]
+
+    counts = np.bincount(loop_edges, minlength=num_edges)
+    by_edge = np.argsort(loop_edges, kind='stable')
+    first = np.searchsorted(loop_edges[by_edge], np.arange(num_edges))
+    edges = np.flatnonzero(counts == 2)
+    l1 = by_edge[first[edges]]
+    l2 = by_edge[first[edges] + 1]
+
+    # Each loop starts at one edge vertex and its next loop holds the other, in either winding
+    same_start = loop_vertices[l2] == loop_vertices[l1]
+    corners_a = np.stack([l1, loop_next[l1]], axis=1)
+    corners_b = np.stack([np.where(same_start, l2, loop_next[l2]), np.where(same_start, loop_next[l2], l2)], axis=1)
+    return edges, corners_a, corners_b, np.flatnonzero(counts > 2)
+
+
+# Smallest cosine between facing corner normals per edge, for one frame of (corners, 3) unit normals
+def edge_normal_agreement(corner_normals, corners_a, corners_b):
+    return np.einsum('ijk,ijk->ij', corner_normals[corners_a], corner_normals[corners_b]).min(axis=1)
+
+
+#
+# Duplicate frames and loops - store each unique frame once and map playback frames onto them
+#
+
+def find_unique_frames(frame_data, tolerance=0.0):
+    """
+    Compare frames of (frames, vertices, channels) data and collapse repeats within tolerance.
+    Returns (unique frame indices, frame map) where frame_map[f] indexes the unique frames.
+    """
+    frame_data = np.asarray(frame_data)
+    num_frames = frame_data.shape[0]
+    flat = frame_data.reshape(num_frames, -1)
+    # Per-frame channel means: two frames within tolerance always have means within tolerance
+    signatures = frame_data.reshape(num_frames, -1, frame_data.shape[-1]).mean(axis=1)
+
+    unique = []
+    buckets = {}
+    frame_map = np.zeros(num_frames, dtype=np.int64)
+    for f in range(num_frames):
+        key = flat[f].tobytes()
+        match = buckets.get(key)
+
+        if match is None and unique:
+            close = np.max(np.abs(signatures[unique] - signatures[f]), axis=1) <= tolerance
+            for u in np.flatnonzero(close):
+                if np.max(np.abs(flat[f] - flat[unique[u]])) <= tolerance:
+                    match = int(u)
+                    break
+
+        if match is None:
+            match = len(unique)
+            unique.append(f)
+        buckets[key] = match
+        frame_map[f] = match
+
+    return np.array(unique, dtype=np.int64), frame_map
+
+
+def detect_loop(unique_frames, frame_map):
+    # A loop is a tail of frames that replays an earlier contiguous run of unique frames
+    num_frames = len(frame_map)
+    introduced = np.zeros(num_frames, dtype=bool)
+    introduced[unique_frames] = True
+    new_frames = np.flatnonzero(introduced)
+    tail_start = int(new_frames[-1]) + 1 if len(new_frames) else 0
+    tail = frame_map[tail_start:]
+    if len(tail) == 0 or not np.array_equal(tail, np.arange(tail[0], tail[0] + len(tail))):
+        return None
+    return {
+        "Start": tail_start,
+        "Source": int(unique_frames[tail[0]]),
+        "Length": len(tail),
+    }
+
+
+#
+# Rigid pieces - one transform per connected component instead of one position per vertex
+#
+
+def connected_components(num_vertices, edges):
+    # Compact piece label per vertex, pieces numbered by their lowest vertex index.
+    # scipy's csgraph when it is installed, otherwise vectorized label propagation over the edge array
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    try:
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components as csgraph_components
+    except ImportError:
+        csgraph_components = None
+
+    if csgraph_components is not None:
+        graph = coo_matrix((np.ones(len(edges), dtype=np.int8), (edges[:, 0], edges[:, 1])), shape=(num_vertices, num_vertices))
+        count, components = csgraph_components(graph, directed=False)
+        roots = np.full(count, num_vertices, dtype=np.int64)
+        np.minimum.at(roots, components, np.arange(num_vertices, dtype=np.int64))
+        roots = roots[components]
+    else:
+        # Label propagation on roots: the higher root of every edge joining two trees takes the
+        # lower root, pointer jumping flattens the trees, and edges inside one tree are dropped
+        roots = np.arange(num_vertices, dtype=np.int64)
+        a, b = edges[:, 0], edges[:, 1]
+        while len(a):
+            ra, rb = roots[a], roots[b]
+            crossing = ra != rb
+            a, b, ra, rb = a[crossing], b[crossing], ra[crossing], rb[crossing]
+            if not len(a):
+                break
+            np.minimum.at(roots, np.maximum(ra, rb), np.minimum(ra, rb))
+            while True:
+                jumped = roots[roots]
+                if np.array_equal(jumped, roots):
+                    break
+                roots = jumped
+
+    _, labels = np.unique(roots, return_inverse=True)
+    return labels
+
+
+def _matrices_to_quaternions(m):
+    # (n, 3, 3) rotation matrices to (n, 4) quaternions in x, y, z, w order
+    w = np.sqrt(np.maximum(0.0, 1.0 + m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2])) / 2
+    x = np.sqrt(np.maximum(0.0, 1.0 + m[:, 0, 0] - m[:, 1, 1] - m[:, 2, 2])) / 2
+    y = np.sqrt(np.maximum(0.0, 1.0 - m[:, 0, 0] + m[:, 1, 1] - m[:, 2, 2])) / 2
+    z = np.sqrt(np.maximum(0.0, 1.0 - m[:, 0, 0] - m[:, 1, 1] + m[:, 2, 2])) / 2
+    x = np.copysign(x, m[:, 2, 1] - m[:, 1, 2])
+    y = np.copysign(y, m[:, 0, 2] - m[:, 2, 0])
+    z = np.copysign(z, m[:, 1, 0] - m[:, 0, 1])
+    quats = np.stack([x, y, z, w], axis=-1)
+    return quats / np.linalg.norm(quats, axis=-1, keepdims=True)
+
+
+def solve_rigid_transforms(rest, positions, labels):
+    """
+    Fit one rotation + translation per piece per frame (Kabsch), so that
+    positions[f, v] ~= R[f, labels[v]] @ rest[v] + t[f, labels[v]].
+    Returns (quaternions (F, P, 4) xyzw, translations (F, P, 3), max error per piece (P,)).
+    """
+    rest = np.asarray(rest, dtype=np.float64)
+    num_pieces = int(labels.max()) + 1 if len(labels) else 0
+    counts = np.bincount(labels, minlength=num_pieces).astype(np.float64)[:, None]
+
+    rest_center = np.zeros((num_pieces, 3))
+    np.add.at(rest_center, labels, rest)
+    rest_center /= counts
+    rest_local = rest - rest_center[labels]
+
+    num_frames = positions.shape[0]
+    quats = np.empty((num_frames, num_pieces, 4), dtype=np.float32)
+    translations = np.empty((num_frames, num_pieces, 3), dtype=np.float32)
+    max_error = np.zeros(num_pieces)
+
+    for f in range(num_frames):
+        current = np.asarray(positions[f], dtype=np.float64)
+        center = np.zeros((num_pieces, 3))
+        np.add.at(center, labels, current)
+        center /= counts
+
+        covariance = np.zeros((num_pieces, 3, 3))
+        np.add.at(covariance, labels, rest_local[:, :, None] * (current - center[labels])[:, None, :])
+        u, _, vt = np.linalg.svd(covariance)
+        v = np.transpose(vt, (0, 2, 1))
+        ut = np.transpose(u, (0, 2, 1))
+        correction = np.tile(np.eye(3), (num_pieces, 1, 1))
+        correction[:, 2, 2] = np.where(np.linalg.det(v @ ut) < 0, -1.0, 1.0)
+        rotation = v @ correction @ ut
+
+        translation = center - np.einsum('pij,pj->pi', rotation, rest_center)
+        fitted = np.einsum('vij,vj->vi', rotation[labels], rest) + translation[labels]
+        np.maximum.at(max_error, labels, np.linalg.norm(fitted - current, axis=-1))
+
+        q = _matrices_to_quaternions(rotation)
+        if f > 0:
+            # Keep quaternion signs continuous so interpolated playback takes the short path
+            q[np.sum(q * quats[f - 1], axis=-1) < 0] *= -1
+        quats[f] = q
+        translations[f] = translation
+
+    return quats, translations, max_error
+
+
+# Skinning decomposition - a few virtual bones with per-vertex weights instead of per-vertex rows
+#
+# Smooth skinning decomposition in the spirit of SSDR: vertices are clustered by their
+# trajectories, then bone transforms and sparse, non-negative, normalized weights are refined in
+# turn. Vertex v at frame f decodes with linear blend skinning as
+#   sum_k weights[v, k] * (R[f, indices[v, k]] @ rest[v] + t[f, indices[v, k]]).
+
+def _nearest_centers(features, centers, chunk=4096):
+    # Index of the closest center per row, one (chunk, centers) distance block at a time
+    labels = np.empty(len(features), dtype=np.int64)
+    center_norms = np.einsum('cd,cd->c', centers, centers)
+    for start in range(0, len(features), chunk):
+        block = features[start:start + chunk]
+        labels[start:start + chunk] = np.argmin(center_norms[None] - 2.0 * block @ centers.T, axis=1)
+    return labels
+
+
+def _trajectory_clusters(rest, positions, num_clusters, iterations=10, max_frames=32):
+    # k-means over vertex trajectories on a subset of frames, seeded by farthest point sampling
+    step = max(1, len(positions) // max_frames)
+    features = np.concatenate([rest[:, None], np.transpose(positions[::step], (1, 0, 2))], axis=1).reshape(len(rest), -1)
+    centers = [features[0]]
+    distance = np.linalg.norm(features - centers[0], axis=1)
+    for _ in range(1, num_clusters):
+        centers.append(features[int(distance.argmax())])
+        distance = np.minimum(distance, np.linalg.norm(features - centers[-1], axis=1))
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        labels = _nearest_centers(features, centers)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, features)
+        counts = np.bincount(labels, minlength=num_clusters)
+        occupied = counts > 0
+        centers[occupied] = sums[occupied] / counts[occupied, None]
+    return _nearest_centers(features, centers)
+
+
+def _fit_bone(rest, targets, weights):
+    """
+    Rotations (F, 3, 3) and translations (F, 3) minimizing sum_v |w_v (R rest_v + t) - q_fv|^2,
+    the weighted Procrustes step of SSDR, for targets q (F, V, 3) and weights w (V,).
+    """
+    squared = np.dot(weights, weights)
+    rest_center = (weights ** 2) @ rest / squared
+    target_center = np.einsum('v,fvi->fi', weights, targets) / squared
+    local = weights[:, None] * (rest - rest_center)
+    covariance = np.einsum('vi,fvj->fij', local, targets - weights[None, :, None] * target_center[:, None])
+    u, _, vt = np.linalg.svd(covariance)
+    v = np.transpose(vt, (0, 2, 1))
+    ut = np.transpose(u, (0, 2, 1))
+    correction = np.tile(np.eye(3), (len(targets), 1, 1))
+    correction[:, 2, 2] = np.where(np.linalg.det(v @ ut) < 0, -1.0, 1.0)
+    rotations = v @ correction @ ut
+    return rotations, target_center - np.einsum('fij,j->fi', rotations, rest_center)
+
+
+def skinning_reconstruct(rest, rotations, translations, indices, weights, frames=None, vertex_chunk=4096, frame_chunk=16):
+    """Reference decoder: linear blend skinned positions (frames, vertices, 3) of the given frames"""
+    if frames is not None:
+        rotations, translations = rotations[frames], translations[frames]
+    num_frames, num_vertices = len(rotations), len(rest)
+    positions = np.zeros((num_frames, num_vertices, 3))
+    # Blocks of frames and vertices keep the gathered per-vertex rotations small
+    for start in range(0, num_vertices, vertex_chunk):
+        vertices = slice(start, min(start + vertex_chunk, num_vertices))
+        for first in range(0, num_frames, frame_chunk):
+            block = slice(first, min(first + frame_chunk, num_frames))
+            out = positions[block, vertices]
+            for k in range(indices.shape[1]):
+                bone = indices[vertices, k]
+                posed = np.einsum('fvij,vj->fvi', rotations[block][:, bone], rest[vertices]) + translations[block][:, bone]
+                out += weights[None, vertices, k, None] * posed
+    return positions
+
+
+def _solve_weights(rest, positions, rotations, translations, influences, chunk=256):
+    # Per vertex: the bones that fit best alone, then least squares weights that sum to one,
+    # dropping negative weights until all are non-negative
+    num_vertices = len(rest)
+    num_bones = rotations.shape[1]
+    indices = np.empty((num_vertices, influences), dtype=np.int64)
+    weights = np.empty((num_vertices, influences))
+    for start in range(0, num_vertices, chunk):
+        vertices = slice(start, min(start + chunk, num_vertices))
+        target = np.transpose(positions[:, vertices], (1, 0, 2)).reshape(-1, 1, len(positions) * 3)
+        predicted = np.einsum('fbij,vj->vbfi', rotations, rest[vertices]) + np.transpose(translations, (1, 0, 2))[None]
+        predicted = predicted.reshape(len(target), num_bones, -1)
+        best = np.argsort(np.linalg.norm(predicted - target, axis=-1), axis=1)[:, :influences]
+        basis = np.take_along_axis(predicted, best[:, :, None], axis=1)
+
+        gram = basis @ np.transpose(basis, (0, 2, 1))
+        rhs = (basis @ np.transpose(target, (0, 2, 1)))[..., 0]
+        scale = np.trace(gram, axis1=1, axis2=2)[:, None, None] / influences + 1e-12
+        active = np.ones((len(target), influences), dtype=bool)
+        for _ in range(influences):
+            # Equality-constrained least squares, inactive bones pinned to zero by a large penalty
+            system = np.zeros((len(target), influences + 1, influences + 1))
+            system[:, :influences, :influences] = gram + np.eye(influences) * scale * (1e-9 + 1e9 * ~active[:, None, :] * np.eye(influences))
+            system[:, :influences, influences] = 1.0
+            system[:, influences, :influences] = 1.0
+            solution = np.linalg.solve(system, np.concatenate([rhs, np.ones((len(target), 1))], axis=1)[..., None])[..., 0]
+            w = np.where(active, solution[:, :influences], 0.0)
+            negative = w < 0
+            if not negative.any():
+                break
+            active &= ~negative
+        w = np.clip(w, 0.0, None)
+        w /= np.maximum(w.sum(axis=1, keepdims=True), 1e-12)
+        indices[vertices] = best
+        weights[vertices] = w
+    return indices, weights
+
+
+def fit_skinning(rest, positions, num_bones, influences=4, iterations=10):
+    """
+    Fit num_bones virtual bones and up to influences weights per vertex to the animation
+    positions (F, V, 3) of rest (V, 3).
+    Returns (rotations (F, B, 3, 3), translations (F, B, 3), indices (V, K), weights (V, K)).
+    """
+    rest = np.asarray(rest, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    num_frames, num_vertices = positions.shape[:2]
+    num_bones = max(1, min(num_bones, num_vertices))
+    influences = max(1, min(influences, num_bones))
+
+    labels = _trajectory_clusters(rest, positions, num_bones)
+    rotations = np.tile(np.eye(3), (num_frames, num_bones, 1, 1))
+    translations = np.zeros((num_frames, num_bones, 3))
+    for bone in range(num_bones):
+        members = labels == bone
+        if members.any():
+            rotations[:, bone], translations[:, bone] = _fit_bone(rest[members], positions[:, members], np.ones(members.sum()))
+
+    for _ in range(iterations):
+        indices, weights = _solve_weights(rest, positions, rotations, translations, influences)
+        dense = np.zeros((num_vertices, num_bones))
+        np.put_along_axis(dense, indices, weights, axis=1)
+        skinned = skinning_reconstruct(rest, rotations, translations, indices, weights)
+        for bone in range(num_bones):
+            support = np.flatnonzero(dense[:, bone] > 1e-6)
+            if len(support) == 0:
+                continue
+            w = dense[support, bone]
+            own = w[None, :, None] * (np.einsum('fij,vj->fvi', rotations[:, bone], rest[support]) + translations[:, None, bone])
+            targets = positions[:, support] - skinned[:, support] + own
+            rotations[:, bone], translations[:, bone] = _fit_bone(rest[support], targets, w)
+            skinned[:, support] += w[None, :, None] * (np.einsum('fij,vj->fvi', rotations[:, bone], rest[support]) + translations[:, None, bone]) - own
+
+    indices, weights = _solve_weights(rest, positions, rotations, translations, influences)
+    return rotations, translations, indices, weights
+
+
+# Quaternions (F, B, 4) xyzw of bone rotations, signs kept continuous over frames like rigid pieces
+def rotations_to_quaternions(rotations):
+    num_frames, num_bones = rotations.shape[:2]
+    quats = _matrices_to_quaternions(rotations.reshape(-1, 3, 3)).reshape(num_frames, num_bones, 4).astype(np.float32)
+    for f in range(1, num_frames):
+        quats[f][np.sum(quats[f] * quats[f - 1], axis=-1) < 0] *= -1
+    return quats
+
+
+def skinning_error_report(rest, positions, rotations, translations, indices, weights, chunk_frames=64):
+    """Vertex distance between the skinned reconstruction and the sampled positions"""
+    positions = np.asarray(positions, dtype=np.float64)
+    num_frames, num_vertices = positions.shape[:2]
+    frame_max = np.zeros(num_frames)
+    squared = 0.0
+    for start in range(0, num_frames, chunk_frames):
+        frames = np.arange(start, min(start + chunk_frames, num_frames))
+        distance = np.linalg.norm(skinning_reconstruct(rest, rotations, translations, indices, weights, frames) - positions[frames], axis=-1)
+        frame_max[frames] = distance.max(axis=1) if num_vertices else 0.0
+        squared += float(np.square(distance).sum())
+    return {
+        "Bones": rotations.shape[1],
+        "Influences": indices.shape[1],
+        "Frames": num_frames,
+        "Vertices": num_vertices,
+        "RMSError": math.sqrt(squared / max(num_frames * num_vertices, 1)),
+        "MaxError": float(frame_max.max()) if num_frames else 0.0,
+        "MaxErrorFrame": int(frame_max.argmax()) if num_frames else 0,
+        "FrameMaxError": frame_max.tolist(),
+    }
+
+
+#
+# Raw outputs - the texel buffer as-is, loadable with a single read or mmap
+#
+
+KTX2_IDENTIFIER = b"\xabKTX 20\xbb\r\n\x1a\n"
+KTX2_VK_FORMATS = {
+    np.dtype(np.float16): 97,   # VK_FORMAT_R16G16B16A16_SFLOAT
+    np.dtype(np.float32): 109,  # VK_FORMAT_R32G32B32A32_SFLOAT
+}
+
+
+def _ktx2_dfd(type_size):
+    # Basic data format descriptor for an unpacked linear RGBA float format
+    samples = b""
+    for i, channel in enumerate((0, 1, 2, 15)):
+        samples += struct.pack(
+            "<HBBIII",
+            i * type_size * 8,
+            type_size * 8 - 1,
+            channel | 0x80 | 0x40,  # float, signed
+            0,
+            0xBF800000,
+            0x3F800000,
+        )
+    block_size = 24 + len(samples)
+    block = struct.pack("<IIBBBB4B8B", 0, (block_size << 16) | 2, 1, 1, 1, 0, 0, 0, 0, 0,
+                        type_size * 4, 0, 0, 0, 0, 0, 0, 0) + samples
+    return struct.pack("<I", 4 + len(block)) + block
+
+
+def _ktx2_header(width, height, dtype):
+    dtype = np.dtype(dtype)
+    type_size = dtype.itemsize
+    dfd = _ktx2_dfd(type_size)
+    level_size = width * height * 4 * type_size
+
+    dfd_offset = 12 + 9 * 4 + 4 * 4 + 2 * 8 + 3 * 8
+    data_offset = dfd_offset + len(dfd)
+    data_offset += (-data_offset) % 16
+
+    header = KTX2_IDENTIFIER
+    header += struct.pack("<9I", KTX2_VK_FORMATS[dtype], type_size, width, height, 0, 0, 1, 1, 0)
+    header += struct.pack("<IIIIQQ", dfd_offset, len(dfd), 0, 0, 0, 0)
+    header += struct.pack("<QQQ", data_offset, level_size, level_size)
+    header += dfd
+    return header.ljust(data_offset, b"\0")
+
+
+def open_raw_output(filepath, container, width, height, dtype, resume=False):
+    """
+    Create the raw output file and return a writable (height, width, 4) memmap of its texels.
+    With resume, an existing file of the same layout is reopened as-is.
+    """
+    shape = (height, width, 4)
+    if container == 'RAW_NPY':
+        if resume:
+            return np.load(filepath, mmap_mode='r+')
+        return np.lib.format.open_memmap(filepath, mode='w+', dtype=dtype, shape=shape)
+
+    if container == 'KTX2':
+        header = _ktx2_header(width, height, dtype)
+        if not resume:
+            with open(filepath, 'wb') as f:
+                f.write(header)
+        return np.memmap(filepath, dtype=dtype, mode='r+', offset=len(header), shape=shape)
+
+    return np.memmap(filepath, dtype=dtype, mode='r+' if resume else 'w+', shape=shape)
+
+
+def write_frame_rows(out, chunk, frame_offset, num_frames, width, num_wraps, order=None, row_offset=0):
+    """
+    Write a chunk of consecutive frames (chunk_frames, vertices, channels) into its rows of
+    a full-size VAT buffer, used by streaming encodes that never hold every frame at once.
+    """
+    count, num_vertices, channels = chunk.shape
+    rows = layout_rows(chunk, width, num_wraps, order)
+    mask = layout_mask(num_vertices, count, width, num_wraps)
+    for wrap in range(num_wraps):
+        start = row_offset + wrap * num_frames + frame_offset
+        out[start:start + count, :, :channels] = rows[wrap * count:(wrap + 1) * count]
+        if channels < 4:
+            out[start:start + count, :, 3] = mask[wrap * count:(wrap + 1) * count]
+
+
+def normalize_rows(out, start, stop, min_values, max_values, source=None):
+    # Remap of occupied texels (alpha > 0) in rows [start, stop), read from source (default: in
+    # place) and written to out, empty texels stay zero
+    block = np.array((out if source is None else source)[start:stop], dtype=np.float32)
+    occupied = (block[:, :, 3:4] > 0).astype(np.float32)
+    block[:, :, :3] = normalize(block[:, :, :3], min_values, max_values) * occupied
+    out[start:stop] = block
+
+
+def write_raw_vat(filepath, container, buffer, dtype):
+    height, width, _ = buffer.shape
+    out = open_raw_output(filepath, container, width, height, dtype)
+    out[:] = buffer
+    out.flush()
+    del out
@@ -0,0 +1,105 @@
+# OpenVAT events - machine-readable progress stream for pipeline tooling
+#
+# Every event is one json object per line: {"time", "event", "encode", ...fields}.
+# Events go to any mix of sinks (a .jsonl file, stdout or python callbacks). With no sinks
+# configured emitting is a no-op, so the encoder calls these helpers unconditionally.
+#
+#   encode_start / encode_end   {"status", "duration", "message" on failure}
+#   stage_start / stage_end     {"stage", "duration"}
+#   progress                    {"stage", "done", "total", "fps"}
+#   output                      {"path", "bytes"}
+#   error                       {"message", "stage"}
+#
+# Nothing here imports bpy.
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+_callbacks = []
+_state = {"sinks": [], "encode": None, "started": None, "stages": {}}
+
+
+# Python callbacks receive every event dict, registered independently of the file/stdout sinks
+def add_callback(callback):
+    if callback not in _callbacks:
+        _callbacks.append(callback)
+
+
+def remove_callback(callback):
+    if callback in _callbacks:
+        _callbacks.remove(callback)
+
+
+def _file_sink(filepath):
+    def write(line):
+        with open(filepath, 'a') as f:
+            f.write(line + "\n")
+    return write
+
+
+def _stdout_sink(line):
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def begin(encode_name, filepath=None, stdout=False, **fields):
+    # Start an encode: configure sinks and emit encode_start
+    sinks = []
+    if filepath:
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+        sinks.append(_file_sink(filepath))
+    if stdout:
+        sinks.append(_stdout_sink)
+    _state.update(sinks=sinks, encode=encode_name, started=time.time(), stages={})
+    emit("encode_start", **fields)
+
+
+def end(status="FINISHED", **fields):
+    if _state["encode"] is None:
+        return
+    emit("encode_end", status=status, duration=round(time.time() - _state["started"], 4), **fields)
+    _state.update(sinks=[], encode=None, started=None, stages={})
+
+
+def emit(event, **fields):
+    if not _state["sinks"] and not _callbacks:
+        return
+    data = {"time": round(time.time(), 4), "event": event, "encode": _state["encode"]}
+    data.update(fields)
+    line = json.dumps(data, default=str)
+    for sink in _state["sinks"]:
+        sink(line)
+    for callback in list(_callbacks):
+        callback(data)
+
+
+@contextmanager
+def stage(name, **fields):
+    # stage_start/stage_end around a block, an exception also emits an error for the stage
+    _state["stages"][name] = time.time()
+    emit("stage_start", stage=name, **fields)
+    try:
+        yield
+    except Exception as exception:
+        error(str(exception), stage=name)
+        raise
+    finally:
+        emit("stage_end", stage=name, duration=round(time.time() - _state["stages"].pop(name, time.time()), 4))
+
+
+def progress(stage_name, done, total):
+    # Frames (or chunks) done of total, throughput measured from the start of the stage
+    started = _state["stages"].get(stage_name)
+    elapsed = time.time() - started if started else 0.0
+    emit("progress", stage=stage_name, done=int(done), total=int(total), fps=round(done / elapsed, 3) if elapsed > 0 else None)
+
+
+def output(filepath):
+    emit("output", path=os.path.abspath(filepath), bytes=os.path.getsize(filepath) if os.path.exists(filepath) else None)
+
+
+def error(message, stage=None):
+    emit("error", message=message, stage=stage)
@@ -0,0 +1,313 @@
+# OpenVAT farm encoding - split one encode's frame range across several nodes
+#
+# The planning node writes a job spec (json) describing the full VAT layout, with the edge
+# split and vertex order it computed once, and one frame slice per job. Each node opens the same .blend in Blender, samples its slice and writes the
+# raw per-frame data with its partial bounds. The merge step combines the partial bounds and
+# assembles the VAT and sidecar from the job files without evaluating any frame, producing
+# the same output as a single-node sampled encode. Nothing here imports bpy; merging raw
+# outputs also works from a plain Python shell:
+#
+#   python farm.py merge <spec.json>
+#   python farm.py local <spec.json> --blender <blender executable>
+
+import json
+import math
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+try:
+    from . import encoding, events, sidecar
+except ImportError:
+    import encoding
+    import events
+    import sidecar
+
+SPEC_VERSION = 1
+
+
+def plan_jobs(frame_start, frame_end, num_jobs):
+    # Contiguous, near-equal frame slices, never more jobs than frames
+    num_frames = frame_end - frame_start + 1
+    num_jobs = max(1, min(num_jobs, num_frames))
+    size = math.ceil(num_frames / num_jobs)
+    jobs = []
+    for index, first in enumerate(range(0, num_frames, size)):
+        last = min(first + size, num_frames) - 1
+        jobs.append({
+            "Index": index,
+            "FrameStart": frame_start + first,
+            "FrameEnd": frame_start + last,
+            "Output": f"job_{index:04d}.npz",
+        })
+    return jobs
+
+
+def make_job_spec(blend_path, target, proxy, name, frame_start, frame_end, num_jobs, vertex_count,
+                  width, height, num_wraps, normal_encoding, output_format, image_format,
+                  raw_precision, remapped, header=True, header_json=False, frame_bounds=False,
+                  wrap_bounds=False, bounds_texture=False, order_file=None, rest_file=None, split_file=None):
+    return {
+        "Version": SPEC_VERSION,
+        "Blend": blend_path,
+        "Target": target,
+        "Proxy": proxy,
+        "Name": name,
+        "FrameStart": int(frame_start),
+        "FrameEnd": int(frame_end),
+        "Vertices": int(vertex_count),
+        "Width": int(width),
+        "Height": int(height),
+        "Wraps": int(num_wraps),
+        "NormalEncoding": normal_encoding,
+        "OutputFormat": output_format,
+        "ImageFormat": image_format,
+        "RawPrecision": raw_precision,
+        "Remapped": bool(remapped),
+        "Header": bool(header),
+        "HeaderJson": bool(header_json),
+        "FrameBounds": bool(frame_bounds),
+        "WrapBounds": bool(wrap_bounds),
+        "BoundsTexture": bool(bounds_texture),
+        "Order": order_file,
+        "Rest": rest_file,
+        "SplitEdges": split_file,
+        "Jobs": plan_jobs(frame_start, frame_end, num_jobs),
+    }
+
+
+def write_job_spec(spec, filepath):
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'w') as f:
+        json.dump(spec, f, indent=4)
+
+
+def read_job_spec(filepath):
+    with open(filepath, 'r') as f:
+        spec = json.load(f)
+    if spec.get("Version", 0) > SPEC_VERSION:
+        raise ValueError(f"Unsupported OpenVAT job spec version {spec['Version']}")
+    return spec
+
+
+def _spec_path(spec_path, filename):
+    return os.path.join(os.path.dirname(os.path.abspath(spec_path)), filename)
+
+
+def load_spec_array(spec_path, spec, key):
+    if not spec.get(key):
+        return None
+    return np.load(_spec_path(spec_path, spec[key]))
+
+
+def write_job_result(spec_path, job_index, values, normals=None):
+    """
+    Write one job's sampled offsets (frames, vertices, 3), optional normals and partial
+    per-channel bounds. The file is renamed into place once complete so merges never see
+    half-written jobs.
+    """
+    spec = read_job_spec(spec_path)
+    job = spec["Jobs"][job_index]
+    expected = (job["FrameEnd"] - job["FrameStart"] + 1, spec["Vertices"], 3)
+    if values.shape != expected:
+        raise ValueError(f"Job {job_index} sampled {values.shape}, spec expects {expected}")
+
+    flat = values.reshape(-1, 3)
+    arrays = {
+        "values": values.astype(np.float32),
+        "min": flat.min(axis=0),
+        "max": flat.max(axis=0),
+    }
+    if normals is not None:
+        arrays["normals"] = normals.astype(np.float32)
+
+    output_path = _spec_path(spec_path, job["Output"])
+    partial_path = output_path + ".partial.npz"
+    np.savez(partial_path, **arrays)
+    os.replace(partial_path, output_path)
+    return output_path
+
+
+def job_status(spec_path):
+    # (finished, missing) job indices
+    spec = read_job_spec(spec_path)
+    finished, missing = [], []
+    for job in spec["Jobs"]:
+        (finished if os.path.exists(_spec_path(spec_path, job["Output"])) else missing).append(job["Index"])
+    return finished, missing
+
+
+def merge_jobs(spec_path, output_dir=None, write_buffer=None):
+    """
+    Assemble the VAT, remap json and sidecar header from finished jobs into output_dir.
+    write_buffer(buffer, output_path_without_extension) writes image outputs and is supplied
+    by Blender; raw outputs are written here directly. Returns the VAT output path.
+    """
+    spec = read_job_spec(spec_path)
+    finished, missing = job_status(spec_path)
+    if missing:
+        raise RuntimeError(f"Jobs not finished: {', '.join(str(i) for i in missing)}")
+    if spec["OutputFormat"] == 'IMAGE' and write_buffer is None:
+        raise ValueError("Image outputs are written by Blender, merge from the OpenVAT panel or plan with a raw output format")
+
+    # The spec lives in <name>_vat/farm/, outputs go next to it in <name>_vat/ unless redirected
+    if output_dir is None:
+        output_dir = os.path.dirname(os.path.dirname(os.path.abspath(spec_path)))
+    os.makedirs(output_dir, exist_ok=True)
+    name = spec["Name"]
+
+    def write(buffer, path):
+        if write_buffer is not None:
+            return write_buffer(buffer, path)
+        container = spec["OutputFormat"]
+        path += encoding.RAW_EXTENSIONS[container]
+        encoding.write_raw_vat(path, container, buffer, encoding.RAW_DTYPES[spec["RawPrecision"]])
+        events.output(path)
+        return path
+
+    # Global bounds from the partial ones, rounded exactly like a single-node remap
+    raw_min = raw_max = None
+    for job in spec["Jobs"]:
+        with np.load(_spec_path(spec_path, job["Output"])) as data:
+            raw_min = data["min"] if raw_min is None else np.minimum(raw_min, data["min"])
+            raw_max = data["max"] if raw_max is None else np.maximum(raw_max, data["max"])
+    min_values = [encoding.round_bound(float(v), math.floor) for v in raw_min]
+    max_values = [encoding.round_bound(float(v), math.ceil) for v in raw_max]
+
+    width, height, num_wraps = spec["Width"], spec["Height"], spec["Wraps"]
+    num_frames = spec["FrameEnd"] - spec["FrameStart"] + 1
+    normal_encoding = spec["NormalEncoding"]
+    order = load_spec_array(spec_path, spec, "Order")
+    rest = load_spec_array(spec_path, spec, "Rest") if spec["FrameBounds"] else None
+
+    buffer = np.zeros((height, width, 4), dtype=np.float32)
+    normal_buffer = np.zeros_like(buffer) if normal_encoding == 'SEPARATE' else None
+    per_frame = np.zeros((num_frames, 2, 3), dtype=np.float32)
+    per_wrap = np.zeros((num_frames, num_wraps, 2, 3), dtype=np.float32)
+
+    for job in spec["Jobs"]:
+        first = job["FrameStart"] - spec["FrameStart"]
+        with np.load(_spec_path(spec_path, job["Output"])) as data:
+            values = data["values"]
+            if rest is not None:
+                frames = slice(first, first + len(values))
+                per_frame[frames], per_wrap[frames] = encoding.frame_bounds(rest, values, width, num_wraps, order)
+            if spec["Remapped"]:
+                values = encoding.normalize(values, min_values, max_values)
+            encoding.write_frame_rows(buffer, values, first, num_frames, width, num_wraps, order)
+
+            if "normals" in data and normal_encoding != 'NONE':
+                normals = encoding.encode_normals(data["normals"])
+                if normal_encoding == 'PACKED':
+                    encoding.write_frame_rows(buffer, normals, first, num_frames, width, num_wraps, order, row_offset=height // 2)
+                else:
+                    encoding.write_frame_rows(normal_buffer, normals, first, num_frames, width, num_wraps, order)
+
+    vat_path = write(buffer, os.path.join(output_dir, f"{name}_vat"))
+    if normal_buffer is not None:
+        write(normal_buffer, os.path.join(output_dir, f"{name}_vnrm"))
+
+    remap_info = {"os-remap": {"Min": min_values, "Max": max_values, "Frames": num_frames}}
+    if rest is not None:
+        bounds_min, bounds_max = encoding.channel_bounds(per_frame.reshape(-1, 3))
+        remap_info["frame-bounds"] = {
+            "Min": bounds_min,
+            "Max": bounds_max,
+            "Frames": num_frames,
+            "Bounds": per_frame.reshape(-1, 6).tolist(),
+        }
+        if spec["BoundsTexture"]:
+            bounds_buffer = encoding.build_bounds_buffer(per_frame, bounds_min, bounds_max) if spec["Remapped"] else encoding.build_bounds_buffer(per_frame)
+            write(bounds_buffer, os.path.join(output_dir, f"{name}_bnds"))
+    with open(os.path.join(output_dir, f"{name}-remap_info.json"), 'w') as f:
+        json.dump(remap_info, f, indent=4)
+
+    if spec["Header"]:
+        texel_format = spec["ImageFormat"]
+        if spec["OutputFormat"] != 'IMAGE':
+            texel_format = 'RAW16' if spec["RawPrecision"] == 'HALF' else 'RAW32'
+        vat_info = sidecar.make_vat_info(
+            spec["FrameStart"], num_frames, spec["Vertices"], width, height, num_wraps,
+            normal_encoding, texel_format, 'DEFAULT', min_values, max_values,
+            remapped=spec["Remapped"],
+        )
+        if rest is not None:
+            vat_info["Tables"]["FBND"] = (24, per_frame.astype("<f4").tobytes())
+            if spec["WrapBounds"]:
+                vat_info["Tables"]["WBND"] = (24, per_wrap.astype("<f4").tobytes())
+        sidecar.write_vat_header(vat_info, os.path.join(output_dir, f"{name}-vat_info.bin"))
+        if spec["HeaderJson"]:
+            sidecar.write_vat_info_json(vat_info, os.path.join(output_dir, f"{name}-vat_info.json"))
+
+    print(f"Merged {len(spec['Jobs'])} jobs into {vat_path}")
+    return vat_path
+
+
+# Command line for one node: sample a job in a background Blender with the add-on enabled
+def job_command(spec_path, job_index, blender="blender"):
+    spec = read_job_spec(spec_path)
+    expression = f"import bpy; bpy.ops.object.run_vat_farm_job(spec_path={os.path.abspath(spec_path)!r}, job_index={job_index})"
+    return [blender, "--background", spec["Blend"], "--python-expr", expression]
+
+
+def run_local(spec_path, blender="blender", max_processes=None):
+    """
+    Run every unfinished job as a local background Blender process (standing in for farm
+    nodes), then merge. Returns the merged VAT path.
+    """
+    _, missing = job_status(spec_path)
+    max_processes = max_processes or os.cpu_count() or 1
+    running = []
+    for job_index in missing:
+        if len(running) >= max_processes:
+            running.pop(0).wait()
+        running.append(subprocess.Popen(job_command(spec_path, job_index, blender)))
+    for process in running:
+        process.wait()
+    return merge_jobs(spec_path)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="OpenVAT farm encoding")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge = commands.add_parser("merge", help="Assemble the VAT and sidecar from finished jobs")
+    merge.add_argument("spec")
+    merge.add_argument("--output", default=None, help="Output directory (defaults to the <name>_vat directory holding the farm folder)")
+    merge.add_argument("--events", default=None, help="Append merge events as JSON lines to this file")
+    merge.add_argument("--events-stdout", action="store_true", help="Print merge events as JSON lines")
+    status = commands.add_parser("status", help="List finished and missing jobs")
+    status.add_argument("spec")
+    commands_parser = commands.add_parser("commands", help="Print the Blender command for each job")
+    commands_parser.add_argument("spec")
+    commands_parser.add_argument("--blender", default="blender")
+    local = commands.add_parser("local", help="Run all jobs as local Blender processes, then merge")
+    local.add_argument("spec")
+    local.add_argument("--blender", default="blender")
+    local.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        events.begin(read_job_spec(args.spec)["Name"], filepath=args.events, stdout=args.events_stdout, spec=os.path.abspath(args.spec))
+        try:
+            with events.stage("merge"):
+                merge_jobs(args.spec, output_dir=args.output)
+        except Exception:
+            events.end("FAILED")
+            raise
+        events.end()
+    elif args.command == "status":
+        finished, missing = job_status(args.spec)
+        print(f"Finished: {finished}\nMissing: {missing}")
+    elif args.command == "commands":
+        for job in read_job_spec(args.spec)["Jobs"]:
+            print(subprocess.list2cmdline(job_command(args.spec, job["Index"], args.blender)))
+    else:
+        run_local(args.spec, args.blender, args.processes)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+# OpenVAT backend equivalence harness
+#
+# Encodes the same synthetic animations through the render and NumPy backends, compares the
+# written textures texel by texel and records how long each backend took, then round-trips the
+# sidecar of a custom attribute encode and checks a streamed half float encode against the
+# in-memory one. Run it inside Blender
+# with the add-on enabled, e.g. in the background:
+#
+#   blender -b --python-expr "import openvat.harness as h; h.main()" -- --format EXR32 --tolerance 0.001
+#
+# (use the add-on's module name in place of openvat). The scene's OpenVAT settings and frame
+# range are restored afterwards; a json report is written next to the encoded textures.
+
+import bpy
+import bmesh
+import os
+import sys
+import math
+import time
+import json
+import argparse
+import tempfile
+import numpy as np
+from . import api, sidecar
+
+KINDS = ('WAVE', 'TWIST', 'TRANSFORM')
+BACKEND_ORDER = ('RENDER', 'NUMPY')
+
+# Settings the harness overrides, restored when it finishes
+SETTING_KEYS = (
+    "encode_backend", "vat_output_directory", "output_format", "image_format", "encode_type",
+    "encode_target", "vat_normal_encoding", "proxy_method", "dedup_frames", "export_mesh",
+    "rip_edges", "use_budget", "vat_cleanup_enabled", "no_remap",
+)
+
+
+# Small deforming meshes covering modifier deformation, keyframed deformation and object transforms
+def make_synthetic_animation(name, kind, frame_start, frame_end):
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    if kind == 'WAVE':
+        bmesh.ops.create_grid(bm, x_segments=32, y_segments=32, size=1.0)
+    else:
+        bmesh.ops.create_cube(bm, size=1.0)
+        bmesh.ops.subdivide_edges(bm, edges=bm.edges[:], cuts=6, use_grid_fill=True)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    if kind == 'WAVE':
+        wave = obj.modifiers.new("Wave", 'WAVE')
+        wave.height = 0.3
+        wave.width = 0.6
+        wave.speed = 0.1
+    elif kind == 'TWIST':
+        twist = obj.modifiers.new("Twist", 'SIMPLE_DEFORM')
+        twist.deform_method = 'TWIST'
+        twist.deform_axis = 'Z'
+        twist.angle = 0.0
+        twist.keyframe_insert("angle", frame=frame_start)
+        twist.angle = math.pi
+        twist.keyframe_insert("angle", frame=frame_end)
+    else:
+        obj.keyframe_insert("location", frame=frame_start)
+        obj.keyframe_insert("rotation_euler", frame=frame_start)
+        obj.location = (1.0, 2.0, 0.5)
+        obj.rotation_euler = (0.0, 0.0, math.pi / 2)
+        obj.keyframe_insert("location", frame=frame_end)
+        obj.keyframe_insert("rotation_euler", frame=frame_end)
+    return obj
+
+
+def remove_object(obj):
+    mesh = obj.data
+    bpy.data.objects.remove(obj)
+    if mesh is not None and mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+
+
+# Encode obj with one backend through the scripting API, returns the wall time in seconds
+def encode_with(backend, obj, output_dir):
+    result = api.encode(obj, {"encode_backend": backend, "vat_output_directory": output_dir})
+    if not result.ok:
+        raise RuntimeError(f"{backend} encode of {obj.name} did not finish: {result.messages}")
+    return result.timings["total"]
+
+
+# Every texture with the given extension in a directory: {filename: (height, width, 4) top-down}
+def read_textures(directory, extension):
+    textures = {}
+    if not os.path.isdir(directory):
+        return textures
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith(extension):
+            continue
+        image = bpy.data.images.load(os.path.join(directory, filename), check_existing=False)
+        try:
+            image.colorspace_settings.name = 'Non-Color'
+            width, height = image.size
+            pixels = np.empty(width * height * 4, dtype=np.float32)
+            image.pixels.foreach_get(pixels)
+        finally:
+            bpy.data.images.remove(image)
+        textures[filename] = pixels.reshape(height, width, 4)[::-1]
+    return textures
+
+
+# Texel agreement of two textures over the RGB channels (alpha differs between writers)
+def compare_textures(a, b, tolerance):
+    if a.shape != b.shape:
+        return {"Match": False, "Reason": f"size {a.shape[1]}x{a.shape[0]} vs {b.shape[1]}x{b.shape[0]}"}
+    diff = np.abs(a[..., :3] - b[..., :3])
+    return {
+        "Match": bool(diff.max() <= tolerance) if diff.size else True,
+        "MaxError": float(diff.max()) if diff.size else 0.0,
+        "MeanError": float(diff.mean()) if diff.size else 0.0,
+        "Mismatched": int((diff.max(axis=-1) > tolerance).sum()),
+    }
+
+
+def run(kinds=KINDS, image_format='EXR32', normal_encoding='NONE', tolerance=1e-3, frames=(1, 24), output_dir=None):
+    """
+    Encode each synthetic animation with every backend and compare the results.
+    Returns one result dict per animation and texture.
+    """
+    scene = bpy.context.scene
+    settings = scene.vat_settings
+    saved = {key: getattr(settings, key) for key in SETTING_KEYS}
+    saved_frames = (scene.frame_start, scene.frame_end, scene.frame_current)
+    output_dir = output_dir or tempfile.mkdtemp(prefix="openvat-harness-")
+    extension = '.' + ''.join(filter(str.isalpha, image_format)).lower()
+    results = []
+
+    try:
+        settings.output_format = 'IMAGE'
+        settings.image_format = image_format
+        settings.encode_type = 'DEFAULT'
+        settings.encode_target = 'ACTIVE_OBJECT'
+        settings.vat_normal_encoding = normal_encoding
+        settings.proxy_method = 'START_FRAME'
+        settings.dedup_frames = False
+        settings.export_mesh = False
+        settings.rip_edges = False
+        settings.use_budget = False
+        settings.vat_cleanup_enabled = True
+        settings.no_remap = False
+        scene.frame_start, scene.frame_end = frames
+
+        for kind in kinds:
+            obj = make_synthetic_animation(f"ovharness_{kind.lower()}", kind, *frames)
+            durations = {}
+            textures = {}
+            try:
+                for backend in BACKEND_ORDER:
+                    backend_dir = os.path.join(output_dir, kind.lower(), backend.lower())
+                    durations[backend] = encode_with(backend, obj, backend_dir)
+                    textures[backend] = read_textures(os.path.join(backend_dir, obj.name + "_vat"), extension)
+                    preview = bpy.data.objects.get(obj.name + "_vat")
+                    if preview is not None:
+                        remove_object(preview)
+            finally:
+                remove_object(obj)
+
+            names = sorted(set(textures['RENDER']) | set(textures['NUMPY']))
+            for name in names:
+                if name not in textures['RENDER'] or name not in textures['NUMPY']:
+                    result = {"Match": False, "Reason": "written by one backend only"}
+                else:
+                    result = compare_textures(textures['RENDER'][name], textures['NUMPY'][name], tolerance)
+                result.update({
+                    "Animation": kind,
+                    "Texture": name,
+                    "RenderSeconds": round(durations['RENDER'], 4),
+                    "NumpySeconds": round(durations['NUMPY'], 4),
+                    "Speedup": round(durations['RENDER'] / durations['NUMPY'], 2) if durations['NUMPY'] > 0 else None,
+                })
+                results.append(result)
+    finally:
+        for key, value in saved.items():
+            setattr(settings, key, value)
+        scene.frame_start, scene.frame_end, scene.frame_current = saved_frames
+
+    with open(os.path.join(output_dir, "harness_report.json"), 'w') as f:
+        json.dump({"Format": image_format, "Normals": normal_encoding, "Tolerance": tolerance, "Results": results}, f, indent=4)
+    return results
+
+
+# Encode a mesh with a custom point attribute and check its header carries the channel bounds only
+# (frame and wrap bounds are standard mode tables and must not appear in a custom sidecar)
+def check_custom_sidecar(frames=(1, 4), output_dir=None):
+    scene = bpy.context.scene
+    settings = scene.vat_settings
+    saved_attributes = [item.name for item in settings.custom_attributes]
+    output_dir = output_dir or tempfile.mkdtemp(prefix="openvat-harness-")
+
+    obj = make_synthetic_animation("ovharness_custom", 'WAVE', *frames)
+    weights = obj.data.attributes.new("ovharness_weight", 'FLOAT', 'POINT')
+    weights.data.foreach_set("value", np.linspace(0.0, 1.0, len(obj.data.vertices), dtype=np.float32))
+    try:
+        settings.custom_attributes.clear()
+        settings.custom_attributes.add().name = weights.name
+        result = api.encode(obj, {
+            "encode_type": 'CUSTOM', "encode_backend": 'NUMPY', "vat_output_directory": output_dir,
+            "export_header": True, "export_frame_bounds": True, "export_wrap_bounds": True,
+            "export_mesh": False, "use_budget": False, "dedup_frames": False,
+        }, frame_range=frames)
+        preview = bpy.data.objects.get(obj.name + "_vat")
+        if preview is not None:
+            remove_object(preview)
+    finally:
+        remove_object(obj)
+        settings.custom_attributes.clear()
+        for name in saved_attributes:
+            settings.custom_attributes.add().name = name
+
+    if not result.ok:
+        raise AssertionError(f"Custom encode did not finish: {result.messages}")
+    info = sidecar.read_vat_header(os.path.join(result.directory, f"{result.name}-vat_info.bin"))
+    if set(info["Tables"]) != {"CBND"}:
+        raise AssertionError(f"Custom sidecar tables {sorted(info['Tables'])}, expected CBND only")
+    stride, payload = info["Tables"]["CBND"]
+    if stride != 8 or len(payload) != 8:
+        raise AssertionError(f"CBND holds {len(payload)} bytes with stride {stride}, expected one channel of min/max float32")
+    return info
+
+
+# Streamed and in-memory half float encodes of the same animation must write the same texels:
+# both quantize the normalized positions once. Large offsets make any double rounding visible.
+def check_streamed_half(frames=(1, 12), chunk_frames=5, tolerance=1e-3, output_dir=None):
+    output_dir = output_dir or tempfile.mkdtemp(prefix="openvat-harness-")
+    obj = make_synthetic_animation("ovharness_stream", 'WAVE', *frames)
+    obj.modifiers["Wave"].height = 300.0
+    buffers = {}
+    try:
+        for streamed in (False, True):
+            result = api.encode(obj, {
+                "encode_backend": 'NUMPY', "vat_output_directory": os.path.join(output_dir, "stream" if streamed else "memory"),
+                "output_format": 'RAW_NPY', "raw_precision": 'HALF', "stream_encode": streamed, "stream_chunk_frames": chunk_frames,
+                "encode_type": 'DEFAULT', "vat_normal_encoding": 'NONE', "no_remap": False, "dedup_frames": False,
+                "pca_compression": False, "export_mesh": False, "use_budget": False, "rip_edges": False,
+            }, frame_range=frames)
+            preview = bpy.data.objects.get(obj.name + "_vat")
+            if preview is not None:
+                remove_object(preview)
+            if not result.ok:
+                raise AssertionError(f"{'Streamed' if streamed else 'In-memory'} encode did not finish: {result.messages}")
+            buffers[streamed] = np.load(os.path.join(result.directory, f"{result.name}_vat.npy")).astype(np.float32)
+    finally:
+        remove_object(obj)
+
+    result = compare_textures(buffers[False], buffers[True], tolerance)
+    if not result["Match"]:
+        raise AssertionError(result.get("Reason") or f"max error {result['MaxError']:.6f}, {result['Mismatched']} texels over tolerance")
+    return result
+
+
+def assert_equivalent(results):
+    failures = [r for r in results if not r["Match"]]
+    if not results:
+        raise AssertionError("No textures were compared")
+    if failures:
+        messages = []
+        for r in failures:
+            reason = r.get("Reason") or f"max error {r['MaxError']:.6f}, {r['Mismatched']} texels over tolerance"
+            messages.append(f"{r['Animation']} {r['Texture']}: {reason}")
+        raise AssertionError("; ".join(messages))
+
+
+def format_results(results):
+    lines = [f"{'Animation':<10} {'Texture':<28} {'Max Error':>10} {'Render s':>9} {'NumPy s':>9} {'Speedup':>8}  Result"]
+    for r in results:
+        max_error = f"{r['MaxError']:.6f}" if "MaxError" in r else "-"
+        speedup = f"{r['Speedup']:.2f}x" if r["Speedup"] else "-"
+        lines.append(f"{r['Animation']:<10} {r['Texture']:<28} {max_error:>10} {r['RenderSeconds']:>9.3f} {r['NumpySeconds']:>9.3f} {speedup:>8}  {'ok' if r['Match'] else 'MISMATCH'}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="openvat-harness", description="Compare OpenVAT encode backends on synthetic animations")
+    parser.add_argument("--format", default='EXR32', choices=('PNG8', 'PNG16', 'EXR16', 'EXR32'))
+    parser.add_argument("--normals", default='NONE', choices=('NONE', 'PACKED', 'SEPARATE'))
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--output", default=None, help="Directory for the encoded textures and report")
+    args = parser.parse_args(argv)
+
+    results = run(args.kinds, args.format, args.normals, args.tolerance, (1, args.frames), args.output)
+    print(format_results(results))
+    try:
+        assert_equivalent(results)
+    except AssertionError as exception:
+        print(f"Backends disagree: {exception}")
+        if bpy.app.background:
+            sys.exit(1)
+        raise
+    print("Backends agree within tolerance")
+
+    try:
+        check_custom_sidecar()
+    except AssertionError as exception:
+        print(f"Custom sidecar check failed: {exception}")
+        if bpy.app.background:
+            sys.exit(1)
+        raise
+    print("Custom sidecar round trip ok")
+
+    try:
+        check_streamed_half()
+    except AssertionError as exception:
+        print(f"Streamed half float check failed: {exception}")
+        if bpy.app.background:
+            sys.exit(1)
+        raise
+    print("Streamed half float encode matches the in-memory encode")
@@ -1,7 +1,9 @@
 import bpy
 import os
+import subprocess
 import bmesh
-from . import utils, core
+import numpy as np
+from . import utils, core, sidecar, encoding, farm, events, preflight, preview, assets
 
 class OBJECT_OT_OpenOutputDirectory(bpy.types.Operator):
     bl_idname = "object.open_output_directory"
@@ -25,225 +27,538 @@ class OBJECT_OT_CalculateVATResolution(bpy.types.Operator):
     bl_description = "Export a UV-Based Vertex Animation Texture, sidecar data and compatible model to the defined Export location"
 
     def execute(self, context):
-        settings = context.scene.vat_settings
-        outDir = bpy.path.abspath(bpy.context.scene.vat_settings.vat_output_directory)
-        blend_filepath = bpy.data.filepath
-        export_directory = bpy.path.abspath(context.scene.vat_settings.vat_output_directory)
-        selected_temp = None
+        return run_encode(context, self)
 
-        # Validate custom attributes
-        if settings.encode_type == 'CUSTOM':
-            custom_obj = context.view_layer.objects.active
-            attr_names = [settings.custom_attr_1, settings.custom_attr_2, settings.custom_attr_3]
-        
-            missing = []
-            depsgraph = context.evaluated_depsgraph_get()
-            eval_obj = custom_obj.evaluated_get(depsgraph)
-            eval_mesh = eval_obj.to_mesh()
-
-            try:
-                attr_names_mesh = [a.name for a in eval_mesh.attributes]
-                for name in attr_names:
-                    if name != "NONE" and name not in attr_names_mesh:
-                        missing.append(name)
-            finally:
-                eval_obj.to_mesh_clear()
-
-            if missing:
-                self.report({'ERROR'}, f"Missing attributes: {', '.join(missing)}. Please rescan.")
-                return {'CANCELLED'}
+    # Report an error to the user and the event stream, and cancel
+    def fail(self, message):
+        self.report({'ERROR'}, message)
+        events.error(message)
+        return {'CANCELLED'}
 
-        if settings.proxy_method == 'START_FRAME':
-            
-            context.scene.frame_current = context.scene.frame_start
-        
-        if settings.proxy_method == 'SELECTED_OBJECT':
-            selected_objects = bpy.context.selected_objects
-            active_object = bpy.context.active_object
-            if len(selected_objects) != 2 or active_object not in selected_objects:
-                print("Exactly 2 objects must be selected, including the active one.")
-                return {'FINISHED'}
-        collection_mode = False
-        collection_target = ""
-        custom_proxy = False
-        
-        if settings.proxy_method == 'SELECTED_OBJECT':
-            custom_proxy = True
-            selected_objects = bpy.context.selected_objects
-            if len(selected_objects) == 2:
-                active_object = bpy.context.active_object
-                selected_non_active_object = None
-                for object in selected_objects:
-                    if object != active_object:
-                        selected_temp = object
-                        break
-                if selected_temp:
-                    print("Selected (non-active) object:", selected_temp.name)
-                else:
-                    print("No selected (non-active) object found.")               
-            else:
-                print("Exactly two objects must be sel ected.")
-        
-        if settings.encode_type != 'CUSTOM':
-            if settings.encode_target == 'COLLECTION_COMBINE': # Collection target only valid when collection_mode is true
-                collection_mode = True
-                collection_target = settings.vat_collection.name
-
-        core.create_geo_nodes_bake(use_collection=collection_mode, collection_name=collection_target)
-        obj = context.view_layer.objects.active
-        obj_name = obj.name
+# Encode the scene's target with its VAT settings: event stream, measured memory/output and the
+# pipeline below. reporter is the operator or any object with report(level, message) and fail(message).
+def run_encode(context, reporter, callbacks=()):
+    settings = context.scene.vat_settings
+    # Files opened before the add-on was enabled miss the load_post migration
+    utils.migrate_custom_attributes(context.scene)
+    target = settings.vat_collection if settings.encode_target == 'COLLECTION_COMBINE' and settings.vat_collection else context.active_object
+    log_path = None
+    if settings.event_log:
+        log_path = bpy.path.abspath(settings.event_log_path) or os.path.join(bpy.path.abspath(settings.vat_output_directory), "openvat-events.jsonl")
+    events.begin(target.name if target else "", filepath=log_path, stdout=settings.event_stdout,
+                 blend=bpy.data.filepath, encode_type=settings.encode_type,
+                 frame_start=context.scene.frame_start, frame_end=context.scene.frame_end)
+    monitor = preflight.EncodeMonitor()
+    for callback in (monitor, *callbacks):
+        events.add_callback(callback)
+    budget_restore = {}
+    try:
+        # One evaluation scene (and full scene timing) per encode, however many sampling passes
+        with utils.evaluation_session():
+            result = encode_scene(context, reporter, budget_restore, monitor.outputs)
+    except Exception as exception:
+        events.end("FAILED", message=str(exception))
+        raise
+    finally:
+        # Budget adjustments apply to this encode only
+        for key, value in budget_restore.items():
+            setattr(settings, key, value)
+        for callback in (monitor, *callbacks):
+            events.remove_callback(callback)
+    events.end("FINISHED" if 'FINISHED' in result else "CANCELLED")
+    if 'FINISHED' in result:
+        settings.measured_peak_memory = monitor.peak_memory_bytes / preflight.MB
+        settings.measured_output = monitor.output_bytes / preflight.MB
+        print(f"Measured: peak memory +{preflight.format_bytes(monitor.peak_memory_bytes)}, output {preflight.format_bytes(monitor.output_bytes)}")
+    return result
 
-        # Perform Normal-Safe Edge Split on new object
-
-        if settings.vat_normal_encoding != 'NONE':
-            if settings.rip_edges:
-                utils.rip_hard_edges(obj)
-        
-        obj.select_set(True)
-        
-        if settings.vat_normal_encoding == 'PACKED':
-            pack_normals = True
-            
-        else:
-            pack_normals = False
-        
-        # Proxy creation and selection
-        temp_obj = None
-        if custom_proxy == False:
-            temp_obj = obj.copy()
-            temp_obj.data = obj.data.copy()
-            if settings.proxy_method == 'START_FRAME':
-                context.scene.frame_current = context.scene.frame_start
-            context.scene.collection.objects.link(temp_obj)
-            for modifier in temp_obj.modifiers[:]:
-                utils.apply_modifier(temp_obj, modifier)
-        else:
-            temp_obj = selected_temp
-        
-        if temp_obj == None:
-            return {'FINISHED'}
-        
-        frame_start = context.scene.frame_start
-        frame_end = context.scene.frame_end
-        
-        # Create output directories (for JSON)
-        if not os.path.exists(export_directory):
-            os.makedirs(export_directory)
-        
-        # Name json based on target object
-        output_rename = obj_name.replace("_ovbake", "")
-        existing_obj = bpy.data.objects.get(output_rename + "_vat")
-        if existing_obj:
-            bpy.data.objects.remove(existing_obj)
-        
-        object_directory = os.path.join(export_directory, f"{output_rename}_vat")
-        
-        if not os.path.exists(object_directory):
-            os.makedirs(object_directory)
-        output_filepath = os.path.join(object_directory, f"{output_rename}-remap_info.json")
-        
-        # Saturation sampling output
-        remap_output_filepath = os.path.join(object_directory, f"{output_rename}-remap_info.json")
-
-        # Ensure the required node groups are available
-        utils.ensure_node_group("ov_generated-pos")
-        utils.ensure_node_group("ov_vat-decoder-vs")
-        utils.ensure_node_group("ov_calculate-position-vs")
-        
-        bpy.ops.object.select_all(action='DESELECT')
-        context.view_layer.objects.active = obj # ensure new generated mesh is active
-        obj.select_set(True)
-        
-        positionNodes = bpy.ops.object.modifier_add(type='NODES')
-        obj.modifiers[-1].name  = "positionCalculation"
-        obj.modifiers[-1].node_group = bpy.data.node_groups["ov_generated-pos"]
-        obj.modifiers[-1]["Socket_3"] = temp_obj
-
-        # Execute the saturation remapping
-        if settings.encode_type == 'DEFAULT':
-            attribute_name = "colPos"
-            utils.make_remap_data(obj_name, attribute_name, frame_start, frame_end, output_filepath, remap_output_filepath, "")
-
-            min_x, min_y, min_z, max_x, max_y, max_z = utils.read_remap_info(remap_output_filepath, attribute_name)
-            context.scene['min_x'] = min_x
-            context.scene['min_y'] = min_y
-            context.scene['min_z'] = min_z
-            context.scene['max_x'] = max_x
-            context.scene['max_y'] = max_y
-            context.scene['max_z'] = max_z
+# The encode pipeline: preflight, sampling, layout, sidecars and the encode stage
+# Settings changed to fit the budgets keep their original values in budget_restore,
+# outputs collects {path: bytes} of the files this encode wrote
+def encode_scene(context, reporter, budget_restore, outputs):
+    settings = context.scene.vat_settings
+    export_directory = bpy.path.abspath(settings.vat_output_directory)
+    selected_temp = None
+
+    # Fail fast on anything the encode would only hit after sampling or rendering
+    with events.stage("preflight"):
+        check = preflight.run_preflight(context)
+    print(preflight.format_report(check))
+    for warning in check["Warnings"]:
+        reporter.report({'WARNING'}, warning)
+    if check["Errors"]:
+        return reporter.fail("Pre-flight failed: " + " | ".join(check["Errors"]))
+
+    # Switch strategy or format where the estimate exceeds the budgets
+    estimate = check["Estimate"]
+    if settings.use_budget and estimate is not None:
+        estimate, changes, budget_warnings = preflight.apply_budget(settings, estimate, budget_restore)
+        for change in changes:
+            print(f"Budget: {change}")
+            reporter.report({'INFO'}, f"Budget: {change}")
+        for warning in budget_warnings:
+            reporter.report({'WARNING'}, warning)
+    if estimate is not None:
+        settings.estimated_peak_memory = estimate["PeakMemoryBytes"] / preflight.MB
+        settings.estimated_output = estimate["OutputBytes"] / preflight.MB
+
+    if settings.proxy_method == 'START_FRAME':
+
+        context.scene.frame_current = context.scene.frame_start
+
+    # The selected, non-active object is the proxy
+    custom_proxy = settings.proxy_method == 'SELECTED_OBJECT'
+    if custom_proxy:
+        selected_objects = context.selected_objects
+        active_object = context.active_object
+        if len(selected_objects) != 2 or active_object not in selected_objects:
+            return reporter.fail("Exactly 2 objects must be selected, including the active one")
+        selected_temp = next(obj for obj in selected_objects if obj != active_object)
+        print("Selected (non-active) object:", selected_temp.name)
 
+    # Clip library, resolved while the target is still active (the clip object defaults to its armature)
+    clips = None
+    if settings.use_clips:
+        try:
+            clips = utils.resolve_clips(context)
+        except ValueError as error:
+            return reporter.fail(str(error))
+
+    # Bake object with the colPos offset modifier, and its proxy
+    utils.memory_stats["saved_bytes"] = 0
+    obj, temp_obj, _ = core.prepare_encode_objects(context, selected_temp if custom_proxy else None, clips=clips)
+    obj_name = obj.name
+
+    if settings.vat_normal_encoding == 'PACKED':
+        pack_normals = True
+
+    else:
+        pack_normals = False
+
+    frame_start = context.scene.frame_start
+    frame_end = context.scene.frame_end
+    if clips:
+        # Clips are stacked back to back, the stacked frames play from the scene start
+        frame_end = frame_start + sum(clip["Frames"] for clip in clips) - 1
+
+    # Create output directories (for JSON)
+    if not os.path.exists(export_directory):
+        os.makedirs(export_directory)
+
+    # Name json based on target object
+    output_rename = obj_name.replace("_ovbake", "")
+    existing_obj = bpy.data.objects.get(output_rename + "_vat")
+    if existing_obj:
+        bpy.data.objects.remove(existing_obj)
+
+    object_directory = os.path.join(export_directory, f"{output_rename}_vat")
+
+    if not os.path.exists(object_directory):
+        os.makedirs(object_directory)
+
+    # Saturation sampling output
+    remap_output_filepath = os.path.join(object_directory, f"{output_rename}-remap_info.json")
+
+    # Execute the saturation remapping
+    # Remap json entries are collected here in pipeline order and written once before the encode stage
+    remap_info = {}
+    streaming = utils.uses_streaming(settings)
+    skinning = None
+    if streaming:
+        frame_data = {} # Sampled chunk by chunk once the resolution is known
+    elif settings.encode_type in {'DEFAULT', 'RIGID', 'SKINNING'}:
+        attribute_name = "colPos"
+        # Separate normals are always read from the mesh in this pass, never rendered
+        sample_normals = settings.vat_normal_encoding == 'SEPARATE' or (utils.uses_sampled_encode(settings) and settings.vat_normal_encoding != 'NONE')
+        sample_normals = sample_normals and not utils.uses_pca(settings) # PCA encodes positions only
+        frame_data = utils.make_remap_data(obj_name, attribute_name, frame_start, frame_end, remap_output_filepath, remap_output_filepath, "", normals=sample_normals, corner_normals=settings.rip_edges, clips=clips, remap_info=remap_info)
+        if frame_data is None:
+            return reporter.fail(f"No '{attribute_name}' data could be sampled from {obj_name}")
+        frame_data["values"] = frame_data.pop(attribute_name)
+
+        (min_x, min_y, min_z), (max_x, max_y, max_z) = remap_info["os-remap"]["Min"], remap_info["os-remap"]["Max"]
+        context.scene['min_x'] = min_x
+        context.scene['min_y'] = min_y
+        context.scene['min_z'] = min_z
+        context.scene['max_x'] = max_x
+        context.scene['max_y'] = max_y
+        context.scene['max_z'] = max_z
+
+        # Rigid pieces replace per-vertex offsets with one transform per connected component
+        if settings.encode_type == 'RIGID':
+            rest, edges = utils.get_evaluated_mesh_arrays(temp_obj)
+            offsets = frame_data["values"]
+            if len(rest) != offsets.shape[1]:
+                return reporter.fail(f"Proxy has {len(rest)} vertices but the target has {offsets.shape[1]}")
+
+            labels = encoding.connected_components(len(rest), edges)
+            rotations, translations, max_error = encoding.solve_rigid_transforms(rest, rest + offsets, labels)
+            worst = int(max_error.argmax()) if len(max_error) else 0
+            if len(max_error) and max_error[worst] > settings.rigid_tolerance:
+                return reporter.fail(f"Piece {worst} is not rigid (deviation {max_error[worst]:.5f} exceeds tolerance {settings.rigid_tolerance:.5f})")
+
+            min_t, max_t = encoding.channel_bounds(translations)
+            remap_info.clear()
+            remap_info.update({
+                "piece-translation": {
+                    "Min": min_t,
+                    "Max": max_t,
+                    "Frames": frame_end - frame_start + 1,
+                    "Pieces": len(max_error),
+                },
+                "piece-rotation": {
+                    "Min": [-1.0, -1.0, -1.0, -1.0],
+                    "Max": [1.0, 1.0, 1.0, 1.0],
+                    "Order": "XYZW",
+                },
+            })
+            context.scene['min_x'], context.scene['min_y'], context.scene['min_z'] = min_t
+            context.scene['max_x'], context.scene['max_y'], context.scene['max_z'] = max_t
+            frame_data = {"values": translations, "rotations": rotations, "labels": labels}
+            print(f"Rigid pieces: {len(max_error)} pieces for {len(rest)} vertices, max deviation {max_error.max():.6f}")
+
+        # Skinning decomposition replaces per-vertex offsets with a few blended bone transforms
+        if settings.encode_type == 'SKINNING':
+            rest = utils.get_evaluated_mesh_arrays(temp_obj)[0]
+            offsets = frame_data["values"]
+            if len(rest) != offsets.shape[1]:
+                return reporter.fail(f"Proxy has {len(rest)} vertices but the target has {offsets.shape[1]}")
+
+            positions = rest + offsets
+            with events.stage("skinning", bones=settings.skin_bones, frames=len(offsets)):
+                bone_rotations, bone_translations, indices, weights = encoding.fit_skinning(rest, positions, settings.skin_bones, settings.skin_influences, settings.skin_iterations)
+                report = encoding.skinning_error_report(rest, positions, bone_rotations, bone_translations, indices, weights)
+            report_path = os.path.join(object_directory, f"{output_rename}-skinning_report.json")
+            utils.write_json(report, report_path)
+            events.output(report_path)
+            print(f"Skinning decomposition: {report['Bones']} bones, {report['Influences']} influences for {len(rest)} vertices, RMS error {report['RMSError']:.6f}, max {report['MaxError']:.6f} at frame {frame_start + report['MaxErrorFrame']}")
+
+            translations = bone_translations.astype(np.float32)
+            min_t, max_t = encoding.channel_bounds(translations)
+            remap_info.clear()
+            remap_info.update({
+                "bone-translation": {
+                    "Min": min_t,
+                    "Max": max_t,
+                    "Frames": frame_end - frame_start + 1,
+                    "Bones": report["Bones"],
+                },
+                "bone-rotation": {
+                    "Min": [-1.0, -1.0, -1.0, -1.0],
+                    "Max": [1.0, 1.0, 1.0, 1.0],
+                    "Order": "XYZW",
+                },
+                "skinning": {
+                    "Bones": report["Bones"],
+                    "Influences": report["Influences"],
+                    "IndexMaps": ["VAT_BONES01", "VAT_BONES23"],
+                    "WeightMaps": ["VAT_WEIGHTS01", "VAT_WEIGHTS23"],
+                    "RMSError": report["RMSError"],
+                    "MaxError": report["MaxError"],
+                    "Report": os.path.basename(report_path),
+                },
+            })
+            context.scene['min_x'], context.scene['min_y'], context.scene['min_z'] = min_t
+            context.scene['max_x'], context.scene['max_y'], context.scene['max_z'] = max_t
+            frame_data = {"values": translations, "rotations": encoding.rotations_to_quaternions(bone_rotations), "bone_indices": indices, "bone_weights": weights}
+            skinning = (rest, bone_rotations, bone_translations, indices, weights)
+
+    else:
+        values = utils.make_custom_data(obj_name, utils.get_custom_attribute_names(settings), frame_start, frame_end, remap_output_filepath, remap_output_filepath, clips=clips, remap_info=remap_info)
+        if values is None:
+            return reporter.fail("No custom attribute data could be sampled")
+        custom_min, custom_max = utils.custom_channel_bounds(remap_info)
+        frame_data = {"values": values, "mins": custom_min, "maxs": custom_max}
+
+        # Scene bounds keep the first three channels for the preview and header
+        padded_min = (custom_min + [0.0, 0.0])[:3]
+        padded_max = (custom_max + [0.0, 0.0])[:3]
+        context.scene['min_x'], context.scene['min_y'], context.scene['min_z'] = padded_min
+        context.scene['max_x'], context.scene['max_y'], context.scene['max_z'] = padded_max
+
+    num_vertices = len(obj.data.vertices)
+    if settings.encode_type in {'RIGID', 'SKINNING'}:
+        num_vertices = frame_data["values"].shape[1] # One column per piece or bone
+    num_frames = frame_end - frame_start + 1
+    context.scene.frame_current = frame_start
+
+    # Velocity from the full sampled sequence, before deduplication so held frames keep their neighbours
+    fps = context.scene.render.fps / context.scene.render.fps_base
+    if settings.export_velocity and settings.encode_type == 'DEFAULT' and not streaming and not utils.uses_pca(settings):
+        if clips:
+            # Per clip at its own rate, differences never cross into the neighbouring clip
+            frame_data["velocity"] = np.concatenate([
+                encoding.finite_difference_velocity(frame_data["values"][clip["Start"]:clip["Start"] + clip["Frames"]], clip["FPS"], loop=clip["Loop"])
+                for clip in clips])
         else:
-            attr_r = settings.custom_attr_1
-            attr_g = settings.custom_attr_2
-            attr_b = settings.custom_attr_3
-
-            utils.make_custom_data(obj_name, [attr_r, attr_g, attr_b], frame_start, frame_end, output_filepath, remap_output_filepath)
-            attrs = [
-                settings.custom_attr_1,
-                settings.custom_attr_2,
-                settings.custom_attr_3,
-            ]
-
-            min_r, min_g, min_b, max_r, max_g, max_b = utils.read_custom_info(remap_output_filepath, attrs)
-
-            context.scene['min_x'] = min_r
-            context.scene['min_y'] = min_g
-            context.scene['min_z'] = min_b
-            context.scene['max_x'] = max_r
-            context.scene['max_y'] = max_g
-            context.scene['max_z'] = max_b
-        
-        num_vertices = len(obj.data.vertices)
-        frame_start = context.scene.frame_start
-        frame_end = context.scene.frame_end
-        num_frames = frame_end - frame_start + 1
+            frame_data["velocity"] = encoding.finite_difference_velocity(frame_data["values"], fps, loop=settings.velocity_loop)
+
+    # Store each unique frame once, playback goes through the frame map
+    frame_map = None
+    if settings.dedup_frames and not streaming:
+        keys = [key for key in ("values", "normals", "rotations", "velocity") if key in frame_data]
+        unique_frames, frame_map = encoding.find_unique_frames(np.concatenate([frame_data[key] for key in keys], axis=-1), settings.dedup_tolerance)
+        loop = encoding.detect_loop(unique_frames, frame_map)
+        for key in keys:
+            frame_data[key] = frame_data[key][unique_frames]
+        if skinning is not None:
+            skinning = skinning[:1] + (skinning[1][unique_frames], skinning[2][unique_frames]) + skinning[3:]
+
+        remap_info["UniqueFrames"] = len(unique_frames)
+        remap_info["FrameMap"] = frame_map.tolist()
+        if loop:
+            remap_info["Loop"] = loop
+
+        print(f"Frame deduplication: {len(unique_frames)} unique of {num_frames} frames" + (f", frames from {frame_start + loop['Start']} repeat frame {frame_start + loop['Source']}" if loop else ""))
+        num_frames = len(unique_frames)
+
+    # PCA: the VAT rows hold the mean shape then the basis shapes, frames decode through the coefficient table
+    pca = None
+    if utils.uses_pca(settings):
+        with events.stage("pca", frames=num_frames):
+            mean, basis, coefficients, energy = encoding.pca_basis(frame_data["values"], settings.pca_tolerance, settings.pca_max_components)
+            report = encoding.pca_error_report(frame_data["values"], mean, basis, coefficients, energy)
+        report_path = os.path.join(object_directory, f"{output_rename}-pca_report.json")
+        utils.write_json(report, report_path)
+        events.output(report_path)
+        print(f"PCA compression: {report['Components']} basis shapes for {num_frames} frames, RMS error {report['RMSError']:.6f}, max {report['MaxError']:.6f} at frame {report['MaxErrorFrame']}")
+        if report["RMSError"] > settings.pca_tolerance:
+            reporter.report({'WARNING'}, f"PCA limited to {report['Components']} shapes, RMS error {report['RMSError']:.6f} exceeds the tolerance")
+
+        rows = np.concatenate([mean[None], basis])
+        pca_min, pca_max = encoding.channel_bounds(rows)
+        remap_info["os-remap"] = {"Min": pca_min, "Max": pca_max, "Frames": len(rows)}
+        remap_info["pca"] = {
+            "Components": report["Components"],
+            "Frames": num_frames,
+            "MeanRow": 0,
+            "Coefficients": coefficients.tolist(),
+            "RMSError": report["RMSError"],
+            "MaxError": report["MaxError"],
+            "Report": os.path.basename(report_path),
+        }
+        context.scene['min_x'], context.scene['min_y'], context.scene['min_z'] = pca_min
+        context.scene['max_x'], context.scene['max_y'], context.scene['max_z'] = pca_max
+
+        pca = (mean, basis, coefficients)
+        frame_data = {"values": rows}
+        num_frames = len(rows)
+
+    # Encode Normals
+    if settings.encode_type != 'DEFAULT' or pca is not None:
+        pack_normals = False # Custom and PCA have no normals, rigid rotations take the packed half instead
+    width, height, num_wraps = utils.get_vat_resolution(settings, num_vertices, num_frames)
+
+    # Column order is chosen once here so bounds, streaming and the uv map agree
+    order = None
+    if settings.encode_type not in {'RIGID', 'SKINNING'} and settings.vertex_order != 'INDEX':
+        proxy_mesh = temp_obj.evaluated_get(context.evaluated_depsgraph_get()).data
+        order = utils.get_vertex_order(proxy_mesh, settings.vertex_order, width, num_frames)
+
+    # Per-frame bounds are taken from final positions, the proxy rest pose plus the sampled offsets
+    rest = None
+    if settings.encode_type == 'DEFAULT' and settings.export_frame_bounds and pca is None:
+        rest = utils.get_evaluated_mesh_arrays(temp_obj)[0]
+        if len(rest) != num_vertices:
+            print(f"Frame bounds skipped: proxy has {len(rest)} vertices, target has {num_vertices}")
+            rest = None
+
+    # Streaming encode writes the VAT while sampling, bounds are known once every chunk is done
+    bounds = None
+    if streaming:
+        with events.stage("stream", frames=num_frames):
+            min_values, max_values, bounds = core.stream_sampled_vat(obj_name, context.scene, frame_start, frame_end, width, height, num_wraps, pack_normals, order=order, rest=rest, wrap_bounds=settings.export_wrap_bounds)
+        remap_info["os-remap"] = {"Min": min_values, "Max": max_values, "Frames": num_frames}
+        context.scene['min_x'], context.scene['min_y'], context.scene['min_z'] = min_values
+        context.scene['max_x'], context.scene['max_y'], context.scene['max_z'] = max_values
         context.scene.frame_current = frame_start
-        
-        # Encode Normals
-        if settings.encode_type == 'CUSTOM':
-            pack_normals = False
-            if settings.use_single_row:
-                width = num_vertices
-                height = num_frames
-                num_wraps = 1
-            else:
-                width, height, num_wraps = utils.calculate_optimal_vat_resolution(num_vertices, num_frames)   
-        elif settings.vat_normal_encoding == 'PACKED':
-            if settings.use_single_row:
-                width = num_vertices
-                height = num_frames * 2
-                num_wraps = 1
-            else:
-                width, height, num_wraps = utils.calculate_packed_vat_resolution(num_vertices, num_frames)   
+        frame_data = {"streamed": True}
+    elif rest is not None:
+        bounds = encoding.frame_bounds(rest, frame_data["values"], width, num_wraps, order)
+    frame_data["order"] = order
+
+    if bounds is not None:
+        per_frame, per_wrap = bounds
+        bounds_min, bounds_max = encoding.channel_bounds(per_frame.reshape(-1, 3))
+        remap_info["frame-bounds"] = {
+            "Min": bounds_min,
+            "Max": bounds_max,
+            "Frames": num_frames,
+            "Bounds": per_frame.reshape(-1, 6).tolist(),
+        }
+        if settings.export_bounds_texture:
+            core.export_bounds_texture(obj_name, context.scene, per_frame, bounds_min, bounds_max)
+
+    # Every texture has a _lo companion holding the fine part of each channel
+    split_bits = utils.get_split_bits(settings)
+    if split_bits:
+        remap_info["precision-split"] = {"Bits": split_bits, "LowSuffix": "_lo", "Scale": 2 ** split_bits - 1}
+
+    # Velocity is quantized with its own bounds, independent of the position remap
+    if frame_data.get("velocity") is not None:
+        velocity_min, velocity_max = encoding.channel_bounds(frame_data["velocity"])
+        frame_data["velocity_bounds"] = (velocity_min, velocity_max)
+        remap_info["velocity"] = {
+            "Min": velocity_min,
+            "Max": velocity_max,
+            "Frames": num_frames,
+            "FPS": fps,
+            "Units": "per second",
+            "Loop": settings.velocity_loop,
+            "Suffix": "_vvel",
+        }
+        # Looping clips whose last frame repeats the first wrapped past that duplicate (one flag per clip with a clip library)
+        if clips:
+            remap_info["velocity"]["LastFrameRepeatsFirst"] = [
+                bool(clip["Loop"]) and bool(encoding.repeats_first_frame(frame_data["values"][clip["Start"]:clip["Start"] + clip["Frames"]]))
+                for clip in clips]
+        elif settings.velocity_loop:
+            remap_info["velocity"]["LastFrameRepeatsFirst"] = bool(encoding.repeats_first_frame(frame_data["values"]))
+        print(f"Velocity: {velocity_min} to {velocity_max} units per second")
+
+    # Clip table: where each clip starts among the stacked frames, in the frames the frame map and PCA table index
+    if clips:
+        remap_info["clips"] = [{
+            "Name": clip["Name"],
+            "Start": clip["Start"],
+            "Frames": clip["Frames"],
+            "FPS": clip["FPS"],
+            "Loop": clip["Loop"],
+            "Source": clip["Source"],
+            "SourceFrames": [clip["FrameStart"], clip["FrameEnd"]],
+        } for clip in clips]
+        print("Clip library: " + ", ".join(f"{clip['Name']} ({clip['Frames']} frames from {clip['Start']})" for clip in clips))
+
+    utils.write_json(remap_info, remap_output_filepath)
+    print(f"Remap information saved to {remap_output_filepath}")
+
+    # Final positions for the cache preview, stored frames only (the frame map covers the rest)
+    # PCA and skinning encodes always preview through the cache, decoded with their reference decoders
+    if skinning is not None:
+        cache_path = os.path.join(object_directory, f"{output_rename}-position_cache.npy")
+        preview.write_position_cache(cache_path, np.zeros_like(skinning[0]), encoding.skinning_reconstruct(*skinning).astype(np.float32))
+        frame_data["position_cache"] = (cache_path, frame_start, frame_map)
+        events.output(cache_path)
+    elif (settings.preview_mode == 'CACHE' or pca is not None) and settings.encode_type == 'DEFAULT' and not streaming:
+        cache_rest = rest if rest is not None else utils.get_evaluated_mesh_arrays(temp_obj)[0]
+        if len(cache_rest) == num_vertices:
+            cache_path = os.path.join(object_directory, f"{output_rename}-position_cache.npy")
+            preview.write_position_cache(cache_path, cache_rest, encoding.pca_reconstruct(*pca) if pca is not None else frame_data["values"])
+            frame_data["position_cache"] = (cache_path, frame_start, frame_map)
+            events.output(cache_path)
         else:
-            if settings.use_single_row:
-                width = num_vertices
-                height = num_frames
-                num_wraps = 1
-            else:
-                width, height, num_wraps = utils.calculate_optimal_vat_resolution(num_vertices, num_frames)   
-        
-        # Store name for use after obj is deleted
-        obj_name = obj.name
-        
-        # obj (temp) is deleted on success of the following
-        core.setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_normals, frame_start)
-        
-        # Clean up creation data
-        if context.scene.vat_settings.vat_cleanup_enabled:
-            print("Cleaning up temporary node_groups, objects, and modifiers")
-            if custom_proxy == False:
-                bpy.data.objects.remove(temp_obj)
-            bpy.data.scenes.remove(bpy.data.scenes[obj_name + "_proxy_scene"])
-            bpy.data.scenes.remove(bpy.data.scenes[obj_name + "_vat"])
-            bpy.ops.outliner.orphans_purge()
-        
-        # Finish
-        self.report({'INFO'}, "VAT Encoding Completed")
-        print("VAT Encoding Finished")
-        print("Thank you for using OPENVAT - Your favorite Vertex Animation Encoder - Developed by Luke Stilson 2024 - Visit www.lukestilson.com for more information")
-    
-        return {'FINISHED'}
+            print(f"Position cache skipped: proxy has {len(cache_rest)} vertices, target has {num_vertices}")
+
+    # Binary sidecar (and optional json mirror) describing layout and bounds
+    if settings.export_header:
+        header_min = [context.scene['min_x'], context.scene['min_y'], context.scene['min_z']]
+        header_max = [context.scene['max_x'], context.scene['max_y'], context.scene['max_z']]
+        if settings.encode_type == 'CUSTOM':
+            header_min, header_max = frame_data["mins"][:4], frame_data["maxs"][:4]
+        vat_info = sidecar.make_vat_info(
+            frame_start, num_frames, num_vertices, width, height, num_wraps,
+            settings.vat_normal_encoding if settings.encode_type == 'DEFAULT' and pca is None else 'NONE',
+            utils.get_texel_format(settings), 'PCA' if pca is not None else settings.encode_type,
+            header_min, header_max,
+            remapped=utils.uses_remap(settings),
+            split_bits=split_bits,
+        )
+        if settings.encode_type == 'CUSTOM':
+            # Bounds of every custom channel (min, max float pairs), texture then RGBA order
+            channel_bounds = np.array([frame_data["mins"], frame_data["maxs"]], dtype="<f4").T
+            vat_info["Tables"]["CBND"] = (8, channel_bounds.tobytes())
+        if frame_map is not None:
+            vat_info["Tables"]["FMAP"] = (4, frame_map.astype("<u4").tobytes())
+        if pca is not None:
+            # One row of float32 weights per stored frame, one weight per basis shape
+            coefficients = pca[2]
+            vat_info["Tables"]["PCAC"] = (4 * coefficients.shape[1], coefficients.astype("<f4").tobytes())
+        if bounds is not None:
+            # min xyz, max xyz float32 per frame (and per frame, per wrap)
+            vat_info["Tables"]["FBND"] = (24, bounds[0].astype("<f4").tobytes())
+            if settings.export_wrap_bounds and bounds[1] is not None:
+                vat_info["Tables"]["WBND"] = (24, bounds[1].astype("<f4").tobytes())
+        if clips:
+            # start frame u32, frame count u32, fps float32, flags u32 (bit 0 loop) per clip, names in the remap json
+            clip_table = np.array([(clip["Start"], clip["Frames"], clip["FPS"], int(clip["Loop"])) for clip in clips],
+                                  dtype=[("start", "<u4"), ("frames", "<u4"), ("fps", "<f4"), ("flags", "<u4")])
+            vat_info["Tables"]["CLIP"] = (16, clip_table.tobytes())
+        if frame_data.get("velocity") is not None:
+            # min xyz, max xyz float32 of the velocity texture, units per second
+            vat_info["Tables"]["VBND"] = (24, np.array(frame_data["velocity_bounds"], dtype="<f4").tobytes())
+        header_path = os.path.join(object_directory, f"{output_rename}-vat_info.bin")
+        sidecar.write_vat_header(vat_info, header_path)
+        events.output(header_path)
+        if settings.export_header_json:
+            sidecar.write_vat_info_json(vat_info, os.path.join(object_directory, f"{output_rename}-vat_info.json"))
+            events.output(os.path.join(object_directory, f"{output_rename}-vat_info.json"))
+
+    # Identical sampled data, layout and format already encoded: reuse its textures
+    index_hash = None
+    if settings.use_asset_index and not streaming:
+        index_layout = {
+            "Width": width, "Height": height, "Wraps": num_wraps, "Frames": num_frames,
+            "EncodeType": settings.encode_type, "TexelFormat": utils.get_texel_format(settings),
+            "NormalEncoding": settings.vat_normal_encoding, "Remapped": utils.uses_remap(settings),
+            "SplitBits": split_bits, "BoundsTexture": settings.export_frame_bounds and settings.export_bounds_texture,
+        }
+        index_arrays = [frame_data.get(key) for key in ("values", "normals", "rotations", "labels", "velocity", "bone_indices", "bone_weights")] + [order, frame_map, pca[2] if pca is not None else None]
+        index_hash = assets.content_hash(index_arrays, index_layout)
+        connection = assets.open_index(bpy.path.abspath(settings.asset_index_path) or None)
+        try:
+            entry = assets.find(connection, index_hash, exclude=object_directory)
+            if entry is not None:
+                for filename in assets.reuse(entry, object_directory, output_rename, settings.asset_reuse_mode):
+                    events.output(os.path.join(object_directory, filename))
+                frame_data["reused"] = True
+                print(f"Asset index: reused the textures of {entry['Name']} from {entry['Directory']}")
+        finally:
+            connection.close()
+
+    # Store name for use after obj is deleted
+    obj_name = obj.name
+
+    # obj (temp) is deleted on success of the following
+    with events.stage("encode", width=width, height=height, wraps=num_wraps, frames=num_frames, vertices=num_vertices):
+        core.setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_normals, frame_start, frame_data=frame_data)
+    events.output(remap_output_filepath)
+
+    if index_hash is not None:
+        # Only textures this encode wrote (or reused), never stale ones left by earlier encodes
+        written = {os.path.basename(path) for path in outputs if os.path.dirname(path) == os.path.abspath(object_directory)}
+        index_files = [name for name in assets.texture_files(object_directory, output_rename) if name in written]
+        connection = assets.open_index(bpy.path.abspath(settings.asset_index_path) or None)
+        try:
+            assets.register(connection, index_hash, output_rename, object_directory,
+                            index_files,
+                            [context.scene['min_x'], context.scene['min_y'], context.scene['min_z']],
+                            [context.scene['max_x'], context.scene['max_y'], context.scene['max_z']],
+                            index_layout, bpy.data.filepath)
+        finally:
+            connection.close()
+
+    # Clean up creation data
+    if context.scene.vat_settings.vat_cleanup_enabled:
+        print("Cleaning up temporary node_groups, objects, and modifiers")
+        if custom_proxy == False:
+            bpy.data.objects.remove(temp_obj)
+        for scene_name in (obj_name + "_proxy_scene", obj_name + "_vat"):
+            temp_scene = bpy.data.scenes.get(scene_name)
+            if temp_scene is not None:
+                bpy.data.scenes.remove(temp_scene)
+        utils.purge_orphans()
+
+    # Finish
+    if settings.lean_memory:
+        saved_mb = utils.memory_stats["saved_bytes"] / (1024 * 1024)
+        print(f"Low memory mode: avoided or freed early ~{saved_mb:.1f} MB of mesh data")
+        reporter.report({'INFO'}, f"VAT Encoding Completed (low memory mode saved ~{saved_mb:.1f} MB)")
+    else:
+        reporter.report({'INFO'}, "VAT Encoding Completed")
+    print("VAT Encoding Finished")
+    print("Thank you for using OPENVAT - Your favorite Vertex Animation Encoder - Developed by Luke Stilson 2024 - Visit www.lukestilson.com for more information")
+
+    return {'FINISHED'}
 
 class OBJECT_OT_ScanFloatPointAttributes(bpy.types.Operator):
     bl_idname = "object.scan_attributes"
@@ -259,28 +574,12 @@ class OBJECT_OT_ScanFloatPointAttributes(bpy.types.Operator):
         # NEW: safe evaluated attribute scan
         items = utils.get_evaluated_point_float_attributes(context)
 
-        if not items:
-            items = [("NONE", "None", "")]
-
-        # Pre-clear selection to make enums update
+        # Replace the custom attribute list with everything found
         settings = context.scene.vat_settings
-        settings.custom_attr_1 = "NONE"
-        settings.custom_attr_2 = "NONE"
-        settings.custom_attr_3 = "NONE"
-
-        # Cache
-        utils._openvat_enum_cache["1"] = items
-        utils._openvat_enum_cache["2"] = items
-        utils._openvat_enum_cache["3"] = items
-
-        # Auto-assign
-        valid_names = [i[0] for i in items if i[0] != "NONE"]
-        if len(valid_names) > 0:
-            settings.custom_attr_1 = valid_names[0]
-        if len(valid_names) > 1:
-            settings.custom_attr_2 = valid_names[1]
-        if len(valid_names) > 2:
-            settings.custom_attr_3 = valid_names[2]
+        settings.custom_attributes.clear()
+        valid_names = [i[0] for i in items]
+        for name in valid_names:
+            settings.custom_attributes.add().name = name
 
         self.report({'INFO'}, f"Found {len(valid_names)} attribute(s)")
         return {'FINISHED'}
@@ -288,4 +587,300 @@ class OBJECT_OT_ScanFloatPointAttributes(bpy.types.Operator):
 
 
 
-classes = [OBJECT_OT_CalculateVATResolution, OBJECT_OT_OpenOutputDirectory, OBJECT_OT_ScanFloatPointAttributes]
\ No newline at end of file
+class OBJECT_OT_AddCustomAttribute(bpy.types.Operator):
+    bl_idname = "object.add_custom_attribute"
+    bl_label = "Add Custom Attribute"
+    bl_description = "Add an entry to the custom attribute list"
+
+    def execute(self, context):
+        context.scene.vat_settings.custom_attributes.add()
+        return {'FINISHED'}
+
+class OBJECT_OT_RemoveCustomAttribute(bpy.types.Operator):
+    bl_idname = "object.remove_custom_attribute"
+    bl_label = "Remove Custom Attribute"
+    bl_description = "Remove this entry from the custom attribute list"
+
+    index: bpy.props.IntProperty()
+
+    def execute(self, context):
+        attributes = context.scene.vat_settings.custom_attributes
+        if 0 <= self.index < len(attributes):
+            attributes.remove(self.index)
+        return {'FINISHED'}
+
+class OBJECT_OT_AddVATClip(bpy.types.Operator):
+    bl_idname = "object.add_vat_clip"
+    bl_label = "Add Clip"
+    bl_description = "Add a clip to the clip library, covering the scene frame range"
+
+    def execute(self, context):
+        clips = context.scene.vat_settings.clips
+        clip = clips.add()
+        clip.name = f"Clip{len(clips)}"
+        clip.frame_start = context.scene.frame_start
+        clip.frame_end = context.scene.frame_end
+        return {'FINISHED'}
+
+class OBJECT_OT_RemoveVATClip(bpy.types.Operator):
+    bl_idname = "object.remove_vat_clip"
+    bl_label = "Remove Clip"
+    bl_description = "Remove this clip from the clip library"
+
+    index: bpy.props.IntProperty()
+
+    def execute(self, context):
+        clips = context.scene.vat_settings.clips
+        if 0 <= self.index < len(clips):
+            clips.remove(self.index)
+        return {'FINISHED'}
+
+class OBJECT_OT_ScanVATClips(bpy.types.Operator):
+    bl_idname = "object.scan_vat_clips"
+    bl_label = "Clips From NLA"
+    bl_description = "Replace the clip library with one clip per NLA strip of the clip object, in track and strip order"
+
+    def execute(self, context):
+        clip_object = utils.get_clip_object(context)
+        if clip_object is None or clip_object.animation_data is None or not clip_object.animation_data.nla_tracks:
+            self.report({'WARNING'}, "The clip object has no NLA tracks")
+            return {'CANCELLED'}
+
+        clips = context.scene.vat_settings.clips
+        clips.clear()
+        for track in clip_object.animation_data.nla_tracks:
+            for strip in track.strips:
+                clip = clips.add()
+                clip.name = strip.name
+                clip.source = 'NLA_STRIP'
+                clip.strip = strip.name
+                clip.action = strip.action
+                clip.frame_start = int(strip.frame_start)
+                clip.frame_end = int(strip.frame_end)
+
+        self.report({'INFO'}, f"Found {len(clips)} clip(s) on {clip_object.name}")
+        return {'FINISHED'}
+
+class OBJECT_OT_VATPreflight(bpy.types.Operator):
+    bl_idname = "object.vat_preflight"
+    bl_label = "Pre-flight Check"
+    bl_description = "Check the current encode settings without encoding: topology stability over a few sampled frames, proxy correspondence, custom attributes, output directory, predicted resolution, sizes and disk space"
+
+    def execute(self, context):
+        utils.migrate_custom_attributes(context.scene)
+        check = preflight.run_preflight(context)
+        print(preflight.format_report(check))
+        for warning in check["Warnings"]:
+            self.report({'WARNING'}, warning)
+        if check["Errors"]:
+            self.report({'ERROR'}, "Pre-flight failed: " + " | ".join(check["Errors"]))
+            return {'CANCELLED'}
+        estimate = check["Estimate"]
+        self.report({'INFO'}, f"Pre-flight passed: {estimate['Width']} x {estimate['Height']}, output up to {preflight.format_bytes(estimate['OutputBytes'])}")
+        return {'FINISHED'}
+
+class OBJECT_OT_PlanVATFarmJobs(bpy.types.Operator):
+    bl_idname = "object.plan_vat_farm_jobs"
+    bl_label = "Plan Farm Jobs"
+    bl_description = "Split the frame range into jobs for several nodes: writes a job spec next to the output, exports the model and preview, but samples no frames. Nodes then run their job from the saved .blend and the results are merged"
+
+    def execute(self, context):
+        settings = context.scene.vat_settings
+        if not bpy.data.filepath or bpy.data.is_dirty:
+            self.report({'ERROR'}, "Save the .blend file first, farm nodes open the saved file")
+            return {'CANCELLED'}
+        if settings.encode_type != 'DEFAULT':
+            self.report({'ERROR'}, "Farm jobs support the standard encoding mode only")
+            return {'CANCELLED'}
+        if settings.use_clips:
+            self.report({'ERROR'}, "Clip libraries are encoded on a single node, farm jobs split the scene frame range")
+            return {'CANCELLED'}
+
+        check = preflight.run_preflight(context, farm=True)
+        print(preflight.format_report(check))
+        if check["Errors"]:
+            self.report({'ERROR'}, "Pre-flight failed: " + " | ".join(check["Errors"]))
+            return {'CANCELLED'}
+
+        proxy = None
+        if settings.proxy_method == 'SELECTED_OBJECT':
+            proxy = next((o for o in context.selected_objects if o != context.active_object), None)
+        if settings.proxy_method == 'START_FRAME':
+            context.scene.frame_current = context.scene.frame_start
+
+        target_name = context.active_object.name if context.active_object else ""
+        utils.memory_stats["saved_bytes"] = 0
+        obj, temp_obj, split_edges = core.prepare_encode_objects(context, proxy)
+        obj_name = obj.name
+        output_rename = obj_name.replace("_ovbake", "")
+        existing_obj = bpy.data.objects.get(output_rename + "_vat")
+        if existing_obj:
+            bpy.data.objects.remove(existing_obj)
+
+        frame_start = context.scene.frame_start
+        frame_end = context.scene.frame_end
+        num_frames = frame_end - frame_start + 1
+        num_vertices = len(obj.data.vertices)
+        width, height, num_wraps = utils.get_vat_resolution(settings, num_vertices, num_frames)
+
+        farm_directory = os.path.join(bpy.path.abspath(settings.vat_output_directory), f"{output_rename}_vat", "farm")
+        os.makedirs(farm_directory, exist_ok=True)
+
+        # Layout inputs that need the proxy mesh are fixed here, merging never opens Blender
+        order = None
+        order_file = None
+        if settings.vertex_order != 'INDEX':
+            proxy_mesh = temp_obj.evaluated_get(context.evaluated_depsgraph_get()).data
+            order = utils.get_vertex_order(proxy_mesh, settings.vertex_order, width, num_frames)
+            order_file = "order.npy"
+            np.save(os.path.join(farm_directory, order_file), order)
+        # Nodes split these edges instead of re-running the edge analysis over the whole range
+        split_file = None
+        if split_edges is not None:
+            split_file = "split_edges.npy"
+            np.save(os.path.join(farm_directory, split_file), np.asarray(split_edges, dtype=np.int64))
+        rest_file = None
+        if settings.export_frame_bounds:
+            rest_file = "rest.npy"
+            np.save(os.path.join(farm_directory, rest_file), utils.get_evaluated_mesh_arrays(temp_obj)[0])
+
+        spec = farm.make_job_spec(
+            bpy.data.filepath, target_name, proxy.name if proxy else None, output_rename,
+            frame_start, frame_end, settings.farm_jobs, num_vertices, width, height, num_wraps,
+            settings.vat_normal_encoding, settings.output_format, settings.image_format,
+            settings.raw_precision, utils.uses_remap(settings),
+            header=settings.export_header, header_json=settings.export_header_json,
+            frame_bounds=settings.export_frame_bounds, wrap_bounds=settings.export_wrap_bounds,
+            bounds_texture=settings.export_bounds_texture, order_file=order_file, rest_file=rest_file,
+            split_file=split_file,
+        )
+        spec_path = os.path.join(farm_directory, f"{output_rename}.farm.json")
+        farm.write_job_spec(spec, spec_path)
+        settings.farm_spec_path = spec_path
+
+        # Model and preview now, the VAT itself is assembled by the merge
+        pack_normals = settings.vat_normal_encoding == 'PACKED'
+        core.setup_proxy_scene(obj, num_frames, width, height, num_wraps, temp_obj, pack_normals, frame_start, frame_data={"deferred": True, "order": order})
+        if settings.vat_cleanup_enabled:
+            if proxy is None:
+                bpy.data.objects.remove(temp_obj)
+            for scene_name in (obj_name + "_proxy_scene", obj_name + "_vat"):
+                temp_scene = bpy.data.scenes.get(scene_name)
+                if temp_scene is not None:
+                    bpy.data.scenes.remove(temp_scene)
+            utils.purge_orphans()
+
+        for job in spec["Jobs"]:
+            print(subprocess.list2cmdline(farm.job_command(spec_path, job["Index"])))
+        self.report({'INFO'}, f"Wrote {len(spec['Jobs'])} farm jobs to {spec_path}")
+        return {'FINISHED'}
+
+class OBJECT_OT_RunVATFarmJob(bpy.types.Operator):
+    bl_idname = "object.run_vat_farm_job"
+    bl_label = "Run Farm Job"
+    bl_description = "Sample one job's frame slice of a farm job spec and write its raw data and partial bounds"
+
+    spec_path: bpy.props.StringProperty(subtype='FILE_PATH')
+    job_index: bpy.props.IntProperty(min=0)
+
+    def execute(self, context):
+        settings = context.scene.vat_settings
+        spec = farm.read_job_spec(self.spec_path)
+        job = spec["Jobs"][self.job_index]
+
+        target = bpy.data.objects.get(spec["Target"])
+        proxy = bpy.data.objects.get(spec["Proxy"]) if spec["Proxy"] else None
+        if settings.encode_target == 'ACTIVE_OBJECT' and target is None:
+            self.report({'ERROR'}, f"Target '{spec['Target']}' not found")
+            return {'CANCELLED'}
+        if target is not None:
+            context.view_layer.objects.active = target
+        if settings.proxy_method == 'START_FRAME':
+            context.scene.frame_current = spec["FrameStart"]
+
+        split_edges = farm.load_spec_array(self.spec_path, spec, "SplitEdges")
+        obj, temp_obj, _ = core.prepare_encode_objects(context, proxy, split_edges=split_edges)
+        use_normals = spec["NormalEncoding"] != 'NONE'
+        frame_data = utils.sample_frames(obj, ["colPos"], job["FrameStart"], job["FrameEnd"], normals=use_normals, corner_normals=settings.rip_edges)
+        output_path = farm.write_job_result(self.spec_path, self.job_index, frame_data["colPos"], frame_data.get("normals"))
+
+        bpy.data.objects.remove(obj)
+        if proxy is None:
+            bpy.data.objects.remove(temp_obj)
+        print(f"Farm job {self.job_index} (frames {job['FrameStart']}-{job['FrameEnd']}) written to {output_path}")
+        return {'FINISHED'}
+
+class OBJECT_OT_MergeVATFarmJobs(bpy.types.Operator):
+    bl_idname = "object.merge_vat_farm_jobs"
+    bl_label = "Merge Farm Jobs"
+    bl_description = "Assemble the VAT and sidecar from the finished jobs of the planned farm encode, without evaluating any frame"
+
+    def execute(self, context):
+        spec_path = bpy.path.abspath(context.scene.vat_settings.farm_spec_path)
+        if not os.path.exists(spec_path):
+            self.report({'ERROR'}, "No farm job spec found, plan the jobs first")
+            return {'CANCELLED'}
+        spec = farm.read_job_spec(spec_path)
+
+        write_buffer = None
+        if spec["OutputFormat"] == 'IMAGE':
+            def write_buffer(buffer, path):
+                extension = '.' + ''.join(filter(str.isalpha, spec["ImageFormat"])).lower()
+                utils.save_float_image(os.path.basename(path) + extension, buffer, path + extension, spec["ImageFormat"])
+                return path + extension
+
+        try:
+            output_path = farm.merge_jobs(spec_path, write_buffer=write_buffer)
+        except RuntimeError as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Farm encode merged to {output_path}")
+        return {'FINISHED'}
+
+class OBJECT_OT_ReportVATDuplicates(bpy.types.Operator):
+    bl_idname = "object.report_vat_duplicates"
+    bl_label = "Report Duplicate VATs"
+    bl_description = "List indexed encodes with identical content and the storage that could be reclaimed (printed to the console)"
+
+    def execute(self, context):
+        settings = context.scene.vat_settings
+        connection = assets.open_index(bpy.path.abspath(settings.asset_index_path) or None)
+        try:
+            removed = assets.prune(connection)
+            groups, total = assets.duplicates(connection)
+        finally:
+            connection.close()
+        print(assets.format_duplicates(groups, total))
+        if removed:
+            print(f"Asset index: removed {removed} entries whose files no longer exist")
+        self.report({'INFO'}, f"{len(groups)} duplicate VAT group(s), {total / (1024 * 1024):.1f} MB reclaimable")
+        return {'FINISHED'}
+
+class OBJECT_OT_AnalyzeVATFrames(bpy.types.Operator):
+    bl_idname = "object.analyze_vat_frames"
+    bl_label = "Analyze Frames"
+    bl_description = "Sample the encode target over the frame range and count duplicate frames and loops, to estimate the saving of frame deduplication"
+
+    def execute(self, context):
+        settings = context.scene.vat_settings
+        targets = utils.get_encode_targets(context)
+        if not targets:
+            self.report({'WARNING'}, "No valid mesh target")
+            return {'CANCELLED'}
+
+        frame_data = utils.sample_target_positions(targets, context.scene.frame_start, context.scene.frame_end)
+        if frame_data is None:
+            self.report({'ERROR'}, "Vertex count changes between frames")
+            return {'CANCELLED'}
+
+        unique_frames, frame_map = encoding.find_unique_frames(frame_data, settings.dedup_tolerance)
+        loop = encoding.detect_loop(unique_frames, frame_map)
+        settings.analysis_frames = len(frame_map)
+        settings.analysis_unique_frames = len(unique_frames)
+        settings.analysis_loop_start = context.scene.frame_start + loop["Start"] if loop else -1
+
+        self.report({'INFO'}, f"{len(unique_frames)} unique of {len(frame_map)} frames")
+        return {'FINISHED'}
+
+
+classes = [OBJECT_OT_CalculateVATResolution, OBJECT_OT_OpenOutputDirectory, OBJECT_OT_ScanFloatPointAttributes, OBJECT_OT_AddCustomAttribute, OBJECT_OT_RemoveCustomAttribute, OBJECT_OT_AddVATClip, OBJECT_OT_RemoveVATClip, OBJECT_OT_ScanVATClips, OBJECT_OT_VATPreflight, OBJECT_OT_PlanVATFarmJobs, OBJECT_OT_RunVATFarmJob, OBJECT_OT_MergeVATFarmJobs, OBJECT_OT_ReportVATDuplicates, OBJECT_OT_AnalyzeVATFrames]
\ No newline at end of file
@@ -1,6 +1,6 @@
 import bpy
 import os
-from . import utils
+from . import utils, preflight
 from . import operators
 
 class OBJECT_PT_VAT_OPTIONS(bpy.types.Panel):
@@ -32,6 +32,29 @@ class OBJECT_PT_VAT_OPTIONS(bpy.types.Panel):
         grid.prop(scene, "frame_start", text="Start")
         grid.separator()
         grid.prop(scene, "frame_end", text="End")
+
+        row = layout.row(align=True)
+        row.prop(settings, "use_clips", toggle=True, icon='NLA')
+        if settings.use_clips:
+            row.prop(settings, "clip_object", text="")
+            box = layout.box()
+            box.operator("object.scan_vat_clips", icon='VIEWZOOM')
+            for index, clip in enumerate(settings.clips):
+                row = box.row(align=True)
+                row.prop(clip, "name", text="")
+                row.prop(clip, "source", text="")
+                row.operator("object.remove_vat_clip", text="", icon='X').index = index
+                row = box.row(align=True)
+                if clip.source == 'ACTION':
+                    row.prop(clip, "action", text="")
+                elif clip.source == 'NLA_STRIP':
+                    row.prop(clip, "strip", text="")
+                else:
+                    row.prop(clip, "frame_start")
+                    row.prop(clip, "frame_end")
+                row.prop(clip, "fps")
+                row.prop(clip, "loop", toggle=True)
+            box.operator("object.add_vat_clip", text="Add Clip", icon='ADD')
         
         row = layout.row()
         layout.separator()
@@ -60,15 +83,56 @@ class OBJECT_PT_VAT_OPTIONS(bpy.types.Panel):
 
             row = layout.row()
             row.prop(settings, "clean_mesh", text="Strip Vertex Data", toggle=True) 
-            row = layout.row()
+            row = layout.row(align=True)
             row.prop(settings, "rip_edges", toggle=True)
+            if settings.rip_edges:
+                row.prop(settings, "edge_split_method", text="")
+                if settings.edge_split_method == 'NORMALS':
+                    row.prop(settings, "split_angle", text="")
+
+        elif settings.encode_type == 'RIGID':
+            grid = layout.grid_flow(row_major=True, columns=2, even_columns=True, even_rows=True, align=True)
+            grid.label(text="Deformation Basis")
+            grid.prop(settings, "proxy_method", text="")
+            row = layout.row(align=True)
+            row.label(text="Transform")
+            row.prop(settings, "vat_transform", expand=True)
+            row = layout.row()
+            row.prop(settings, "rigid_tolerance")
+
+            layout.separator()
+            row = layout.row()
+            row.label(text="Mesh Settings", icon="SETTINGS")
+            row = layout.row()
+            row.prop(settings, "clean_mesh", text="Strip Vertex Data", toggle=True)
+
+        elif settings.encode_type == 'SKINNING':
+            grid = layout.grid_flow(row_major=True, columns=2, even_columns=True, even_rows=True, align=True)
+            grid.label(text="Deformation Basis")
+            grid.prop(settings, "proxy_method", text="")
+            row = layout.row(align=True)
+            row.label(text="Transform")
+            row.prop(settings, "vat_transform", expand=True)
+            row = layout.row(align=True)
+            row.prop(settings, "skin_bones")
+            row.prop(settings, "skin_influences")
+            row = layout.row()
+            row.prop(settings, "skin_iterations")
+
+            layout.separator()
+            row = layout.row()
+            row.label(text="Mesh Settings", icon="SETTINGS")
+            row = layout.row()
+            row.prop(settings, "clean_mesh", text="Strip Vertex Data", toggle=True)
        
         else:
             box = layout.box()
             box.operator("object.scan_attributes", text="Scan For Attributes", icon='VIEWZOOM')
-            box.prop(settings, "custom_attr_1", text="R Channel")
-            box.prop(settings, "custom_attr_2", text="G Channel")
-            box.prop(settings, "custom_attr_3", text="B Channel")
+            for index, item in enumerate(settings.custom_attributes):
+                row = box.row(align=True)
+                row.prop(item, "name", text="")
+                row.operator("object.remove_custom_attribute", text="", icon='X').index = index
+            box.operator("object.add_custom_attribute", text="Add Attribute", icon='ADD')
 
             layout.separator()
             row = layout.row()
@@ -76,8 +140,12 @@ class OBJECT_PT_VAT_OPTIONS(bpy.types.Panel):
 
             row = layout.row()
             row.prop(settings, "clean_mesh", text="Strip Vertex Data", toggle=True) 
-            row = layout.row()
+            row = layout.row(align=True)
             row.prop(settings, "rip_edges", toggle=True)
+            if settings.rip_edges:
+                row.prop(settings, "edge_split_method", text="")
+                if settings.edge_split_method == 'NORMALS':
+                    row.prop(settings, "split_angle", text="")
         
 # Output Settings - relating to data being exported      
 class OBJECT_PT_VAT_OUTPUT(bpy.types.Panel):
@@ -129,6 +197,12 @@ class OBJECT_PT_VAT_OUTPUT(bpy.types.Panel):
         
         if os.path.isdir(abs_path):
             row.operator("object.calculate_vat_resolution", text="Encode Vertex Animation Texture", icon='MOD_DATA_TRANSFER')
+            row.operator("object.vat_preflight", text="", icon='CHECKMARK')
+            if settings.encode_type == 'DEFAULT':
+                row = layout.row(align=True)
+                row.prop(settings, "farm_jobs", text="Jobs")
+                row.operator("object.plan_vat_farm_jobs", text="Plan Farm Jobs", icon='NETWORK_DRIVE')
+                row.operator("object.merge_vat_farm_jobs", text="Merge", icon='AUTOMERGE_ON')
         else:
             row.label(text="Export directory not set", icon='WARNING_LARGE')
         abs_path = bpy.path.abspath(settings.vat_output_directory)
@@ -139,13 +213,83 @@ class OBJECT_PT_VAT_OUTPUT(bpy.types.Panel):
         if settings.export_mesh:
             grid.label(text="Model Format")
             grid.prop(settings, "mesh_format", text="")
-        grid.label(text="Image Format")
-        grid.prop(settings, "image_format", text="")
+        grid.label(text="Output Format")
+        grid.prop(settings, "output_format", text="")
+        if settings.output_format == 'IMAGE':
+            grid.label(text="Image Format")
+            grid.prop(settings, "image_format", text="")
+        else:
+            grid.label(text="Precision")
+            grid.prop(settings, "raw_precision", text="")
         row = layout.row()
         row.prop(settings, "use_single_row", toggle=True)
-        if settings.image_format == 'EXR32':
+        if settings.output_format != 'IMAGE':
+            row = layout.row(align=True)
+            row.prop(settings, "stream_encode", toggle=True)
+            sub = row.row(align=True)
+            sub.enabled = settings.stream_encode
+            sub.prop(settings, "stream_chunk_frames", text="Chunk")
+        grid = layout.grid_flow(row_major=True, columns=2, even_columns=True, even_rows=True, align=True)
+        grid.label(text="Vertex Order")
+        grid.prop(settings, "vertex_order", text="")
+        grid.label(text="Encode Backend")
+        grid.prop(settings, "encode_backend", text="")
+        grid.label(text="Preview Mode")
+        grid.prop(settings, "preview_mode", text="")
+        if settings.preview_mode == 'CACHE':
+            grid.label(text="Cached Frames")
+            grid.prop(settings, "preview_cache_frames", text="")
+        if settings.image_format == 'EXR32' or settings.output_format != 'IMAGE':
             row = layout.row()
             row.prop(settings, "no_remap", text="Use Absolute Values", toggle=True)
+        elif settings.image_format in {'PNG8', 'PNG16'}:
+            row = layout.row()
+            row.prop(settings, "split_precision", toggle=True)
+        row = layout.row(align=True)
+        row.prop(settings, "lean_memory", toggle=True)
+        row.prop(settings, "isolate_evaluation", toggle=True)
+        row = layout.row(align=True)
+        row.prop(settings, "use_asset_index", toggle=True)
+        sub = row.row(align=True)
+        sub.enabled = settings.use_asset_index
+        sub.prop(settings, "asset_reuse_mode", text="")
+        row.operator("object.report_vat_duplicates", text="", icon='DUPLICATE')
+        if settings.use_asset_index:
+            layout.prop(settings, "asset_index_path", text="")
+        row = layout.row(align=True)
+        row.prop(settings, "event_log", toggle=True)
+        row.prop(settings, "event_stdout", toggle=True)
+        if settings.event_log:
+            layout.prop(settings, "event_log_path", text="")
+        if settings.encode_type == 'DEFAULT':
+            row = layout.row(align=True)
+            row.prop(settings, "pca_compression", toggle=True)
+            sub = row.row(align=True)
+            sub.enabled = settings.pca_compression
+            sub.prop(settings, "pca_tolerance", text="")
+            sub.prop(settings, "pca_max_components")
+        row = layout.row(align=True)
+        row.prop(settings, "dedup_frames", toggle=True)
+        sub = row.row(align=True)
+        sub.enabled = settings.dedup_frames
+        sub.prop(settings, "dedup_tolerance", text="")
+        row = layout.row(align=True)
+        row.prop(settings, "export_header", toggle=True)
+        sub = row.row(align=True)
+        sub.enabled = settings.export_header
+        sub.prop(settings, "export_header_json", toggle=True)
+        if settings.encode_type == 'DEFAULT':
+            row = layout.row(align=True)
+            row.prop(settings, "export_frame_bounds", toggle=True)
+            sub = row.row(align=True)
+            sub.enabled = settings.export_frame_bounds
+            sub.prop(settings, "export_wrap_bounds", toggle=True)
+            sub.prop(settings, "export_bounds_texture", toggle=True)
+            row = layout.row(align=True)
+            row.prop(settings, "export_velocity", toggle=True)
+            sub = row.row(align=True)
+            sub.enabled = settings.export_velocity
+            sub.prop(settings, "velocity_loop", toggle=True)
         box = layout.box()
         row = box.row()
         row.prop(settings, "show_encoding_info", icon="INFO_LARGE", emboss=False)
@@ -165,6 +309,15 @@ class OBJECT_PT_VAT_OUTPUT(bpy.types.Panel):
                                 max_verts += utils.get_virtual_ripped_vertex_count(child_obj)
                     
             num_frames = scene.frame_end - scene.frame_start + 1
+            if settings.use_clips:
+                try:
+                    num_frames = sum(clip["Frames"] for clip in utils.resolve_clips(context))
+                except ValueError:
+                    pass # Reported by the pre-flight check
+            total_frames = num_frames
+            analyzed = settings.dedup_frames and settings.analysis_frames == total_frames
+            if analyzed:
+                num_frames = settings.analysis_unique_frames
             
             # Determine resolution
             if settings.use_single_row and settings.encode_type == 'DEFAULT':
@@ -190,7 +343,15 @@ class OBJECT_PT_VAT_OUTPUT(bpy.types.Panel):
                     box.label(text=f"Encode Target: {obj.name}", icon='MESH_DATA')
 
             row = box.row()
-            row.label(text=f"Total Frames: {num_frames}", icon='ANIM')
+            row.label(text=f"Total Frames: {total_frames}", icon='ANIM')
+            if settings.dedup_frames:
+                row = box.row()
+                if analyzed:
+                    saved = total_frames - num_frames
+                    row.label(text=f"Unique Frames: {num_frames} (saves {saved} rows per wrap, {saved / max(total_frames, 1):.0%})", icon='DUPLICATE')
+                    if settings.analysis_loop_start >= 0:
+                        box.row().label(text=f"Loop detected from frame {settings.analysis_loop_start}", icon='FILE_REFRESH')
+                row.operator("object.analyze_vat_frames", text="" if analyzed else "Analyze Frames", icon='VIEWZOOM')
 
             # Edge split / range check
             use_range = settings.vat_normal_encoding != 'NONE' and settings.rip_edges
@@ -202,7 +363,14 @@ class OBJECT_PT_VAT_OUTPUT(bpy.types.Panel):
                 box.row().label(text=f"Vertices: {num_vertices}", icon='VERTEXSEL')
 
             # Resolution reporting
-            if settings.encode_target != "COLLECTION_BATCH":
+            if settings.encode_type == 'RIGID':
+                row = box.row()
+                row.label(text="Resolution determined by rigid piece count", icon='MOD_EXPLODE')
+            elif settings.encode_type == 'SKINNING':
+                width, height, _ = utils.get_vat_resolution(settings, settings.skin_bones, num_frames)
+                row = box.row()
+                row.label(text=f"Resolution: {width} x {height} ({settings.skin_bones} bones)", icon='BONE_DATA')
+            elif settings.encode_target != "COLLECTION_BATCH":
                 label = f"Resolution: {width} x {height}" if not use_range else f"Resolution: {width} x {height} - {maxwidth} x {maxheight}"
                 row = box.row()
                 row.label(text=label, icon='FILE_IMAGE' if use_range else 'IMAGE_DATA')
@@ -212,6 +380,28 @@ class OBJECT_PT_VAT_OUTPUT(bpy.types.Panel):
             else:
                 row = box.row()
                 row.label(text="Resolution calculated per batch object", icon="OUTLINER_OB_IMAGE")
+
+            # Budget estimate next to the values measured on the last encode
+            custom_channels = 0
+            if settings.encode_type == 'CUSTOM' and obj and obj.type == 'MESH':
+                for name in utils.get_custom_attribute_names(settings):
+                    attribute = obj.data.attributes.get(name)
+                    custom_channels += 3 if attribute and attribute.data_type == 'FLOAT_VECTOR' else 1
+            estimate = preflight.estimate_encode(settings, max_verts if use_range else num_vertices, num_frames, custom_channels)
+            if estimate is not None:
+                box.row().label(text=f"Estimated Output: {preflight.format_bytes(estimate['OutputBytes'])}, GPU {preflight.format_bytes(estimate['TextureBytes'])}", icon='DISK_DRIVE')
+                box.row().label(text=f"Estimated Peak Memory: {preflight.format_bytes(estimate['PeakMemoryBytes'])}", icon='MEMORY')
+            else:
+                box.row().label(text="No texture up to 8192 fits this vertex and frame count", icon='ERROR')
+            if settings.measured_output > 0:
+                box.row().label(text=f"Last Encode: output {settings.measured_output:.1f} MB (est. {settings.estimated_output:.1f}), peak memory +{settings.measured_peak_memory:.1f} MB (est. {settings.estimated_peak_memory:.1f})", icon='TIME')
+            row = box.row(align=True)
+            row.prop(settings, "use_budget", toggle=True)
+            if settings.use_budget:
+                col = box.column(align=True)
+                col.prop(settings, "memory_budget", text="Memory (MB)")
+                col.prop(settings, "texture_budget", text="Texture (MB)")
+                col.prop(settings, "disk_budget", text="Disk (MB)")
                 
 
 classes = [OBJECT_PT_VAT_OPTIONS, OBJECT_PT_VAT_OUTPUT]
\ No newline at end of file
@@ -0,0 +1,481 @@
+# OpenVAT pre-flight - cheap checks run before any scene, render or export work
+#
+# Failures an encode would otherwise hit minutes in (topology changing between frames, a proxy
+# that doesn't match the target, missing custom attributes, an unwritable or full output
+# directory, a mesh too dense for the largest texture) are found here from a handful of sampled
+# frames, so the encode can abort up front with one complete report.
+
+import bpy
+import os
+import math
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from . import utils, backends
+
+MAX_RESOLUTION = 8192
+OUTPUT_MARGIN = 1.1 # Headroom on predicted output bytes for sidecars, mesh and container overhead
+
+# Bytes per channel of each stored texel format
+CHANNEL_BYTES = {'PNG8': 1, 'PNG16': 2, 'EXR16': 2, 'EXR32': 4, 'RAW16': 2, 'RAW32': 4}
+
+TOPOLOGY_KEYS = ("Vertices", "Edges", "Faces", "Loops", "Hash")
+
+MB = 1024 * 1024
+
+# Smaller texel format tried when the texture or disk budget is exceeded, float formats only
+FORMAT_STEPS = {'EXR32': 'EXR16'}
+
+
+# Element counts and a hash of the index arrays, equal signatures mean the same vertex/face layout
+def topology_signature(mesh):
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (loop_vertices, loop_totals, edges):
+        digest.update(array.tobytes())
+    return {
+        "Vertices": len(mesh.vertices),
+        "Edges": len(mesh.edges),
+        "Faces": len(mesh.polygons),
+        "Loops": len(mesh.loops),
+        "Hash": digest.hexdigest(),
+        "Attributes": {a.name: a.data_type for a in mesh.attributes},
+    }
+
+
+# Evenly spread check frames over the range, always including the first and last frame
+def check_frames(frame_start, frame_end, count=3):
+    if frame_end <= frame_start:
+        return [frame_start]
+    return sorted({int(round(f)) for f in np.linspace(frame_start, frame_end, max(2, count))})
+
+
+# Topology signature of every object at each frame: {name: [(frame, signature), ...]}
+def sample_topology(objects, frames):
+    scene = bpy.context.scene
+    current = scene.frame_current
+    signatures = {obj.name: [] for obj in objects}
+    try:
+        for frame in frames:
+            scene.frame_set(frame)
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            for obj in objects:
+                eval_obj = obj.evaluated_get(depsgraph)
+                mesh = eval_obj.to_mesh()
+                try:
+                    signatures[obj.name].append((frame, topology_signature(mesh)))
+                finally:
+                    eval_obj.to_mesh_clear()
+    finally:
+        scene.frame_set(current)
+    return signatures
+
+
+def describe_topology_change(before, after):
+    changed = [f"{key.lower()} {before[key]} -> {after[key]}" for key in TOPOLOGY_KEYS if key != "Hash" and before[key] != after[key]]
+    return ", ".join(changed) if changed else "same counts but different face/edge indices"
+
+
+def _existing_parent(path):
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    return path
+
+
+# Error message if the output directory can't be created or written to, else None
+def check_output_directory(directory):
+    if not directory:
+        return "No output directory set"
+    parent = _existing_parent(directory)
+    if parent is None or not os.path.isdir(parent):
+        return f"Output directory {directory} can't be created ({parent} is not a directory)"
+    try:
+        with tempfile.TemporaryFile(dir=parent):
+            pass
+    except OSError as exception:
+        return f"Output directory {parent} is not writable ({exception.strerror})"
+    return None
+
+
+# Physical memory available to new allocations in bytes, None where it can't be queried
+def available_memory():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if os.name == 'nt':
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+    return None
+
+
+# Resident memory of this process in bytes, None where it can't be queried
+def process_memory():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+def format_bytes(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num_bytes) < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def estimate_encode(settings, num_vertices, num_frames, custom_channels=0):
+    """
+    Predicted layout and sizes of an encode: resolution, output bytes on disk (uncompressed,
+    an upper bound for PNG/EXR), texture bytes once loaded on the GPU (RGBA) and peak memory
+    of the sampled data plus the float buffer. Returns None if no texture fits.
+    """
+    # PCA rows are the mean and basis shapes, at most max shapes + 1 (every frame without a limit)
+    layout_frames = num_frames
+    if utils.uses_pca(settings) and settings.pca_max_components > 0:
+        layout_frames = min(num_frames, settings.pca_max_components + 1)
+    resolution = utils.get_vat_resolution(settings, num_vertices, layout_frames)
+    if resolution is None:
+        return None
+    width, height, num_wraps = resolution
+    texels = width * height
+    channel_bytes = CHANNEL_BYTES[utils.get_texel_format(settings)]
+
+    textures = 1
+    channels = 4 if settings.output_format != 'IMAGE' else 3
+    sampled_channels = 3
+    if settings.encode_type == 'CUSTOM':
+        textures = max(1, math.ceil(custom_channels / 4))
+        channels = 4 if custom_channels > 3 else channels
+        sampled_channels = max(1, custom_channels)
+    elif settings.encode_type == 'DEFAULT' and settings.vat_normal_encoding == 'SEPARATE' and not utils.uses_pca(settings):
+        textures = 2
+    with_velocity = settings.encode_type == 'DEFAULT' and settings.export_velocity and not utils.uses_streaming(settings) and not utils.uses_pca(settings)
+    if with_velocity:
+        textures += 1
+    if utils.get_split_bits(settings):
+        textures *= 2 # Every texture gets a _lo companion
+
+    # Sampled frames are float32, normals are sampled alongside positions when encoded
+    with_normals = settings.encode_type == 'DEFAULT' and settings.vat_normal_encoding != 'NONE' and not utils.uses_pca(settings)
+    sampled_frames = num_frames
+    if utils.uses_streaming(settings):
+        sampled_frames = min(num_frames, max(1, settings.stream_chunk_frames))
+    sample_bytes = sampled_frames * num_vertices * sampled_channels * 4 * (1 + with_normals + with_velocity)
+    if not utils.uses_sampled_encode(settings) and settings.vat_normal_encoding != 'SEPARATE':
+        sample_bytes = 0 # Render path reads positions on the GPU
+    # RGBA float32 working buffer (or render result), plus the image copy when saving images
+    buffer_bytes = texels * 16 * (2 if settings.output_format == 'IMAGE' else 1)
+    if utils.uses_streaming(settings):
+        buffer_bytes = sampled_frames * num_wraps * width * 16
+
+    return {
+        "Width": width,
+        "Height": height,
+        "Wraps": num_wraps,
+        "Vertices": num_vertices,
+        "Frames": num_frames,
+        "Channels": custom_channels,
+        "Textures": textures,
+        "OutputBytes": texels * channels * channel_bytes * textures,
+        "TextureBytes": texels * 4 * channel_bytes * textures,
+        "PeakMemoryBytes": sample_bytes + buffer_bytes,
+    }
+
+
+def run_preflight(context, samples=3, farm=False):
+    """
+    Validate the current encode settings without creating any data, farm for a planned farm encode.
+    Returns {"Errors", "Warnings", "Estimate", "Frames"}, the encode must not start with errors.
+    """
+    scene = context.scene
+    settings = scene.vat_settings
+    errors = []
+    warnings = []
+    estimate = None
+
+    output_error = check_output_directory(bpy.path.abspath(settings.vat_output_directory))
+    if output_error:
+        errors.append(output_error)
+
+    frame_start, frame_end = scene.frame_start, scene.frame_end
+    num_frames = frame_end - frame_start + 1
+    frames = check_frames(frame_start, frame_end, samples)
+
+    # Clip libraries stack every clip, the topology check still samples the scene range
+    if settings.use_clips:
+        try:
+            num_frames = sum(clip["Frames"] for clip in utils.resolve_clips(context))
+        except ValueError as error:
+            errors.append(str(error))
+        if settings.stream_encode and settings.output_format != 'IMAGE':
+            warnings.append("Clip libraries sample every clip up front, encoding without streaming")
+
+    # Encode target, custom mode always encodes the active object
+    if settings.encode_type == 'CUSTOM' or settings.encode_target == 'ACTIVE_OBJECT':
+        obj = context.active_object
+        targets = [obj] if obj and obj.type == 'MESH' else []
+        if not targets:
+            errors.append("Active object is not a mesh")
+    else:
+        targets = utils.get_encode_targets(context)
+        if settings.vat_collection is None:
+            errors.append("No target collection set")
+        elif not targets:
+            errors.append(f"Collection {settings.vat_collection.name} has no mesh objects")
+
+    proxy = None
+    if settings.proxy_method == 'SELECTED_OBJECT':
+        selected = context.selected_objects
+        if len(selected) != 2 or context.active_object not in selected:
+            errors.append("Selected Object proxy needs exactly 2 selected objects, the active one being the target")
+        else:
+            proxy = next(o for o in selected if o != context.active_object)
+            if proxy.type != 'MESH':
+                errors.append(f"Proxy {proxy.name} is not a mesh")
+                proxy = None
+
+    if settings.split_precision and not utils.get_split_bits(settings):
+        warnings.append("Hi/lo split applies to PNG8 and PNG16 image outputs only, encoding without it")
+
+    if utils.uses_pca(settings):
+        skipped = [label for label, enabled in (
+            ("normals", settings.vat_normal_encoding != 'NONE'), ("velocity", settings.export_velocity),
+            ("frame bounds", settings.export_frame_bounds), ("streaming", settings.stream_encode)) if enabled]
+        if skipped:
+            warnings.append(f"PCA compression encodes positions from every sampled frame, skipping {', '.join(skipped)}")
+
+    if settings.export_velocity and settings.encode_type == 'DEFAULT' and utils.uses_streaming(settings):
+        warnings.append("Velocity needs every frame sampled up front, streamed encodes are written without it")
+
+    if settings.encode_backend != 'AUTO':
+        reason = backends.BACKENDS[settings.encode_backend].unsupported(settings)
+        if reason:
+            errors.append(reason)
+    # The merge only assembles positions (and normals), anything else would be missing from the farm output
+    if farm and utils.get_split_bits(settings):
+        errors.append("Farm merges write single textures, turn off Hi/Lo Split for farm encodes")
+    if farm and settings.dedup_frames:
+        errors.append("Farm merges keep every frame, turn off Deduplicate Frames for farm encodes")
+    if farm and settings.export_velocity:
+        errors.append("Farm merges write no velocity texture, turn off Velocity for farm encodes")
+    if farm and utils.uses_pca(settings):
+        errors.append("Farm jobs encode frames, not a PCA basis, turn off PCA Compression for farm encodes")
+
+    if not targets:
+        return {"Errors": errors, "Warnings": warnings, "Estimate": estimate, "Frames": frames}
+
+    # Topology must hold across the range, compared on a few frames against the first
+    signatures = sample_topology(targets + ([proxy] if proxy else []), frames)
+    for obj in targets:
+        first_frame, first = signatures[obj.name][0]
+        for frame, signature in signatures[obj.name][1:]:
+            if any(signature[key] != first[key] for key in TOPOLOGY_KEYS):
+                errors.append(f"{obj.name}: topology changes between frame {first_frame} and {frame} ({describe_topology_change(first, signature)})")
+                break
+
+    num_vertices = sum(signatures[obj.name][0][1]["Vertices"] for obj in targets)
+    num_faces = sum(signatures[obj.name][0][1]["Faces"] for obj in targets)
+    ripped = settings.rip_edges and settings.vat_normal_encoding != 'NONE' and settings.encode_type not in {'RIGID', 'SKINNING'}
+    # Edge splitting adds vertices along sharp edges, at most one per face corner
+    max_vertices = sum(signatures[obj.name][0][1]["Loops"] for obj in targets) if ripped else num_vertices
+
+    # Custom proxy must match the bake object vertex for vertex
+    if proxy is not None:
+        proxy_signature = signatures[proxy.name][0][1]
+        if proxy_signature["Faces"] != num_faces:
+            errors.append(f"Proxy {proxy.name} has {proxy_signature['Faces']} faces but the target has {num_faces}")
+        elif not ripped and proxy_signature["Vertices"] != num_vertices:
+            errors.append(f"Proxy {proxy.name} has {proxy_signature['Vertices']} vertices but the target has {num_vertices}")
+        elif ripped:
+            warnings.append(f"Proxy vertex count can't be verified before edge splitting, {proxy.name} must match the split target")
+        elif len(targets) == 1 and proxy_signature["Hash"] != signatures[targets[0].name][0][1]["Hash"]:
+            warnings.append(f"Proxy {proxy.name} has matching counts but different face indices, vertex order may not correspond")
+
+    custom_channels = 0
+    if settings.encode_type == 'CUSTOM':
+        attr_names = utils.get_custom_attribute_names(settings)
+        if not attr_names:
+            errors.append("Add at least one custom attribute to encode")
+        for frame, signature in signatures[targets[0].name]:
+            missing = [name for name in attr_names if name not in signature["Attributes"]]
+            if missing:
+                errors.append(f"Missing attributes at frame {frame}: {', '.join(missing)}. Please rescan")
+                break
+        attributes = signatures[targets[0].name][0][1]["Attributes"]
+        custom_channels = sum(3 if attributes.get(name) == 'FLOAT_VECTOR' else 1 for name in attr_names)
+
+    if settings.dedup_frames and settings.analysis_frames == num_frames:
+        num_frames = settings.analysis_unique_frames
+
+    # Resolution and size predictions use the worst case vertex count, skinning one column per bone
+    if settings.encode_type == 'SKINNING':
+        max_vertices = num_vertices = min(settings.skin_bones, num_vertices)
+    estimate = estimate_encode(settings, max_vertices, num_frames, custom_channels)
+    if estimate is None or max(estimate["Width"], estimate["Height"]) > MAX_RESOLUTION:
+        if estimate_encode(settings, num_vertices, num_frames, custom_channels) is None:
+            errors.append(f"{num_vertices} vertices over {num_frames} frames don't fit in a {MAX_RESOLUTION}x{MAX_RESOLUTION} texture, shorten the frame range or reduce the vertex count")
+        elif estimate is None:
+            warnings.append(f"Up to {max_vertices} vertices after edge splitting may not fit in a {MAX_RESOLUTION}x{MAX_RESOLUTION} texture")
+        else:
+            errors.append(f"Single row layout needs {estimate['Width']}x{estimate['Height']}, over the {MAX_RESOLUTION} texture limit")
+
+    if estimate is not None:
+        memory = available_memory()
+        if memory is not None and estimate["PeakMemoryBytes"] > memory:
+            warnings.append(f"Estimated peak memory {format_bytes(estimate['PeakMemoryBytes'])} exceeds available memory {format_bytes(memory)}")
+
+        parent = _existing_parent(bpy.path.abspath(settings.vat_output_directory)) if not output_error else None
+        if parent is not None:
+            free = shutil.disk_usage(parent).free
+            needed = estimate["OutputBytes"] * OUTPUT_MARGIN
+            if needed > free:
+                errors.append(f"Output needs up to {format_bytes(needed)} but only {format_bytes(free)} is free on {parent}")
+
+    return {"Errors": errors, "Warnings": warnings, "Estimate": estimate, "Frames": frames}
+
+
+def format_report(report):
+    lines = [f"OpenVAT pre-flight (frames checked: {', '.join(str(f) for f in report['Frames'])})"]
+    estimate = report["Estimate"]
+    if estimate is not None:
+        lines.append(f"  Layout: {estimate['Vertices']} vertices x {estimate['Frames']} frames -> {estimate['Width']} x {estimate['Height']}, {estimate['Wraps']} wraps, {estimate['Textures']} texture(s)")
+        lines.append(f"  Output: up to {format_bytes(estimate['OutputBytes'])}, GPU texture {format_bytes(estimate['TextureBytes'])}, peak memory ~{format_bytes(estimate['PeakMemoryBytes'])}")
+    lines += [f"  ERROR: {message}" for message in report["Errors"]]
+    lines += [f"  WARNING: {message}" for message in report["Warnings"]]
+    return "\n".join(lines)
+
+
+def apply_budget(settings, estimate, restore):
+    """
+    Adjust settings so the encode fits the memory, texture and disk budgets (MB, 0 = no limit).
+    Over the memory budget, raw outputs switch to streaming with the largest chunk that fits;
+    over the texture or disk budget, full float output drops to half float (not for disk alone when
+    streaming, the stream stages full float positions either way).
+    The original value of every changed setting is stored in restore, the caller puts them back
+    once the encode is done so the budget never changes the saved settings.
+    Returns (estimate, changes, warnings) with the estimate for the adjusted settings.
+    """
+    changes = []
+    warnings = []
+
+    def refresh():
+        return estimate_encode(settings, estimate["Vertices"], estimate["Frames"], estimate["Channels"])
+
+    def change(key, value):
+        restore.setdefault(key, getattr(settings, key))
+        setattr(settings, key, value)
+
+    memory_budget = settings.memory_budget * MB
+    if memory_budget and estimate["PeakMemoryBytes"] > memory_budget:
+        if utils.can_stream(settings):
+            # Peak memory of a one-frame chunk sets how many frames fit in the budget
+            if not settings.stream_encode:
+                change("stream_encode", True)
+                changes.append("Streaming encode enabled")
+            change("stream_chunk_frames", 1)
+            per_frame = refresh()["PeakMemoryBytes"]
+            chunk_frames = max(1, min(estimate["Frames"], int(memory_budget // max(per_frame, 1))))
+            change("stream_chunk_frames", chunk_frames)
+            changes.append(f"Streaming chunk set to {chunk_frames} frames")
+        else:
+            if settings.output_format != 'IMAGE':
+                warnings.append("Over the memory budget, but PCA, clip library and non-standard encodes sample every frame up front and can't stream")
+            if not settings.lean_memory:
+                change("lean_memory", True)
+                changes.append("Low memory mode enabled")
+        estimate = refresh()
+
+    texture_budget = settings.texture_budget * MB
+    disk_budget = settings.disk_budget * MB
+    over_texture = texture_budget and estimate["TextureBytes"] > texture_budget
+    over_disk = disk_budget and estimate["OutputBytes"] * OUTPUT_MARGIN > disk_budget
+    if over_texture or over_disk:
+        if settings.output_format == 'IMAGE' and settings.image_format in FORMAT_STEPS:
+            change("image_format", FORMAT_STEPS[settings.image_format])
+            changes.append(f"Image format lowered to {settings.image_format}")
+        elif settings.output_format != 'IMAGE' and settings.raw_precision == 'FLOAT':
+            # A remapped half float stream keeps full float positions on disk until the bounds are known
+            streamed = utils.uses_streaming(settings) and utils.uses_remap(settings)
+            if streamed and not over_texture:
+                warnings.append("Over the disk budget, but a streamed encode stages full float positions until they are normalized, precision left at full float")
+            else:
+                change("raw_precision", 'HALF')
+                changes.append("Raw precision lowered to half float")
+                if streamed:
+                    warnings.append("Precision lowered to half float for a streamed encode, positions are staged in a full float scratch file next to the output until they are normalized")
+        estimate = refresh()
+
+    if memory_budget and estimate["PeakMemoryBytes"] > memory_budget:
+        warnings.append(f"Estimated peak memory {format_bytes(estimate['PeakMemoryBytes'])} still exceeds the {format_bytes(memory_budget)} budget")
+    if texture_budget and estimate["TextureBytes"] > texture_budget:
+        warnings.append(f"Estimated texture memory {format_bytes(estimate['TextureBytes'])} still exceeds the {format_bytes(texture_budget)} budget")
+    if disk_budget and estimate["OutputBytes"] * OUTPUT_MARGIN > disk_budget:
+        warnings.append(f"Estimated output {format_bytes(estimate['OutputBytes'])} still exceeds the {format_bytes(disk_budget)} budget")
+    return estimate, changes, warnings
+
+
+# Event callback measuring an encode: peak resident memory above the start and bytes written
+class EncodeMonitor:
+    def __init__(self):
+        self.baseline = process_memory() or 0
+        self.peak = self.baseline
+        self.outputs = {}
+
+    def __call__(self, event):
+        memory = process_memory()
+        if memory is not None:
+            self.peak = max(self.peak, memory)
+        if event["event"] == "output" and event.get("bytes"):
+            self.outputs[event["path"]] = event["bytes"]
+
+    @property
+    def peak_memory_bytes(self):
+        return self.peak - self.baseline
+
+    @property
+    def output_bytes(self):
+        return sum(self.outputs.values())
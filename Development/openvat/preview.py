@@ -0,0 +1,127 @@
+# OpenVAT cache preview - play the encoded animation from a memory-mapped raw position array
+#
+# The decoder preview samples the VAT image through geometry nodes on every frame change, which
+# is slow to scrub on dense meshes. A cache preview instead reads the frame's positions from a
+# (frames, vertices, 3) float32 .npy next to the VAT and writes them into the preview mesh with a
+# single foreach_set. Recently shown frames are kept in a small LRU so scrubbing back and forth
+# doesn't touch the file again.
+#
+# Preview objects carry the cache in custom properties:
+#   ov_position_cache   absolute path of the .npy
+#   ov_cache_start      scene frame of cache frame 0
+#   ov_cache_frame_map  frame -> stored frame, only for deduplicated encodes
+
+import bpy
+import os
+import numpy as np
+from collections import OrderedDict
+from bpy.app.handlers import persistent
+
+PREVIEW_COLLECTION = "OpenVATPreview"
+
+_caches = {}
+
+
+class PositionCache:
+    def __init__(self, filepath, max_frames=32):
+        self.filepath = filepath
+        self.mtime = os.path.getmtime(filepath)
+        self.positions = np.load(filepath, mmap_mode='r')
+        self.max_frames = max_frames
+        self.frames = OrderedDict()
+
+    def frame(self, index):
+        data = self.frames.get(index)
+        if data is not None:
+            self.frames.move_to_end(index)
+            return data
+        # A copy, a float32 slice of the memmap would only be a view and hits would read the file again
+        data = np.array(self.positions[index], dtype=np.float32).ravel()
+        self.frames[index] = data
+        self.trim()
+        return data
+
+    def trim(self):
+        while len(self.frames) > self.max_frames:
+            self.frames.popitem(last=False)
+
+
+def get_cache(filepath, max_frames=32):
+    cache = _caches.get(filepath)
+    if cache is not None and cache.mtime != os.path.getmtime(filepath):
+        cache = None # Re-encoded since it was mapped
+    if cache is None:
+        cache = _caches[filepath] = PositionCache(filepath, max_frames)
+    if cache.max_frames != max_frames:
+        cache.max_frames = max_frames
+        cache.trim()
+    return cache
+
+
+# Drop the mapping of a cache file so it can be rewritten (mapped files can't be replaced on Windows)
+def release_cache(filepath):
+    _caches.pop(os.path.abspath(filepath), None)
+
+
+# Final positions (proxy rest pose plus sampled offsets) per stored frame, written frame by frame
+def write_position_cache(filepath, rest, offsets):
+    release_cache(filepath)
+    out = np.lib.format.open_memmap(filepath, mode='w+', dtype=np.float32, shape=offsets.shape)
+    for frame in range(len(offsets)):
+        out[frame] = rest + offsets[frame]
+    out.flush()
+    del out
+
+
+def attach_cache(obj, filepath, frame_start, frame_map=None):
+    obj["ov_position_cache"] = os.path.abspath(filepath)
+    obj["ov_cache_start"] = int(frame_start)
+    if frame_map is not None:
+        obj["ov_cache_frame_map"] = [int(i) for i in frame_map]
+
+
+def apply_cache_frame(obj, scene):
+    filepath = obj.get("ov_position_cache")
+    if not filepath or obj.type != 'MESH' or not os.path.exists(filepath):
+        return
+    cache = get_cache(filepath, scene.vat_settings.preview_cache_frames)
+    num_frames, num_vertices, _ = cache.positions.shape
+    if num_vertices != len(obj.data.vertices):
+        return
+
+    index = scene.frame_current - obj.get("ov_cache_start", scene.frame_start)
+    frame_map = obj.get("ov_cache_frame_map")
+    if frame_map:
+        index = frame_map[min(max(index, 0), len(frame_map) - 1)]
+    index = min(max(index, 0), num_frames - 1)
+
+    obj.data.vertices.foreach_set("co", cache.frame(index))
+    obj.data.update()
+
+
+@persistent
+def update_cache_previews(scene, depsgraph=None):
+    collection = bpy.data.collections.get(PREVIEW_COLLECTION)
+    if collection is None:
+        return
+    for obj in collection.all_objects:
+        if "ov_position_cache" in obj:
+            apply_cache_frame(obj, scene)
+
+
+@persistent
+def clear_caches(*args):
+    _caches.clear()
+
+
+def register():
+    bpy.app.handlers.frame_change_pre.append(update_cache_previews)
+    bpy.app.handlers.load_pre.append(clear_caches)
+
+
+def unregister():
+    if update_cache_previews in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(update_cache_previews)
+    if clear_caches in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(clear_caches)
+    _caches.clear()
@@ -1,13 +1,62 @@
 import bpy
-from . import utils
+import math
 
-def make_dynamic_enum(idname):
-    def callback(self, context):
-        base = utils._openvat_enum_cache.get(idname, [])
-        if not base or base[0][0] != "NONE":
-            base.insert(0, ("NONE", "None", ""))
-        return base
-    return callback
+# One entry of the custom attribute list, packed in list order 4 channels (RGBA) per texture
+class VATCustomAttribute(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(
+        name="Attribute",
+        description="Float or vector point attribute on the evaluated target. Vector attributes take 3 channels",
+        default="",
+    )
+
+# One entry of the clip library, clips are stacked in list order into one VAT
+class VATClip(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(
+        name="Clip",
+        description="Clip name written to the clip table",
+        default="Clip",
+    )
+    source: bpy.props.EnumProperty(
+        name="Source",
+        description="Where the clip's animation and frames come from",
+        items=[
+            ('RANGE', "Frame Range", "Frames of the scene timeline, with the animation as it is"),
+            ('ACTION', "Action", "An action assigned to the clip object over the action's frame range (its manual frame range when set)"),
+            ('NLA_STRIP', "NLA Strip", "An NLA strip of the clip object, sampled with its track soloed over the strip's frames"),
+        ],
+        default='RANGE'
+    )
+    action: bpy.props.PointerProperty(
+        name="Action",
+        description="Action assigned to the clip object while this clip is sampled",
+        type=bpy.types.Action
+    )
+    strip: bpy.props.StringProperty(
+        name="NLA Strip",
+        description="Name of the NLA strip on the clip object",
+        default="",
+    )
+    frame_start: bpy.props.IntProperty(
+        name="Start",
+        description="First frame of the clip",
+        default=1
+    )
+    frame_end: bpy.props.IntProperty(
+        name="End",
+        description="Last frame of the clip",
+        default=24
+    )
+    fps: bpy.props.FloatProperty(
+        name="FPS",
+        description="Playback rate written to the clip table, 0 uses the scene frame rate",
+        default=0.0,
+        min=0.0
+    )
+    loop: bpy.props.BoolProperty(
+        name="Loop",
+        description="Clip loops: flagged in the clip table, and velocity wraps from the last frame to the first",
+        default=True
+    )
 
 class VATSettings(bpy.types.PropertyGroup):
     vat_output_directory: bpy.props.StringProperty(
@@ -29,20 +78,10 @@ class VATSettings(bpy.types.PropertyGroup):
         default=False
     )
 
-    custom_attr_1: bpy.props.EnumProperty(
-        name="Attribute 1",
-        description="First scalar float attribute",
-        items=make_dynamic_enum("1"),
-    )
-    custom_attr_2: bpy.props.EnumProperty(
-        name="Attribute 2",
-        description="Second scalar float attribute",
-        items=make_dynamic_enum("2"),
-    )
-    custom_attr_3: bpy.props.EnumProperty(
-        name="Attribute 3",
-        description="Third scalar float attribute",
-        items=make_dynamic_enum("3"),
+    custom_attributes: bpy.props.CollectionProperty(
+        type=VATCustomAttribute,
+        name="Custom Attributes",
+        description="Point attributes to encode in custom mode, packed 4 channels per texel across as many textures as needed",
     )
     
     vat_transform: bpy.props.EnumProperty(
@@ -72,42 +111,88 @@ class VATSettings(bpy.types.PropertyGroup):
         default=True
     )
     
+    isolate_evaluation: bpy.props.BoolProperty(
+        name="Isolated Evaluation",
+        description="Sample frames in a minimal scene holding only the target and what it depends on (parents, modifier, constraint, node and driver targets), so unrelated rigs, simulations and modifier stacks in the shot are not evaluated every frame. Falls back to the full scene when the target depends on a rigid body world",
+        default=True
+    )
+    
+    lean_memory: bpy.props.BoolProperty(
+        name="Low Memory Mode",
+        description="Hand the generated proxy mesh from the temporary to the proxy and preview objects instead of copying it, and free intermediate meshes, sampled data and the render scene as soon as they are no longer needed. Recommended for very dense meshes",
+        default=False
+    )
+    
     rip_edges: bpy.props.BoolProperty(
         name="Create Normal-Safe Edges",
         description="Splits the resulting mesh on all sharp edges to provide proper per-vertex normal data (does not affect face count, increases final mesh vertex count along identified edges). Target geometry (source) is unaffected",
         default=False
     )
+
+    edge_split_method: bpy.props.EnumProperty(
+        name="Edge Split Method",
+        description="Which edges Create Normal-Safe Edges splits",
+        items=[
+            ('SHARP', "Sharp Edges", "Split every sharp edge and every edge between flat-shaded faces"),
+            ('NORMALS', "Normal Analysis", "Sample corner normals over the whole frame range and split only edges whose normals diverge beyond the split angle in some frame. Edges that agree in every frame stay welded, keeping the VAT narrower"),
+        ],
+        default='SHARP'
+    )
+
+    split_angle: bpy.props.FloatProperty(
+        name="Split Angle",
+        description="Normal analysis splits an edge when the shaded normals on its two sides differ by more than this angle in any frame",
+        default=math.radians(5.0),
+        min=0.0,
+        max=math.pi,
+        subtype='ANGLE'
+    )
     
     encode_type: bpy.props.EnumProperty(
         name="Encoding Mode",
         description="Encode custom attributes",
         items=[
             ('DEFAULT', "Standard (Position/Normal)", "Standard (Position/Normal)"),
-            ('CUSTOM', "Custom Attributes (float[3])", "Choose custom attributes to encode to RGB"),
+            ('CUSTOM', "Custom Attributes", "Choose any number of custom attributes, packed to RGBA across as many textures as needed"),
+            ('RIGID', "Rigid Pieces (Transforms)", "Detect connected pieces that move rigidly and encode one translation + rotation per piece per frame. Texture size scales with piece count instead of vertex count"),
+            ('SKINNING', "Skinning Decomposition (Bones)", "Fit a few virtual bones and per-vertex weights to the animation. Bone transforms are encoded like rigid pieces (bones x frames) and the exported mesh carries bone indices and weights in UV maps, for linear blend skinning in the vertex shader"),
         ],
         default='DEFAULT'
     )
-    
-    user_attribute: bpy.props.StringProperty(
-        name="Custom Vector (RGB)",
-        description="Vector point attribute from the target object",
-        default="",
-#        items=lambda self, context: get_point_attributes_filtered(self, context, data_type_filter='FLOAT_VECTOR')
+
+    rigid_tolerance: bpy.props.FloatProperty(
+        name="Rigid Tolerance",
+        description="Maximum distance a vertex may deviate from its piece's rigid transform before the encode is rejected",
+        default=0.001,
+        min=0.0,
+        precision=5,
+        subtype='DISTANCE'
     )
     
-    user_scalar: bpy.props.StringProperty(
-        name="Custom Float (A)",
-        description="Scalar point attribute from the active object",
-        default="",
-#        items=lambda self, context: get_point_attributes_filtered(self, context, data_type_filter='FLOAT')
+    skin_bones: bpy.props.IntProperty(
+        name="Bones",
+        description="Number of virtual bones fitted to the animation. More bones follow the deformation more closely",
+        default=16,
+        min=1,
+        max=256
     )
-    
-    custom_remap: bpy.props.BoolProperty(
-        name="Force 0-1 Range",
-        description="Export with data in the range of (0-1) only, and provide remapping details in JSON",
-        default=True
+
+    skin_influences: bpy.props.IntProperty(
+        name="Influences",
+        description="Largest number of bones weighted on one vertex",
+        default=4,
+        min=1,
+        max=4
     )
-    
+
+    skin_iterations: bpy.props.IntProperty(
+        name="Iterations",
+        description="Alternating weight and bone transform refinement passes",
+        default=10,
+        min=0,
+        max=100
+    )
+
     export_mesh: bpy.props.BoolProperty(
         name="Include Mesh Export",
         description="Selected object acts as proxy to active object. If False, uses frame 1 as proxy deformation",
@@ -159,12 +244,52 @@ class VATSettings(bpy.types.PropertyGroup):
         default='EXR16'
     )
     
+    output_format: bpy.props.EnumProperty(
+        name="Output Format",
+        description="Encode through the renderer to an image, or write the VAT buffer directly as GPU-ready float data with the same row/wrap layout",
+        items=[
+            ('IMAGE', "Image", "Render the VAT to the selected image format"),
+            ('RAW_BIN', "Raw (.bin)", "Headerless RGBA float buffer, top row first - load with a single read or mmap using the sidecar header for the layout"),
+            ('RAW_NPY', "NumPy (.npy)", "RGBA float buffer as a NumPy array file (height, width, 4)"),
+            ('KTX2', "KTX2", "Uncompressed RGBA16F/RGBA32F KTX2 container"),
+        ],
+        default='IMAGE'
+    )
+
+    raw_precision: bpy.props.EnumProperty(
+        name="Raw Precision",
+        description="Float precision of raw outputs",
+        items=[
+            ('HALF', "Half (16 bit)", "float16 per channel"),
+            ('FLOAT', "Float (32 bit)", "float32 per channel"),
+        ],
+        default='HALF'
+    )
+    
     vat_collection: bpy.props.PointerProperty(
         name="Target Collection",
         description="Reference to a Blender collection",
         type=bpy.types.Collection
     )
     
+    use_clips: bpy.props.BoolProperty(
+        name="Clip Library",
+        description="Encode a list of clips (frame ranges, actions or NLA strips) into one VAT instead of the scene frame range. Clips share the proxy and bounds and are stacked back to back, a clip table in the remap json and header (CLIP) gives each clip's first frame, length, rate and loop flag so engines switch clips with a frame offset. Sampled encodes only, not streamed",
+        default=False
+    )
+
+    clips: bpy.props.CollectionProperty(
+        type=VATClip,
+        name="Clips",
+        description="Clips of the clip library, stacked in list order",
+    )
+
+    clip_object: bpy.props.PointerProperty(
+        name="Clip Object",
+        description="Object the clip actions are assigned to and whose NLA strips are used, e.g. the armature. Defaults to the target's armature, or the target",
+        type=bpy.types.Object
+    )
+
     vat_normal_encoding: bpy.props.EnumProperty(
         name="Normal Encoding",
         description="Choose how vertex normals are stored",
@@ -176,12 +301,250 @@ class VATSettings(bpy.types.PropertyGroup):
         default='PACKED'
     )
     
+    split_precision: bpy.props.BoolProperty(
+        name="Hi/Lo Split",
+        description="PNG outputs only: split every normalized channel into a coarse and a fine part written to two textures (<name>_vat and <name>_vat_lo), recombined in the shader as hi + lo / 65535 (255 for PNG8). Near float precision for platforms that can't sample float textures in the vertex stage. Written from sampled data",
+        default=False
+    )
+
+    encode_backend: bpy.props.EnumProperty(
+        name="Encode Backend",
+        description="How VAT texels are produced in standard encoding mode",
+        items=[
+            ('AUTO', "Automatic", "Render images, write raw outputs and deduplicated frames from sampled data"),
+            ('RENDER', "Render", "Evaluate positions on the GPU and render the VAT through the compositor (image outputs only)"),
+            ('NUMPY', "NumPy", "Sample positions on the CPU and write the VAT buffer directly, no render scene"),
+        ],
+        default='AUTO'
+    )
+
+    preview_mode: bpy.props.EnumProperty(
+        name="Preview Mode",
+        description="How the encoded preview object plays the animation in the viewport",
+        items=[
+            ('DECODER', "VAT Decoder", "Sample the VAT image through the decoder node group, as an engine would"),
+            ('CACHE', "Position Cache", "Write final positions to a memory-mapped .npy cache next to the VAT and copy each frame into the preview mesh on frame change. Real-time scrubbing of dense meshes, standard encoding mode with sampled positions only (not streamed encodes)"),
+        ],
+        default='DECODER'
+    )
+
+    preview_cache_frames: bpy.props.IntProperty(
+        name="Cached Frames",
+        description="Recently shown frames kept in memory per position cache",
+        default=32,
+        min=1
+    )
+
+    stream_encode: bpy.props.BoolProperty(
+        name="Streaming Encode",
+        description="Raw outputs only: sample frames in fixed-size chunks and write their rows straight to the output file, keeping memory bounded by the chunk size. An interrupted encode resumes from the last completed chunk when run again with the same settings",
+        default=False
+    )
+
+    stream_chunk_frames: bpy.props.IntProperty(
+        name="Chunk Frames",
+        description="Number of frames sampled and written per streaming chunk",
+        default=64,
+        min=1
+    )
+
+    use_budget: bpy.props.BoolProperty(
+        name="Budget",
+        description="Estimate peak memory, GPU texture size and output bytes before encoding, and adjust settings that exceed the budgets: raw outputs switch to streaming with a chunk size that fits the memory budget, full float outputs drop to half float over the texture or disk budget. Adjustments apply to that encode only, the settings are restored afterwards",
+        default=False
+    )
+
+    memory_budget: bpy.props.FloatProperty(
+        name="Memory Budget (MB)",
+        description="Peak memory the encode may use for sampled data and buffers, 0 for no limit",
+        default=0.0,
+        min=0.0
+    )
+
+    texture_budget: bpy.props.FloatProperty(
+        name="Texture Budget (MB)",
+        description="GPU memory of the encoded textures once loaded (RGBA, uncompressed), 0 for no limit",
+        default=0.0,
+        min=0.0
+    )
+
+    disk_budget: bpy.props.FloatProperty(
+        name="Disk Budget (MB)",
+        description="Bytes written to the output directory, 0 for no limit",
+        default=0.0,
+        min=0.0
+    )
+
+    estimated_peak_memory: bpy.props.FloatProperty(name="Estimated Peak Memory (MB)", default=0.0)
+    estimated_output: bpy.props.FloatProperty(name="Estimated Output (MB)", default=0.0)
+    measured_peak_memory: bpy.props.FloatProperty(name="Measured Peak Memory (MB)", default=0.0)
+    measured_output: bpy.props.FloatProperty(name="Measured Output (MB)", default=0.0)
+
+    vertex_order: bpy.props.EnumProperty(
+        name="Vertex Order",
+        description="Order in which vertices are assigned VAT columns. Reordering keeps neighboring vertices in nearby texels for better texture cache hits in the vertex shader",
+        items=[
+            ('INDEX', "Index", "Reversed vertex index order (default layout)"),
+            ('MORTON', "Spatial (Morton)", "Sort vertices along a Z-order curve of their proxy positions"),
+            ('TOPOLOGY', "Connectivity", "Walk mesh edges breadth-first so connected vertices get consecutive columns"),
+        ],
+        default='INDEX'
+    )
+
     use_single_row: bpy.props.BoolProperty(
         name="Use Single Row",
         description="Width of VAT in pixels becomes vertex count, height of VAT becomes frame count (exact)",
         default=True
     )
 
+    export_header: bpy.props.BoolProperty(
+        name="Binary Header",
+        description="Write a compact little-endian binary header (-vat_info.bin) with bounds, frame count, vertex count, resolution, wraps, normal encoding and image format, readable by runtime loaders in a single fixed-size read",
+        default=True
+    )
+
+    export_header_json: bpy.props.BoolProperty(
+        name="Header JSON",
+        description="Also write the binary header contents as -vat_info.json",
+        default=False
+    )
+
+    farm_jobs: bpy.props.IntProperty(
+        name="Farm Jobs",
+        description="Number of frame-range jobs to split a farm encode into, one per node",
+        default=4,
+        min=1
+    )
+
+    farm_spec_path: bpy.props.StringProperty(
+        name="Farm Job Spec",
+        description="Job spec written by Plan Farm Jobs, merged once every job has finished",
+        subtype='FILE_PATH',
+        default=""
+    )
+
+    use_asset_index: bpy.props.BoolProperty(
+        name="Asset Index",
+        description="Keep a local index of encoded VATs keyed by a hash of the sampled data, layout and format. An encode matching an indexed one reuses its textures instead of writing them again. Not used for streamed encodes",
+        default=False
+    )
+
+    asset_index_path: bpy.props.StringProperty(
+        name="Asset Index Path",
+        description="SQLite index file, shared across projects. Defaults to ~/.openvat/asset_index.sqlite",
+        subtype='FILE_PATH',
+        default=""
+    )
+
+    asset_reuse_mode: bpy.props.EnumProperty(
+        name="Reuse Mode",
+        description="How the textures of a matching indexed encode are brought into the new output directory",
+        items=[
+            ('LINK', "Hard Link", "Link the existing files, no extra storage (copies when on another drive)"),
+            ('COPY', "Copy", "Copy the existing files"),
+        ],
+        default='LINK'
+    )
+
+    event_log: bpy.props.BoolProperty(
+        name="Event Log",
+        description="Append machine-readable encode events (stages, frame progress and throughput, output files with sizes, errors) as JSON lines to the event log file",
+        default=False
+    )
+
+    event_log_path: bpy.props.StringProperty(
+        name="Event Log Path",
+        description="JSON lines file for encode events, defaults to openvat-events.jsonl in the output directory",
+        subtype='FILE_PATH',
+        default=""
+    )
+
+    event_stdout: bpy.props.BoolProperty(
+        name="Events to Stdout",
+        description="Also print encode events as JSON lines to standard output, for schedulers watching a background Blender",
+        default=False
+    )
+
+    export_frame_bounds: bpy.props.BoolProperty(
+        name="Frame Bounds",
+        description="Compute a tight axis-aligned bounding box per encoded frame from the sampled positions, written to the remap json and as an FBND table in the binary header for engine-side culling. Standard encoding mode only",
+        default=True
+    )
+
+    export_wrap_bounds: bpy.props.BoolProperty(
+        name="Wrap Bounds",
+        description="Also write one bounding box per frame for each wrap (block of vertex columns) as a WBND header table",
+        default=False
+    )
+
+    export_bounds_texture: bpy.props.BoolProperty(
+        name="Bounds Texture",
+        description="Write the per-frame bounds as a tiny 2-pixel-wide texture (_bnds), min in the first column and max in the second, one row per frame",
+        default=False
+    )
+
+    export_velocity: bpy.props.BoolProperty(
+        name="Velocity",
+        description="Write a velocity texture (_vvel) in the same layout as the position VAT, from central differences of the sampled positions in units per second, with its own bounds in the remap json and a VBND header table. A motion vector then costs one texture fetch. Standard encoding mode only, not available when streaming",
+        default=False
+    )
+
+    velocity_loop: bpy.props.BoolProperty(
+        name="Loop",
+        description="The clip loops: the first and last frames take their velocity from each other instead of one-sided differences. A last frame that repeats the first pose is skipped when wrapping",
+        default=False
+    )
+
+    pca_compression: bpy.props.BoolProperty(
+        name="PCA Compression",
+        description="Decompose the sampled offsets into a mean shape and a few basis shapes. The VAT holds one row per basis shape instead of one per frame, and each frame is a weighted sum of them with its weights in a small coefficient table (remap json and PCAC header table). A reconstruction error report is written next to the VAT. Positions only, written from sampled data",
+        default=False
+    )
+
+    pca_tolerance: bpy.props.FloatProperty(
+        name="PCA Tolerance",
+        description="Largest RMS vertex error of the reconstruction, in scene units. Fewer basis shapes are kept for a larger tolerance",
+        default=0.001,
+        min=0.0,
+        precision=5
+    )
+
+    pca_max_components: bpy.props.IntProperty(
+        name="Max Shapes",
+        description="Upper limit on the number of basis shapes, 0 for no limit",
+        default=0,
+        min=0
+    )
+
+    dedup_frames: bpy.props.BoolProperty(
+        name="Deduplicate Frames",
+        description="Store each unique frame once. Held frames and repeated loop tails are mapped onto earlier frames through a frame map written to the remap json and binary header. The VAT is written from sampled data instead of the render path",
+        default=False
+    )
+
+    dedup_tolerance: bpy.props.FloatProperty(
+        name="Frame Tolerance",
+        description="Largest per-vertex difference for two frames to count as the same frame",
+        default=0.0001,
+        min=0.0,
+        precision=5
+    )
+
+    analysis_frames: bpy.props.IntProperty(
+        name="Analyzed Frames",
+        default=0
+    )
+
+    analysis_unique_frames: bpy.props.IntProperty(
+        name="Analyzed Unique Frames",
+        default=0
+    )
+
+    analysis_loop_start: bpy.props.IntProperty(
+        name="Analyzed Loop Start",
+        default=-1
+    )
+
     no_remap: bpy.props.BoolProperty(
         name="No Remap",
         description="Output in full precision, outside of 0-1 range (useful for Niagara and VFX systems)",
@@ -189,4 +552,4 @@ class VATSettings(bpy.types.PropertyGroup):
     )
 
 
-classes = [VATSettings]
\ No newline at end of file
+classes = [VATCustomAttribute, VATClip, VATSettings]
\ No newline at end of file
@@ -0,0 +1,156 @@
+# OpenVAT sidecar data - binary header and matching json describing an encoded VAT
+#
+# The header is little-endian and fixed-size so runtime loaders can read it in a single
+# call with no text parsing. Optional tables (added by later encode features) follow the
+# header and are described by a directory of (tag, offset, count, stride) entries.
+
+import json
+import struct
+
+HEADER_MAGIC = b"OVAT"
+HEADER_VERSION = 1
+
+# magic, version, header_size, flags, frame_start, frame_count, vertex_count, width, height,
+# num_wraps, normal_encoding, image_format, channel_count, encode_type, min[4], max[4],
+# table_count, split_bits (0 unless hi/lo split)
+# PCA encodes store the mean shape and basis shapes as rows (frame_count = components + 1) and
+# the per-frame weights in a PCAC table.
+HEADER_STRUCT = struct.Struct("<4sHHIiIIIIIBBBB4f4fHH")
+TABLE_ENTRY_STRUCT = struct.Struct("<4sIII")
+
+FLAG_REMAPPED = 1 << 0
+FLAG_SPLIT = 1 << 1 # Hi/lo split textures, value = hi + lo / (2^split_bits - 1)
+
+NORMAL_ENCODINGS = ('NONE', 'PACKED', 'SEPARATE')
+IMAGE_FORMATS = ('PNG8', 'PNG16', 'EXR16', 'EXR32', 'RAW16', 'RAW32')
+ENCODE_TYPES = ('DEFAULT', 'CUSTOM', 'RIGID', 'PCA', 'SKINNING')
+
+
+def _enum_index(value, options):
+    return options.index(value) if value in options else 0xFF
+
+
+def _enum_name(index, options):
+    return options[index] if index < len(options) else None
+
+
+# Build the sidecar description of one encode; bounds are per channel (up to 4, RGBA order)
+def make_vat_info(frame_start, frame_count, vertex_count, width, height, num_wraps,
+                  normal_encoding, image_format, encode_type, min_values, max_values, remapped=True, split_bits=0):
+    return {
+        "Version": HEADER_VERSION,
+        "FrameStart": int(frame_start),
+        "Frames": int(frame_count),
+        "Vertices": int(vertex_count),
+        "Width": int(width),
+        "Height": int(height),
+        "Wraps": int(num_wraps),
+        "NormalEncoding": normal_encoding,
+        "ImageFormat": image_format,
+        "EncodeType": encode_type,
+        "Remapped": bool(remapped),
+        "SplitBits": int(split_bits),
+        "Min": [float(v) for v in min_values],
+        "Max": [float(v) for v in max_values],
+        "Tables": {},
+    }
+
+
+def _pad4(values):
+    values = [float(v) if v is not None else 0.0 for v in values][:4]
+    return values + [0.0] * (4 - len(values))
+
+
+def pack_vat_header(info):
+    """
+    Pack a vat info dict into bytes: fixed header, table directory, then table payloads.
+    Tables are stored in info["Tables"] as {tag: (stride, bytes)}.
+    """
+    tables = info.get("Tables", {})
+    flags = FLAG_REMAPPED if info.get("Remapped", True) else 0
+    if info.get("SplitBits"):
+        flags |= FLAG_SPLIT
+
+    directory_size = TABLE_ENTRY_STRUCT.size * len(tables)
+    offset = HEADER_STRUCT.size + directory_size
+    directory = b""
+    payload = b""
+    for tag, (stride, data) in tables.items():
+        count = len(data) // stride if stride else 0
+        directory += TABLE_ENTRY_STRUCT.pack(tag.encode("ascii")[:4].ljust(4, b" "), offset, count, stride)
+        payload += data
+        offset += len(data)
+
+    header = HEADER_STRUCT.pack(
+        HEADER_MAGIC,
+        HEADER_VERSION,
+        HEADER_STRUCT.size,
+        flags,
+        info["FrameStart"],
+        info["Frames"],
+        info["Vertices"],
+        info["Width"],
+        info["Height"],
+        info["Wraps"],
+        _enum_index(info["NormalEncoding"], NORMAL_ENCODINGS),
+        _enum_index(info["ImageFormat"], IMAGE_FORMATS),
+        min(len(info["Min"]), 4),
+        _enum_index(info["EncodeType"], ENCODE_TYPES),
+        *_pad4(info["Min"]),
+        *_pad4(info["Max"]),
+        len(tables),
+        info.get("SplitBits", 0),
+    )
+    return header + directory + payload
+
+
+def unpack_vat_header(data):
+    fields = HEADER_STRUCT.unpack_from(data, 0)
+    if fields[0] != HEADER_MAGIC:
+        raise ValueError("Not an OpenVAT header")
+    if fields[1] > HEADER_VERSION:
+        raise ValueError(f"Unsupported OpenVAT header version {fields[1]}")
+
+    channel_count = fields[12]
+    info = {
+        "Version": fields[1],
+        "FrameStart": fields[4],
+        "Frames": fields[5],
+        "Vertices": fields[6],
+        "Width": fields[7],
+        "Height": fields[8],
+        "Wraps": fields[9],
+        "NormalEncoding": _enum_name(fields[10], NORMAL_ENCODINGS),
+        "ImageFormat": _enum_name(fields[11], IMAGE_FORMATS),
+        "EncodeType": _enum_name(fields[13], ENCODE_TYPES),
+        "Remapped": bool(fields[3] & FLAG_REMAPPED),
+        "SplitBits": fields[23] if fields[3] & FLAG_SPLIT else 0,
+        "Min": list(fields[14:14 + channel_count]),
+        "Max": list(fields[18:18 + channel_count]),
+        "Tables": {},
+    }
+
+    for i in range(fields[22]):
+        tag, offset, count, stride = TABLE_ENTRY_STRUCT.unpack_from(data, fields[2] + i * TABLE_ENTRY_STRUCT.size)
+        info["Tables"][tag.decode("ascii").strip()] = (stride, bytes(data[offset:offset + count * stride]))
+
+    return info
+
+
+def write_vat_header(info, filepath):
+    with open(filepath, 'wb') as f:
+        f.write(pack_vat_header(info))
+
+
+def read_vat_header(filepath):
+    with open(filepath, 'rb') as f:
+        return unpack_vat_header(f.read())
+
+
+# Json mirror of the binary header, tables are listed by tag and size only
+def write_vat_info_json(info, filepath):
+    data = dict(info)
+    data["Tables"] = {tag: {"Stride": stride, "Count": len(payload) // stride if stride else 0}
+                      for tag, (stride, payload) in info.get("Tables", {}).items()}
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=4)
@@ -1,10 +1,15 @@
 # OpenVAT Utility Functions
 
 import bpy
+import contextlib
 import json
 import math
 import bmesh
 import os
+import time
+import numpy as np
+from bpy.app.handlers import persistent
+from . import encoding, events
 
 NODE_GROUPS_BLEND_FILE = os.path.join(os.path.dirname(__file__), "vat_node_groups.blend")
 
@@ -17,92 +22,567 @@ def ensure_node_group(group_name):
     if group_name not in bpy.data.node_groups:
         append_node_group(group_name)
 
-def make_custom_data(obj_name, attr_names, frame_start, frame_end, output_filepath, remap_output_filepath):
+# Sample custom attributes and their per-channel remap entries; entries go into remap_info when
+# given (the encode writes the remap json once), else to remap_output_filepath
+def make_custom_data(obj_name, attr_names, frame_start, frame_end, output_filepath, remap_output_filepath, clips=None, remap_info=None):
     obj = bpy.data.objects.get(obj_name)
     if obj is None:
         print(f"Object '{obj_name}' not found")
         return
 
+    # Every attribute is sampled in the same pass over the frame range
     frames = frame_end - frame_start + 1
-    channel_remap_data = {}
-
+    if clips:
+        sampled = sample_clips(obj, attr_names, clips)
+    else:
+        sampled = sample_frames(obj, attr_names, frame_start, frame_end)
+    channels = []
+    labels = []
     for attr in attr_names:
-        if not attr or attr.upper() == "NONE":
-            channel_remap_data["None"] = {
-                "Min": 0.0,
-                "Max": 0.0,
-                "Frames": frames
-            }
+        frame_data = sampled.get(attr)
+        if frame_data is None:
             continue
+        suffixes = ("",) if frame_data.shape[-1] == 1 else (".x", ".y", ".z")
+        for i, suffix in enumerate(suffixes):
+            channels.append(frame_data[:, :, i])
+            labels.append(attr + suffix)
 
-        frame_data = {}
-        for frame in range(frame_start, frame_end + 1):
-            bpy.context.scene.frame_set(frame)
-            values = get_geometry_nodes_data(obj, attr)
-            frame_data[frame] = values
-
-        attr_min, attr_max = find_scalar_max_min(frame_data)
-        channel_remap_data[attr] = {
-            "Min": attr_min,
-            "Max": attr_max,
-            "Frames": frames
+    if not channels:
+        print(f"No custom attribute data sampled for '{obj_name}'")
+        return
+
+    # Channels are packed 4 per texel (RGBA), as many textures as needed
+    values = np.stack(channels, axis=-1)
+    channel_min, channel_max = encoding.channel_bounds(values)
+    channel_remap_data = {}
+    for i, label in enumerate(labels):
+        channel_remap_data[label] = {
+            "Min": channel_min[i],
+            "Max": channel_max[i],
+            "Frames": frames,
+            "Texture": i // 4,
+            "Channel": "RGBA"[i % 4]
         }
 
-    # Write or return the remap info
-    with open(remap_output_filepath, 'w') as f:
-        json.dump(channel_remap_data, f, indent=4)
+    if remap_info is not None:
+        remap_info.update(channel_remap_data)
+    else:
+        with open(remap_output_filepath, 'w') as f:
+            json.dump(channel_remap_data, f, indent=4)
+
+    return values
 
-def make_remap_data(obj_name, attribute_name, frame_start, frame_end, output_filepath, remap_output_filepath, scalar_value):
+# Sample a vector attribute (and normals) with its remap bounds; like make_custom_data the
+# entries go into remap_info when given, else to remap_output_filepath
+def make_remap_data(obj_name, attribute_name, frame_start, frame_end, output_filepath, remap_output_filepath, scalar_value, normals=False, corner_normals=False, clips=None, remap_info=None):
     obj = bpy.data.objects.get(obj_name)
     if obj is None:
         print(f"Object '{obj_name}' not found")
         return
     
-    # Remap data for vector properties
-    all_frames_data = {}
-    scalar_data = {}
+    # Remap data for vector properties, sampled in a single pass over the frame range
     frames = frame_end - frame_start + 1
-
-    for frame in range(frame_start, frame_end + 1):
-        bpy.context.scene.frame_set(frame)
-        frame_data = get_geometry_nodes_data(obj, attribute_name)
-        all_frames_data[frame] = frame_data
-    overall_max, overall_min = find_max_min_values(all_frames_data)
+    sample_names = [attribute_name, scalar_value] if scalar_value else [attribute_name]
+    if clips:
+        frame_data = sample_clips(obj, sample_names, clips, normals=normals, corner_normals=corner_normals)
+    else:
+        frame_data = sample_frames(obj, sample_names, frame_start, frame_end, normals=normals, corner_normals=corner_normals)
+    if attribute_name not in frame_data:
+        print(f"No '{attribute_name}' data sampled for '{obj_name}'")
+        return
+    overall_min, overall_max = encoding.channel_bounds(frame_data[attribute_name])
     
     if attribute_name == "colPos":
-        attribute_name = "os-remap"
+        remap_name = "os-remap"
+    else:
+        remap_name = attribute_name
         
     # Scalar value for alpha data
     if scalar_value:
-        for frame in range(frame_start, frame_end + 1):
-            bpy.context.scene.frame_set(frame)
-            frame_data = get_geometry_nodes_data(obj, scalar_value)
-            scalar_data[frame] = frame_data
+        scalar_min, scalar_max = encoding.channel_bounds(frame_data[scalar_value])
         
-        scalar_max, scalar_min = find_scalar_max_min(scalar_data)
-        
-        remap_info = {
-            attribute_name: {
+        remap_data = {
+            remap_name: {
                 "Min": overall_min,
                 "Max": overall_max,
                 "Frames": frames
             },
             scalar_value: {
-                "Min": scalar_min,
-                "Max": scalar_max,
+                "Min": scalar_min[0],
+                "Max": scalar_max[0],
             }
         }
     else:
-        remap_info = {
-            attribute_name: {
+        remap_data = {
+            remap_name: {
                 "Min": overall_min,
                 "Max": overall_max,
                 "Frames": frames
             }
     }
     
-    write_json(remap_info, remap_output_filepath)
-    print(f"Remap information saved to {remap_output_filepath}")
+    if remap_info is not None:
+        remap_info.update(remap_data)
+    else:
+        write_json(remap_data, remap_output_filepath)
+        print(f"Remap information saved to {remap_output_filepath}")
+    return frame_data
+
+# Sample point attributes (and optionally vertex normals) for every frame in one timeline sweep
+# Returns {name: (frames, vertices, components) float32 array}, normals stored under "normals"
+def sample_frames(obj, attribute_names, frame_start, frame_end, normals=False, corner_normals=False):
+    num_frames = frame_end - frame_start + 1
+    frame_data = {}
+
+    with evaluation_scene(obj, frame_start, frame_end) as (scene, view_layer):
+        isolated = scene != bpy.context.scene
+        start_time = time.perf_counter()
+        with bpy.context.temp_override(scene=scene, view_layer=view_layer), events.stage("sample", frame_start=frame_start, frame_end=frame_end):
+            for i, frame in enumerate(range(frame_start, frame_end + 1)):
+                scene.frame_set(frame)
+                depsgraph = bpy.context.evaluated_depsgraph_get()
+                values = {name: get_point_attribute_array(obj, name, depsgraph) for name in attribute_names}
+                if normals:
+                    values["normals"] = get_vertex_normals_array(obj, depsgraph, from_corners=corner_normals)
+
+                for name, array in values.items():
+                    if array is None:
+                        continue
+                    if name not in frame_data:
+                        frame_data[name] = np.empty((num_frames, *array.shape), dtype=np.float32)
+                    frame_data[name][i] = array
+                events.progress("sample", i + 1, num_frames)
+        elapsed = time.perf_counter() - start_time
+        print(f"Sampled {num_frames} frames in {elapsed:.2f}s ({elapsed / num_frames * 1000:.1f} ms/frame, {'isolated' if isolated else 'full scene'} evaluation)")
+
+    return frame_data
+
+# Object the clip library animates: the clip object setting, else the target's armature, else the target
+def get_clip_object(context):
+    settings = context.scene.vat_settings
+    if settings.clip_object is not None:
+        return settings.clip_object
+    obj = context.active_object
+    if obj is None:
+        return None
+    armature = next((m.object for m in obj.modifiers if m.type == 'ARMATURE' and m.object is not None), None)
+    if armature is None and obj.parent is not None and obj.parent.type == 'ARMATURE':
+        armature = obj.parent
+    return armature or obj
+
+def find_nla_strip(obj, strip_name):
+    if obj is None or obj.animation_data is None:
+        return None, None
+    for track in obj.animation_data.nla_tracks:
+        strip = track.strips.get(strip_name)
+        if strip is not None:
+            return strip, track
+    return None, None
+
+def resolve_clips(context):
+    """
+    Resolve the clip library to frame ranges, stacked in list order. Each clip is a dict of
+    Name, Source, Object, Action, Track, FrameStart, FrameEnd, Frames, Start (first stacked
+    frame), FPS and Loop. Raises ValueError for a clip that can't be sampled.
+    """
+    settings = context.scene.vat_settings
+    clip_object = get_clip_object(context)
+    scene_fps = context.scene.render.fps / context.scene.render.fps_base
+    clips = []
+    start = 0
+    for clip in settings.clips:
+        entry = {"Name": clip.name, "Source": clip.source, "Object": clip_object.name if clip_object else None, "Action": None, "Track": None}
+        if clip.source == 'ACTION':
+            if clip.action is None:
+                raise ValueError(f"Clip {clip.name} has no action")
+            if clip_object is None:
+                raise ValueError(f"Clip {clip.name} needs a clip object to assign its action to")
+            frame_start, frame_end = clip.action.frame_range
+            entry["Action"] = clip.action.name
+        elif clip.source == 'NLA_STRIP':
+            strip, track = find_nla_strip(clip_object, clip.strip)
+            if strip is None:
+                raise ValueError(f"Clip {clip.name}: no NLA strip named '{clip.strip}' on {clip_object.name if clip_object else 'the clip object'}")
+            frame_start, frame_end = strip.frame_start, strip.frame_end
+            entry["Track"] = track.name
+        else:
+            frame_start, frame_end = clip.frame_start, clip.frame_end
+        frame_start, frame_end = int(round(frame_start)), int(round(frame_end))
+        if frame_end < frame_start:
+            raise ValueError(f"Clip {clip.name} ends (frame {frame_end}) before it starts (frame {frame_start})")
+        entry.update(FrameStart=frame_start, FrameEnd=frame_end, Frames=frame_end - frame_start + 1, Start=start, FPS=clip.fps or scene_fps, Loop=clip.loop)
+        start += entry["Frames"]
+        clips.append(entry)
+    if not clips:
+        raise ValueError("Add at least one clip to the clip library")
+    return clips
+
+# Put the clip object's animation in the state a clip is sampled in, restored on exit
+@contextlib.contextmanager
+def clip_animation(clip):
+    obj = bpy.data.objects.get(clip["Object"]) if clip and clip["Object"] else None
+    if obj is None or clip["Source"] == 'RANGE':
+        yield
+        return
+
+    created = obj.animation_data is None
+    anim_data = obj.animation_data_create()
+    saved_action = anim_data.action
+    saved_slot = anim_data.action_slot if hasattr(anim_data, "action_slot") else None
+    saved_nla = anim_data.use_nla
+    saved_solo = next((track for track in anim_data.nla_tracks if track.is_solo), None)
+    try:
+        if clip["Source"] == 'ACTION':
+            anim_data.use_nla = False
+            anim_data.action = bpy.data.actions[clip["Action"]]
+        else:
+            anim_data.action = None
+            anim_data.use_nla = True
+            anim_data.nla_tracks[clip["Track"]].is_solo = True
+        yield
+    finally:
+        if created:
+            obj.animation_data_clear()
+        else:
+            anim_data.action = saved_action
+            if saved_slot is not None and anim_data.action_slot != saved_slot:
+                anim_data.action_slot = saved_slot
+            anim_data.use_nla = saved_nla
+            if clip["Source"] == 'NLA_STRIP':
+                anim_data.nla_tracks[clip["Track"]].is_solo = False
+            if saved_solo is not None:
+                saved_solo.is_solo = True
+
+# Sample every clip under its animation state and stack the frames in clip order
+def sample_clips(obj, attribute_names, clips, normals=False, corner_normals=False):
+    stacked = {}
+    for clip in clips:
+        with clip_animation(clip):
+            frame_data = sample_frames(obj, attribute_names, clip["FrameStart"], clip["FrameEnd"], normals=normals, corner_normals=corner_normals)
+        for name, array in frame_data.items():
+            stacked.setdefault(name, []).append(array)
+        print(f"Clip {clip['Name']}: frames {clip['FrameStart']}-{clip['FrameEnd']} stacked from frame {clip['Start']}")
+
+    frame_data = {}
+    for name, arrays in stacked.items():
+        if len(arrays) != len(clips) or len({array.shape[1:] for array in arrays}) > 1:
+            print(f"'{name}' can't be stacked, it is missing or changes size between clips")
+            continue
+        frame_data[name] = np.concatenate(arrays)
+    return frame_data
+
+# ID pointers (objects and collections) held by the RNA properties of a modifier, constraint, etc.
+def _id_pointers(struct):
+    for prop in struct.bl_rna.properties:
+        if prop.type == 'POINTER' and prop.identifier != "rna_type":
+            value = getattr(struct, prop.identifier, None)
+            if isinstance(value, (bpy.types.Object, bpy.types.Collection)):
+                yield value
+
+# Objects and collections referenced by node group socket defaults, nested groups included
+def _node_tree_pointers(node_tree, seen):
+    if node_tree is None or node_tree in seen:
+        return
+    seen.add(node_tree)
+    for node in node_tree.nodes:
+        for socket in node.inputs:
+            value = getattr(socket, "default_value", None)
+            if isinstance(value, (bpy.types.Object, bpy.types.Collection)):
+                yield value
+        if getattr(node, "node_tree", None) is not None:
+            yield from _node_tree_pointers(node.node_tree, seen)
+
+def collect_evaluation_dependencies(obj):
+    """
+    Objects and collections obj's evaluation depends on: parents, modifier and constraint
+    targets, geometry node inputs and driver targets, followed recursively.
+    """
+    objects, collections = [], []
+    stack = [obj]
+    seen_objects, seen_trees = set(), set()
+
+    def push(value):
+        if isinstance(value, bpy.types.Collection):
+            if value not in collections:
+                collections.append(value)
+                stack.extend(value.all_objects)
+        elif isinstance(value, bpy.types.Object):
+            stack.append(value)
+
+    while stack:
+        current = stack.pop()
+        if current in seen_objects:
+            continue
+        seen_objects.add(current)
+        objects.append(current)
+
+        push(current.parent)
+        for modifier in current.modifiers:
+            for value in _id_pointers(modifier):
+                push(value)
+            if modifier.type == 'NODES':
+                for key in modifier.keys():
+                    push(modifier[key])
+                for value in _node_tree_pointers(modifier.node_group, seen_trees):
+                    push(value)
+        for constraint in current.constraints:
+            for value in _id_pointers(constraint):
+                push(value)
+            for target in getattr(constraint, "targets", []):
+                push(target.target)
+        for anim_owner in (current, getattr(current.data, "shape_keys", None)):
+            animation_data = getattr(anim_owner, "animation_data", None)
+            if animation_data is None:
+                continue
+            for driver in animation_data.drivers:
+                for variable in driver.driver.variables:
+                    for target in variable.targets:
+                        push(target.id)
+
+    return objects, collections
+
+def create_evaluation_scene(obj):
+    """
+    Minimal scene holding only obj and what it depends on, so frame_set skips unrelated rigs,
+    simulations and modifier stacks. Returns None when the full scene must be evaluated.
+    """
+    source = bpy.context.scene
+    objects, collections = collect_evaluation_dependencies(obj)
+
+    # Rigid body simulations live on the scene itself and can't be evaluated elsewhere
+    rigid_body = source.rigidbody_world
+    if rigid_body is not None and rigid_body.collection is not None:
+        simulated = set(rigid_body.collection.all_objects)
+        if any(o in simulated for o in objects):
+            print("Isolated evaluation skipped: target depends on the scene's rigid body world")
+            return None
+
+    eval_scene = bpy.data.scenes.new("ov_evaluation")
+    eval_scene.frame_start = source.frame_start
+    eval_scene.frame_end = source.frame_end
+    eval_scene.render.fps = source.render.fps
+    eval_scene.render.fps_base = source.render.fps_base
+    eval_scene.unit_settings.scale_length = source.unit_settings.scale_length
+
+    # Same Simplify settings as the shot, so evaluated geometry matches the full scene
+    eval_scene.render.use_simplify = source.render.use_simplify
+    eval_scene.render.simplify_subdivision = source.render.simplify_subdivision
+    eval_scene.render.simplify_child_particles = source.render.simplify_child_particles
+    eval_scene.render.simplify_volumes = source.render.simplify_volumes
+
+    for collection in collections:
+        if collection.name not in eval_scene.collection.children:
+            eval_scene.collection.children.link(collection)
+    linked = set(o for collection in collections for o in collection.all_objects)
+    for o in objects:
+        if o not in linked:
+            eval_scene.collection.objects.link(o)
+
+    print(f"Isolated evaluation: {len(objects)} of {len(source.objects)} scene objects")
+    return eval_scene
+
+# Isolated evaluation scenes of the open evaluation sessions, {object name: scene or None} each
+_evaluation_sessions = []
+
+@contextlib.contextmanager
+def evaluation_session():
+    """
+    Share one isolated evaluation scene per sampled object across every sample_frames call in the
+    block (stream chunks, clips), built and timed against the full scene once, removed at the end.
+    """
+    scenes = {}
+    _evaluation_sessions.append(scenes)
+    try:
+        yield
+    finally:
+        _evaluation_sessions.remove(scenes)
+        for scene in scenes.values():
+            if scene is not None:
+                bpy.data.scenes.remove(scene)
+
+def _build_evaluation_scene(obj, frame_start, frame_end):
+    if not bpy.context.scene.vat_settings.isolate_evaluation:
+        return None
+    eval_scene = create_evaluation_scene(obj)
+    if eval_scene is not None:
+        report_evaluation_time(bpy.context.scene, bpy.context.view_layer, frame_start, frame_end, "full scene")
+    return eval_scene
+
+# (scene, view_layer) obj is sampled in: the session's isolated scene, a temporary one outside a session, or the full scene
+@contextlib.contextmanager
+def evaluation_scene(obj, frame_start, frame_end):
+    session = _evaluation_sessions[-1] if _evaluation_sessions else None
+    if session is not None:
+        if obj.name not in session:
+            session[obj.name] = _build_evaluation_scene(obj, frame_start, frame_end)
+        eval_scene = session[obj.name]
+    else:
+        eval_scene = _build_evaluation_scene(obj, frame_start, frame_end)
+    try:
+        if eval_scene is None:
+            yield bpy.context.scene, bpy.context.view_layer
+        else:
+            yield eval_scene, eval_scene.view_layers[0]
+    finally:
+        if session is None and eval_scene is not None:
+            bpy.data.scenes.remove(eval_scene)
+
+# Mean evaluation time per frame of a scene, over a few frames of the range
+def report_evaluation_time(scene, view_layer, frame_start, frame_end, label, max_frames=3):
+    frames = list(range(frame_start, frame_end + 1))[:max_frames]
+    current = scene.frame_current
+    start_time = time.perf_counter()
+    with bpy.context.temp_override(scene=scene, view_layer=view_layer):
+        for frame in frames:
+            scene.frame_set(frame)
+            bpy.context.evaluated_depsgraph_get()
+    elapsed = time.perf_counter() - start_time
+    scene.frame_set(current)
+    print(f"Evaluation time ({label}): {elapsed / len(frames) * 1000:.1f} ms/frame")
+    return elapsed / len(frames)
+
+# Evaluated point attribute as a (vertices, components) float32 array via foreach_get
+def get_point_attribute_array(obj, attribute_name, depsgraph=None):
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    mesh = obj.evaluated_get(depsgraph).data
+
+    attr = mesh.attributes.get(attribute_name)
+    if attr is None:
+        print(f"Attribute '{attribute_name}' not found in '{obj.name}'")
+        return None
+    if attr.domain not in {'POINT'}:
+        print(f"Warning: Unsupported domain '{attr.domain}' for attribute '{attribute_name}'")
+
+    count = len(attr.data)
+    if attr.data_type == 'FLOAT_VECTOR':
+        values = np.empty(count * 3, dtype=np.float32)
+        attr.data.foreach_get("vector", values)
+        return values.reshape(count, 3)
+    if attr.data_type in {'FLOAT', 'INT', 'BOOLEAN'}:
+        values = np.empty(count, dtype=np.float32)
+        attr.data.foreach_get("value", values)
+        return values.reshape(count, 1)
+
+    print(f"Warning: Unknown attribute type for '{attribute_name}'")
+    return None
+
+def get_vertex_normals_array(obj, depsgraph=None, from_corners=False):
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    mesh = obj.evaluated_get(depsgraph).data
+
+    num_vertices = len(mesh.vertices)
+    if not from_corners or len(mesh.loops) == 0:
+        values = np.empty(num_vertices * 3, dtype=np.float32)
+        mesh.vertex_normals.foreach_get("vector", values)
+        return values.reshape(-1, 3)
+
+    # Corner normals averaged per vertex, follows custom/smoothed normals of ripped vertices
+    corner_normals = get_corner_normals_array(mesh)
+    corner_vertices = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", corner_vertices)
+
+    values = np.zeros((num_vertices, 3), dtype=np.float64)
+    np.add.at(values, corner_vertices, corner_normals)
+    lengths = np.linalg.norm(values, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1.0
+    return (values / lengths).astype(np.float32)
+
+# Shaded normal of every face corner (corners, 3), including sharp edges and custom normals
+def get_corner_normals_array(mesh):
+    corner_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", corner_normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", corner_normals)
+    return corner_normals.reshape(-1, 3)
+
+# Evaluated vertex positions (vertices, 3) and edge vertex pairs (edges, 2) of an object
+def get_evaluated_mesh_arrays(obj):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+    try:
+        positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+        mesh.edges.foreach_get("vertices", edges)
+    finally:
+        eval_obj.to_mesh_clear()
+    return positions.reshape(-1, 3), edges.reshape(-1, 2)
+
+# Image settings per VAT format, matching the render path
+def set_image_format_settings(img_settings, raw_format, color_mode='RGB'):
+    if raw_format in {'PNG8', 'PNG16'}:
+        img_settings.file_format = 'PNG'
+        img_settings.color_depth = '8' if raw_format == 'PNG8' else '16'
+        img_settings.compression = 0
+    else:
+        img_settings.file_format = 'OPEN_EXR'
+        img_settings.color_depth = '16' if raw_format == 'EXR16' else '32'
+        img_settings.exr_codec = 'ZIP' if raw_format == 'EXR16' else 'NONE'
+    img_settings.color_mode = color_mode
+
+# Write an RGBA (height, width, 4) top-down float buffer to an image file without rendering
+def save_float_image(name, buffer, filepath, raw_format, color_mode='RGB'):
+    height, width, _ = buffer.shape
+    image = bpy.data.images.get(name)
+    if image is not None:
+        bpy.data.images.remove(image)
+    image = bpy.data.images.new(name, width=width, height=height, alpha=True, float_buffer=True)
+    image.colorspace_settings.name = 'Non-Color'
+    image.pixels.foreach_set(np.ascontiguousarray(buffer[::-1], dtype=np.float32).ravel()) # Blender pixels start at the bottom row
+
+    writer_scene = bpy.data.scenes.new("ov_image_writer")
+    try:
+        writer_scene.display_settings.display_device = 'sRGB'
+        writer_scene.view_settings.view_transform = 'Raw'
+        writer_scene.render.dither_intensity = 0
+        set_image_format_settings(writer_scene.render.image_settings, raw_format, color_mode)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        image.save_render(filepath, scene=writer_scene)
+    finally:
+        bpy.data.scenes.remove(writer_scene)
+    events.output(filepath)
+    return image
+
+# Whether encoded values are normalized to 0-1 with the remap bounds
+def uses_remap(settings):
+    if not settings.no_remap:
+        return True
+    return settings.output_format == 'IMAGE' and settings.image_format != 'EXR32'
+
+# Bit depth of the hi/lo split textures, 0 when the split is off or the format is not integer
+def get_split_bits(settings):
+    if not settings.split_precision or settings.output_format != 'IMAGE':
+        return 0
+    return {'PNG8': 8, 'PNG16': 16}.get(settings.image_format, 0)
+
+# Whether the VAT is written from sampled frame data instead of the render/compositor path
+def uses_sampled_encode(settings):
+    if settings.encode_backend == 'NUMPY' or get_split_bits(settings) or uses_pca(settings) or settings.use_clips:
+        return True
+    return settings.output_format != 'IMAGE' or settings.dedup_frames or settings.encode_type == 'CUSTOM'
+
+# Whether an encode with these settings could stream (raw standard encodes that don't need every frame up front)
+def can_stream(settings):
+    return settings.output_format != 'IMAGE' and settings.encode_type == 'DEFAULT' and not settings.pca_compression and not settings.use_clips
+
+# Whether positions are streamed to a raw output in frame chunks instead of sampled up front
+def uses_streaming(settings):
+    return settings.stream_encode and can_stream(settings)
+
+# Whether the VAT rows hold a PCA basis instead of frames (needs every frame sampled up front)
+def uses_pca(settings):
+    return settings.pca_compression and settings.encode_type == 'DEFAULT'
+
+# Texel format recorded in the sidecar header
+def get_texel_format(settings):
+    if settings.output_format == 'IMAGE':
+        return settings.image_format
+    return 'RAW16' if settings.raw_precision == 'HALF' else 'RAW32'
 
 # Get data from dependency graph
 def get_geometry_nodes_data(obj, attribute_name):
@@ -141,55 +621,76 @@ def write_json(data, filepath):
     with open(filepath, 'w') as f:
         json.dump(data, f, indent=4, cls=CustomEncoder)
 
-def apply_modifier(obj, modifier):
+# Remove unused data blocks, through the data API where available (no outliner context needed)
+def purge_orphans():
+    if hasattr(bpy.data, "orphans_purge"):
+        bpy.data.orphans_purge(do_recursive=True)
+    else:
+        bpy.ops.outliner.orphans_purge()
+
+# Deselect every object of a view layer (the context's by default) without an operator
+def deselect_all(view_layer=None):
+    view_layer = view_layer or bpy.context.view_layer
+    for obj in list(view_layer.objects.selected):
+        obj.select_set(False, view_layer=view_layer)
+
+def apply_modifier(obj, modifier, free_previous=False):
     depsgraph = bpy.context.evaluated_depsgraph_get()
     obj_eval = obj.evaluated_get(depsgraph)
     mesh_from_eval = bpy.data.meshes.new_from_object(obj_eval)
 
     obj.modifiers.remove(modifier)
+    previous = obj.data
     obj.data = mesh_from_eval
 
-def find_scalar_max_min(all_frames_data):
-    max_value = float('-inf')
-    min_value = float('inf')
-    
-    for frame, data in all_frames_data.items():
-        for value in data:
-            max_value = max(max_value, value)
-            min_value = min(min_value, value)
-    if max_value == float('-inf'):
-        max_value = None
-    if min_value == float('inf'):
-        min_value = None
-
-    if max_value is not None:
-        max_value = round_to_nearest_ten(max_value, math.ceil)
-    if min_value is not None:
-        min_value = round_to_nearest_ten(min_value, math.floor)
-
-    return min_value, max_value
-            
-# Function to find x, y, z min/max from JSON
-def find_max_min_values(all_frames_data):
-    max_values = [float('-inf'), float('-inf'), float('-inf')]
-    min_values = [float('inf'), float('inf'), float('inf')]
-
-    for frame, data in all_frames_data.items():
-        for vector in data:
-            for i in range(3):
-                max_values[i] = max(max_values[i], vector[i])
-                min_values[i] = min(min_values[i], vector[i])
-
-    max_values = [val if val != float('-inf') else None for val in max_values]
-    min_values = [val if val != float('inf') else None for val in min_values]
-
-    overall_max = [round_to_nearest_ten(val, math.ceil) if val is not None else None for val in max_values]
-    overall_min = [round_to_nearest_ten(val, math.floor) if val is not None else None for val in min_values]
-
-    return overall_max, overall_min
-
-def round_to_nearest_ten(val, func):
-    return func(val * 10) / 10
+    # Low memory mode: drop the replaced mesh right away instead of waiting for the orphan purge
+    if free_previous and previous.users == 0:
+        free_mesh(previous)
+
+# Low memory mode bookkeeping - estimated bytes of mesh data not kept alive during an encode
+memory_stats = {"saved_bytes": 0}
+
+ATTRIBUTE_SIZES = {
+    'FLOAT': 4, 'INT': 4, 'BOOLEAN': 1, 'INT8': 1, 'FLOAT2': 8, 'INT32_2D': 8,
+    'FLOAT_VECTOR': 12, 'FLOAT_COLOR': 16, 'BYTE_COLOR': 4, 'QUATERNION': 16, 'FLOAT4X4': 64,
+}
+
+def estimate_mesh_bytes(mesh):
+    domain_sizes = {
+        'POINT': len(mesh.vertices),
+        'EDGE': len(mesh.edges),
+        'FACE': len(mesh.polygons),
+        'CORNER': len(mesh.loops),
+    }
+    total = 0
+    for attr in mesh.attributes:
+        total += domain_sizes.get(attr.domain, 0) * ATTRIBUTE_SIZES.get(attr.data_type, 4)
+    return total
+
+def record_saved_mesh(mesh):
+    memory_stats["saved_bytes"] += estimate_mesh_bytes(mesh)
+
+# Low memory mode shares a mesh until modifiers are applied into a new one; a mesh still
+# shared at that point is copied before anything writes to it
+def unshare_mesh(obj, shared):
+    if obj.data == shared:
+        obj.data = shared.copy()
+    else:
+        record_saved_mesh(shared)
+
+def free_mesh(mesh):
+    record_saved_mesh(mesh)
+    bpy.data.meshes.remove(mesh)
+
+# Remove a temporary scene together with the objects only it uses
+def free_scene(scene):
+    for obj in list(scene.collection.all_objects):
+        if len(obj.users_scene) == 1:
+            data = obj.data
+            bpy.data.objects.remove(obj)
+            if isinstance(data, bpy.types.Mesh) and data.users == 0:
+                free_mesh(data)
+    bpy.data.scenes.remove(scene)
 
 def read_remap_info(filepath, attribute):
     with open(filepath, 'r') as f:
@@ -205,30 +706,73 @@ def read_remap_info(filepath, attribute):
 
     return min_x, min_y, min_z, max_x, max_y, max_z
 
-def read_custom_info(filepath, attr_names):
+def read_custom_info(filepath):
     """
-    Returns a flat list of min/max per attribute: [min_r, min_g, min_b, max_r, max_g, max_b]
+    Returns per-channel (mins, maxs) of a custom remap file, in texture then RGBA order
     """
     with open(filepath, 'r') as f:
-        data = json.load(f)
-
-    min_vals = []
-    max_vals = []
-
-    for attr in attr_names:
-        if not attr or attr.upper() == "NONE":
-            min_vals.append(0.0)
-            max_vals.append(0.0)
-            continue
-        
-        if attr not in data:
-            raise ValueError(f"Attribute '{attr}' not found in remap file.")
-
-        min_vals.append(data[attr]["Min"])
-        max_vals.append(data[attr]["Max"])
+        return custom_channel_bounds(json.load(f))
+
+# Per-channel (mins, maxs) of custom remap entries, in texture then RGBA order
+def custom_channel_bounds(data):
+    entries = [entry for entry in data.values() if isinstance(entry, dict) and "Channel" in entry]
+    entries.sort(key=lambda entry: (entry["Texture"], "RGBA".index(entry["Channel"])))
+    return [entry["Min"] for entry in entries], [entry["Max"] for entry in entries]
+
+# Unique, non-empty attribute names from the custom attribute list
+def get_custom_attribute_names(settings):
+    return list(dict.fromkeys(item.name for item in settings.custom_attributes if item.name and item.name != "NONE"))
+
+LEGACY_CUSTOM_ATTRIBUTES = ("custom_attr_1", "custom_attr_2", "custom_attr_3")
+
+# Files saved before the custom attribute list keep the three fixed slots as raw ID properties.
+# The slots were dynamic enums, saved as an index into None + the float point attributes of the
+# scanned (active) object, so indices are resolved against a fresh scan of that object
+def migrate_custom_attributes(scene):
+    settings = scene.vat_settings
+    legacy = [settings.get(key) for key in LEGACY_CUSTOM_ATTRIBUTES]
+    if all(value is None for value in legacy):
+        return []
 
+    scanned = None
+    names = []
+    for key, value in zip(LEGACY_CUSTOM_ATTRIBUTES, legacy):
+        if isinstance(value, str):
+            names.append(value)
+        elif isinstance(value, int) and value > 0:
+            if scanned is None:
+                scanned = get_scene_point_float_attributes(scene)
+            if value <= len(scanned):
+                names.append(scanned[value - 1])
+            else:
+                print(f"{scene.name}: could not resolve {key} (attribute {value}), rescan the custom attributes")
+        del settings[key]
+
+    names = [name for name in dict.fromkeys(names) if name and name != "NONE"]
+    # A list set up since the file was saved wins over the old slots
+    if names and not settings.custom_attributes:
+        for name in names:
+            settings.custom_attributes.add().name = name
+        print(f"{scene.name}: moved custom attributes {', '.join(names)} to the custom attribute list")
+    return names
+
+# Float point attribute names of a scene's active object, in the order the attribute scan lists them
+def get_scene_point_float_attributes(scene):
+    view_layer = bpy.context.view_layer if scene == bpy.context.scene else scene.view_layers[0]
+    obj = view_layer.objects.active
+    if not obj or obj.type != 'MESH':
+        return []
+    eval_obj = obj.evaluated_get(view_layer.depsgraph)
+    eval_mesh = eval_obj.to_mesh()
+    try:
+        return [attr.name for attr in eval_mesh.attributes if attr.domain == 'POINT' and attr.data_type == 'FLOAT']
+    finally:
+        eval_obj.to_mesh_clear()
 
-    return (*min_vals, *max_vals)
+@persistent
+def migrate_legacy_settings(*args):
+    for scene in bpy.data.scenes:
+        migrate_custom_attributes(scene)
 
 def clean_mesh_data(obj):
 
@@ -261,6 +805,15 @@ def get_virtual_ripped_vertex_count(obj):
 
 # Best working approximations for output size based on realized data available
 
+# Texture width, height and wrap count for the current encode settings
+def get_vat_resolution(settings, num_vertices, num_frames):
+    packed = settings.encode_type in {'RIGID', 'SKINNING'} or (settings.encode_type == 'DEFAULT' and settings.vat_normal_encoding == 'PACKED')
+    if settings.use_single_row:
+        return num_vertices, num_frames * (2 if packed else 1), 1
+    if packed:
+        return calculate_packed_vat_resolution(num_vertices, num_frames)
+    return calculate_optimal_vat_resolution(num_vertices, num_frames)
+
 def calculate_optimal_vat_resolution(num_vertices, num_frames):
     def next_power_of_2(x):
         return 1 if x <= 1 else 2**math.ceil(math.log2(x))
@@ -367,13 +920,156 @@ def rip_hard_edges(obj):
             if not linked_faces[0].smooth and not linked_faces[1].smooth:
                 edges_to_split.append(e)
 
+    split_indices = [e.index for e in edges_to_split]
+
     # Perform Edge Split
     bmesh.ops.split_edges(bm, edges=edges_to_split)
 
     bm.to_mesh(mesh)
     bm.free()
     mesh.update()  
+    return split_indices
+
+# Split the given edges of obj's mesh, e.g. the edges a farm plan's analysis chose
+def split_mesh_edges(obj, edge_indices):
+    mesh = obj.data
+    if len(edge_indices) and max(edge_indices) >= len(mesh.edges):
+        raise Exception(f"Edge {max(edge_indices)} to split is out of range, {obj.name} has {len(mesh.edges)} edges")
+
+    if obj.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bm.edges.ensure_lookup_table()
+    num_vertices = len(bm.verts)
+    bmesh.ops.split_edges(bm, edges=[bm.edges[int(i)] for i in edge_indices])
+    print(f"Edge split: {len(edge_indices)} edges, vertices {num_vertices} -> {len(bm.verts)}")
+
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
+
+def rip_normal_edges(obj, frame_start, frame_end, angle, clips=None):
+    """
+    Split only the edges whose shaded normals on either side differ by more than angle at some
+    frame of the range (of every clip, when given). Edges that agree in every frame stay welded,
+    so they cost no extra VAT columns. Returns the indices of the split edges.
+    """
+    if not obj or obj.type != 'MESH':
+        raise Exception("Active object must be a mesh")
+
+    mesh = obj.data
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    eval_obj = obj.evaluated_get(depsgraph)
+    eval_mesh = eval_obj.to_mesh()
+    topology = {}
+    for name, collection, attribute in (("loop_vertices", eval_mesh.loops, "vertex_index"), ("loop_edges", eval_mesh.loops, "edge_index"),
+                                        ("loop_starts", eval_mesh.polygons, "loop_start"), ("loop_totals", eval_mesh.polygons, "loop_total")):
+        topology[name] = np.empty(len(collection), dtype=np.int64)
+        collection.foreach_get(attribute, topology[name])
+    num_edges = len(eval_mesh.edges)
+    eval_obj.to_mesh_clear()
+
+    # Edge indices are matched against the base mesh, like rip_hard_edges
+    if num_edges != len(mesh.edges) or len(topology["loop_vertices"]) != len(mesh.loops):
+        print("Evaluated topology differs from the mesh, splitting sharp edges instead of analyzing normals")
+        return rip_hard_edges(obj)
+
+    edges, corners_a, corners_b, non_manifold = encoding.edge_corner_pairs(
+        topology["loop_vertices"], topology["loop_edges"], topology["loop_starts"], topology["loop_totals"], num_edges)
+    agreement = np.ones(len(edges), dtype=np.float32)
+
+    eval_scene = None
+    if bpy.context.scene.vat_settings.isolate_evaluation:
+        eval_scene = create_evaluation_scene(obj)
+    try:
+        scene = eval_scene or bpy.context.scene
+        view_layer = scene.view_layers[0] if eval_scene else bpy.context.view_layer
+        segments = [(clip, clip["FrameStart"], clip["FrameEnd"]) for clip in clips] if clips else [(None, frame_start, frame_end)]
+        num_frames = sum(end - start + 1 for _, start, end in segments)
+        current = scene.frame_current
+        with bpy.context.temp_override(scene=scene, view_layer=view_layer), events.stage("normal_analysis", frame_start=frame_start, frame_end=frame_end):
+            i = 0
+            for clip, start, end in segments:
+                with clip_animation(clip):
+                    for frame in range(start, end + 1):
+                        scene.frame_set(frame)
+                        eval_obj = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+                        frame_mesh = eval_obj.to_mesh()
+                        corner_normals = get_corner_normals_array(frame_mesh)
+                        eval_obj.to_mesh_clear()
+                        if len(corner_normals) != len(topology["loop_vertices"]):
+                            raise Exception(f"Topology changes at frame {frame}, normal analysis needs a constant topology")
+                        np.minimum(agreement, encoding.edge_normal_agreement(corner_normals, corners_a, corners_b), out=agreement)
+                        i += 1
+                        events.progress("normal_analysis", i, num_frames)
+            scene.frame_set(current)
+    finally:
+        if eval_scene is not None:
+            bpy.data.scenes.remove(eval_scene)
+
+    split_indices = sorted(set(edges[agreement < math.cos(angle)].tolist()) | set(non_manifold.tolist()))
+    print(f"Normal-aware split: {len(split_indices)} of {num_edges} edges exceed {math.degrees(angle):.1f} degrees in some frame "
+          f"(all edges ripped: {len(mesh.loops)} vertices)")
+    split_mesh_edges(obj, split_indices)
+    return split_indices
     
+# Sample evaluated vertex positions of the encode target(s) over a frame range, for analysis passes
+def sample_target_positions(objects, frame_start, frame_end):
+    scene = bpy.context.scene
+    current = scene.frame_current
+    frames = []
+    try:
+        for frame in range(frame_start, frame_end + 1):
+            scene.frame_set(frame)
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            chunks = []
+            for obj in objects:
+                eval_obj = obj.evaluated_get(depsgraph)
+                mesh = eval_obj.to_mesh()
+                co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+                mesh.vertices.foreach_get("co", co)
+                eval_obj.to_mesh_clear()
+                chunks.append(co.reshape(-1, 3) @ np.array(obj.matrix_world.to_3x3(), dtype=np.float32).T + np.array(obj.matrix_world.translation, dtype=np.float32))
+            frames.append(np.concatenate(chunks) if chunks else np.zeros((0, 3), dtype=np.float32))
+    finally:
+        scene.frame_set(current)
+
+    if len({f.shape for f in frames}) > 1:
+        return None # Topology changes between frames
+    return np.stack(frames)
+
+# Encode targets of the current settings: the active mesh or the meshes of the target collection
+def get_encode_targets(context):
+    settings = context.scene.vat_settings
+    if settings.encode_target == 'ACTIVE_OBJECT':
+        obj = context.active_object
+        return [obj] if obj and obj.type == 'MESH' else []
+    if settings.vat_collection is None:
+        return []
+    return [o for o in settings.vat_collection.all_objects if o.type == 'MESH']
+
+# Compute a cache-friendly VAT column order for a mesh and report its estimated fetch locality
+def get_vertex_order(mesh, method, width, num_frames):
+    num_vertices = len(mesh.vertices)
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edges)
+
+    if method == 'MORTON':
+        positions = np.empty(num_vertices * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+        order = encoding.morton_order(positions.reshape(-1, 3))
+    else:
+        order = encoding.topology_order(num_vertices, edges)
+
+    before = encoding.fetch_locality(encoding.default_vertex_order(num_vertices), edges, width, num_frames)
+    after = encoding.fetch_locality(order, edges, width, num_frames)
+    print(f"VAT fetch locality (mean texel distance between neighbors): "
+          f"{before['MeanTexelDistance']:.1f} -> {after['MeanTexelDistance']:.1f}, "
+          f"near fetches {before['NearFetchRatio']:.1%} -> {after['NearFetchRatio']:.1%}")
+    return order
+
 def get_point_attributes_filtered(self, context, data_type_filter=None):
     items = []
     obj = context.active_object
@@ -413,8 +1109,3 @@ def get_evaluated_point_float_attributes(context):
     finally:
         eval_obj.to_mesh_clear()
 
-_openvat_enum_cache = {
-    "1": [("NONE", "None", "")],
-    "2": [("NONE", "None", "")],
-    "3": [("NONE", "None", "")]
-}